@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Decision Extractor Benchmark
+Runs the rule-based BUY/SELL/HOLD extractor over logged final trade decisions
+and reports how many would skip the LLM fallback, the decision mix and the
+time per extraction
+
+Reads the JSON Lines state logs under eval_results/<ticker>/TradingAgentsStrategy_logs/
+as well as the older full_states_log_<date>.json files
+
+Usage:
+    python scripts/benchmark_decision_extractor.py
+    python scripts/benchmark_decision_extractor.py --results-dir eval_results --show-fallbacks
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from tradingagents.graph.signal_processing import extract_decision  # noqa: E402
+from tradingagents.graph.state_logger import StateLogReader  # noqa: E402
+
+
+def load_decisions(results_dir: str):
+    """
+    Get (ticker, trade_date, final_trade_decision) from all state logs
+
+    Every full_states_log_<date>.json also holds all earlier dates, so each
+    (ticker, trade_date) is kept once, the most recently written record winning
+    """
+    decisions = {}
+    for ticker, trade_date, text in _iter_decisions(results_dir):
+        decisions[(ticker, str(trade_date))] = (ticker, trade_date, text)
+    return list(decisions.values())
+
+
+def _iter_decisions(results_dir: str):
+    """Yield (ticker, trade_date, final_trade_decision) from all state logs"""
+    for log_dir in sorted(glob.glob(os.path.join(results_dir, "*", "TradingAgentsStrategy_logs"))):
+        ticker = os.path.basename(os.path.dirname(log_dir))
+
+        # Older per-date JSON files first, so the JSON Lines log wins for dates in both
+        for path in sorted(glob.glob(os.path.join(log_dir, "full_states_log_*.json"))):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    states = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Skipping {path}: {e}")
+                continue
+            for trade_date, record in states.items():
+                yield ticker, trade_date, record.get("final_trade_decision", "")
+
+        for record in StateLogReader.for_directory(log_dir):
+            yield ticker, record.get("trade_date"), record.get("final_trade_decision", "")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the rule-based decision extractor")
+    parser.add_argument("--results-dir", default=os.path.join(PROJECT_ROOT, "eval_results"),
+                        help="directory holding <ticker>/TradingAgentsStrategy_logs")
+    parser.add_argument("--min-confidence", type=float, default=0.8,
+                        help="confidence needed to skip the LLM (config decision_min_confidence)")
+    parser.add_argument("--show-fallbacks", action="store_true",
+                        help="print the tail of every decision that would fall back to the LLM")
+    args = parser.parse_args()
+
+    decisions = load_decisions(args.results_dir)
+    if not decisions:
+        print(f"❌ No logged decisions found under {args.results_dir}")
+        return 1
+
+    counts = Counter()
+    confidences = Counter()
+    fallbacks = []
+    start = time.perf_counter()
+    for ticker, trade_date, text in decisions:
+        decision, confidence = extract_decision(text)
+        confidences[confidence] += 1
+        if decision is not None and confidence >= args.min_confidence:
+            counts[decision] += 1
+        else:
+            fallbacks.append((ticker, trade_date, text))
+    elapsed = time.perf_counter() - start
+
+    total = len(decisions)
+    resolved = total - len(fallbacks)
+    print(f"✅ {resolved}/{total} decisions ({resolved / total:.1%}) resolved without the LLM")
+    print(f"   {elapsed / total * 1e6:.0f} µs per decision")
+    print("   decisions: " + ", ".join(f"{name} {counts[name]}" for name in ("BUY", "SELL", "HOLD")))
+    print("   confidence: " + ", ".join(
+        f"{confidence:.2f} × {n}" for confidence, n in sorted(confidences.items(), reverse=True)
+    ))
+
+    if args.show_fallbacks:
+        for ticker, trade_date, text in fallbacks:
+            tail = " ".join(str(text).split())[-300:]
+            print(f"\n--- {ticker} {trade_date} ---\n...{tail}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Import Time Benchmark
+Measures how long importing the main tradingagents entry points takes in a
+fresh interpreter, and fails if an import eagerly loads a provider SDK or
+dataflow backend that should only be loaded on first use
+
+Usage:
+    python scripts/benchmark_import_time.py
+    python scripts/benchmark_import_time.py --repeat 5 --max-seconds 3
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# module to import -> modules that must not be loaded by importing it
+IMPORT_TARGETS = {
+    "tradingagents.dataflows": [
+        "pandas", "yfinance", "stockstats", "bs4", "openai", "requests",
+    ],
+    "tradingagents.llm_adapters": ["dashscope"],
+    "tradingagents.graph": [
+        "langgraph", "langchain_openai", "langchain_anthropic",
+        "langchain_google_genai", "dashscope",
+    ],
+    "tradingagents.graph.trading_graph": [
+        "langchain_openai", "langchain_anthropic", "langchain_google_genai",
+        "dashscope", "chromadb", "yfinance", "stockstats", "bs4", "openai",
+    ],
+}
+
+_CHILD_CODE = """
+import json, sys, time
+start = time.perf_counter()
+import {target}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+def measure(target: str) -> dict:
+    """Import a module in a fresh interpreter and report time and loaded modules"""
+    result = subprocess.run(
+        [sys.executable, "-c", _CHILD_CODE.format(target=target)],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {target} failed:\n{result.stderr.strip()}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark tradingagents import time")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh imports per target")
+    parser.add_argument("--max-seconds", type=float, default=None,
+                        help="fail if a target's median import time exceeds this")
+    parser.add_argument("targets", nargs="*", help="modules to benchmark (default: all)")
+    args = parser.parse_args()
+
+    failed = False
+    for target in args.targets or IMPORT_TARGETS:
+        try:
+            runs = [measure(target) for _ in range(args.repeat)]
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            failed = True
+            continue
+
+        median = statistics.median(run["seconds"] for run in runs)
+        loaded = set(runs[-1]["modules"])
+        eager = [
+            name for name in IMPORT_TARGETS.get(target, [])
+            if name in loaded
+        ]
+
+        status = "✅"
+        if eager or (args.max_seconds is not None and median > args.max_seconds):
+            status = "❌"
+            failed = True
+        print(f"{status} {target}: {median * 1000:.0f} ms median over {args.repeat} runs")
+        if eager:
+            print(f"   eagerly imported: {', '.join(eager)}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
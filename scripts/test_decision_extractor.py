@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Decision Extractor Tests
+Checks the rule-based BUY/SELL/HOLD extractor on typical Risk Judge decisions
+
+Usage:
+    python -m pytest scripts/test_decision_extractor.py
+    python scripts/test_decision_extractor.py
+"""
+
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from tradingagents.graph.signal_processing import extract_decision  # noqa: E402
+
+
+def test_final_transaction_proposal():
+    assert extract_decision("Reasoning...\nFINAL TRANSACTION PROPOSAL: **SELL**") == ("SELL", 0.99)
+
+
+def test_chinese_final_recommendation():
+    assert extract_decision("综合以上分析，最终建议：**买入**") == ("BUY", 0.95)
+
+
+def test_quoted_proposal_conflicting_with_recommendation():
+    text = "The trader proposed FINAL TRANSACTION PROPOSAL: **BUY** but my recommendation is to SELL"
+    decision, confidence = extract_decision(text)
+    assert decision is None and confidence < 0.8
+
+
+def test_quoted_proposal_agreeing_with_recommendation():
+    text = "The trader proposed FINAL TRANSACTION PROPOSAL: **HOLD** and my recommendation is to HOLD"
+    assert extract_decision(text) == ("HOLD", 0.99)
+
+
+def test_template_is_not_a_decision():
+    assert extract_decision("Answer with BUY/HOLD/SELL.") == (None, 0.0)
+
+
+def test_conflicting_bold_decisions():
+    assert extract_decision("Bull says **BUY**, bear says **SELL**.") == (None, 0.0)
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,7 @@
+"""
+Rich-Agents 缓存模块
+"""
+
+from .llm_response_cache import LLMCacheMiss, LLMResponseCache, get_llm_response_cache
+
+__all__ = ["LLMCacheMiss", "LLMResponseCache", "get_llm_response_cache"]
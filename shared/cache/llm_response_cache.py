@@ -0,0 +1,200 @@
+"""
+Rich-Agents LLM响应缓存
+把聊天模型的响应按 模型 × 参数 × 规范化消息 × 绑定工具 保存到本地 SQLite 文件，
+回测重复运行相同的 (股票, 日期) 时直接重放已记录的响应，无需访问网络
+
+模式:
+    off     不使用缓存（默认）
+    record  命中则返回缓存，未命中则调用模型并记录
+    replay  只从缓存返回，未命中时抛出 LLMCacheMiss，保证不发起网络请求
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+LLM_CACHE_MODES = ("off", "record", "replay")
+DEFAULT_LLM_CACHE_PATH = "./llm_cache/responses.sqlite"
+
+# 序列化消息中与内容无关、每次调用都会变化的字段
+_VOLATILE_MESSAGE_FIELDS = ("id", "response_metadata", "usage_metadata")
+
+
+class LLMCacheMiss(RuntimeError):
+    """replay 模式下缓存中没有对应的响应"""
+
+
+def _strip_volatile(value: Any) -> Any:
+    """去掉序列化消息中的消息ID、响应元数据等易变字段"""
+    if isinstance(value, list):
+        return [_strip_volatile(item) for item in value]
+    if isinstance(value, dict):
+        if value.get("lc") == 1 and isinstance(value.get("kwargs"), dict):
+            kwargs = {
+                k: _strip_volatile(v) for k, v in value["kwargs"].items()
+                if k not in _VOLATILE_MESSAGE_FIELDS
+            }
+            return {**value, "kwargs": kwargs}
+        return {k: _strip_volatile(v) for k, v in value.items()}
+    return value
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    规范化 LangChain 传给缓存的提示
+
+    聊天模型的提示是消息列表的 JSON 序列化，去掉易变字段并排序键；
+    文本模型的提示是普通字符串，原样返回
+    """
+    try:
+        data = json.loads(prompt)
+    except ValueError:
+        return prompt
+    return json.dumps(_strip_volatile(data), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    """
+    计算缓存键
+
+    Args:
+        prompt: LangChain 序列化的消息（或文本提示）
+        llm_string: LangChain 生成的模型标识，包含模型名、调用参数、stop 和绑定的工具
+    """
+    digest = hashlib.sha256()
+    digest.update(llm_string.encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(normalize_prompt(prompt).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class LLMResponseCache(BaseCache):
+    """
+    基于 SQLite 的 LangChain 响应缓存
+
+    通过模型的 cache 参数使用，同一个实例可以被多个模型共享；
+    每个线程使用独立的 SQLite 连接，WAL 模式下多进程可同时读写
+    """
+
+    def __init__(self, path: Union[str, Path], mode: str = "record"):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"不支持的LLM缓存模式: {mode}")
+
+        self.path = Path(path)
+        self.mode = mode
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+
+    def __repr__(self) -> str:
+        # 模型序列化时可能用到 repr，必须稳定，不能包含对象地址
+        return f"LLMResponseCache(path={str(self.path)!r}, mode={self.mode!r})"
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        """查找缓存的响应；replay 模式下未命中抛出 LLMCacheMiss"""
+        row = self._connection().execute(
+            "SELECT response FROM llm_responses WHERE key = ?",
+            (cache_key(prompt, llm_string),)
+        ).fetchone()
+
+        if row is not None:
+            try:
+                return_val = loads(row[0])
+            except Exception as e:
+                print(f"⚠️ LLM缓存记录无法解析，忽略: {e}")
+            else:
+                for generation in return_val:
+                    message = getattr(generation, "message", None)
+                    if message is not None:
+                        # 用量回调据此跳过重放的响应，避免重复计费
+                        message.response_metadata["llm_cache_hit"] = True
+                self.hits += 1
+                return return_val
+
+        self.misses += 1
+        if self.mode == "replay":
+            raise LLMCacheMiss(
+                f"LLM缓存未命中（replay 模式不会调用模型）: {self.path}\n"
+                "请先用 record 模式运行一次"
+            )
+        return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """记录模型响应"""
+        if self.mode != "record":
+            return
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, response, created_at) VALUES (?, ?, ?)",
+                (cache_key(prompt, llm_string), dumps(list(return_val)), time.time())
+            )
+
+    def clear(self, **kwargs: Any) -> None:
+        """清空缓存"""
+        with self._connection() as conn:
+            conn.execute("DELETE FROM llm_responses")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """缓存统计"""
+        count = self._connection().execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+        return {
+            "path": str(self.path),
+            "mode": self.mode,
+            "entries": count,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+_caches: Dict[Tuple[str, str], LLMResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_llm_response_cache(mode: Optional[str] = None,
+                           path: Optional[Union[str, Path]] = None) -> Optional[LLMResponseCache]:
+    """
+    获取共享的LLM响应缓存
+
+    Args:
+        mode: off / record / replay，未指定时读取环境变量 TRADINGAGENTS_LLM_CACHE
+        path: SQLite 文件路径，未指定时读取环境变量 TRADINGAGENTS_LLM_CACHE_PATH
+
+    Returns:
+        同一文件、同一模式返回同一个实例；off 模式返回 None
+    """
+    mode = (mode or os.getenv("TRADINGAGENTS_LLM_CACHE", "off")).lower()
+    if mode not in LLM_CACHE_MODES:
+        raise ValueError(f"不支持的LLM缓存模式: {mode}，可选: {', '.join(LLM_CACHE_MODES)}")
+    if mode == "off":
+        return None
+
+    path = os.path.abspath(path or os.getenv("TRADINGAGENTS_LLM_CACHE_PATH", DEFAULT_LLM_CACHE_PATH))
+    with _caches_lock:
+        cache = _caches.get((path, mode))
+        if cache is None:
+            cache = _caches[(path, mode)] = LLMResponseCache(path, mode)
+        return cache
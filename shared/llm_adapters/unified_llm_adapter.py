@@ -8,6 +8,8 @@ import logging
 from typing import Dict, Any, Optional, List, Union
 from abc import ABC, abstractmethod
 
+from ..cache.llm_response_cache import get_llm_response_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -44,11 +46,15 @@ class UnifiedLLMAdapter:
             provider: LLM提供商名称 ('openai', 'dashscope', 'google', 'anthropic')
             model: 模型名称
             api_key: API密钥，如果不提供则从环境变量获取
-            **kwargs: 其他参数
+            **kwargs: 其他参数；llm_cache_mode (off/record/replay) 和 llm_cache_path
+                      配置响应缓存，未指定时读取环境变量 TRADINGAGENTS_LLM_CACHE(_PATH)
         """
         self.provider = provider.lower()
         self.model = model
         self.api_key = api_key
+        self.llm_cache = get_llm_response_cache(
+            kwargs.pop("llm_cache_mode", None), kwargs.pop("llm_cache_path", None)
+        )
         self.kwargs = kwargs
         
         # 如果没有提供API密钥，尝试从环境变量获取
@@ -253,8 +259,13 @@ class UnifiedLLMAdapter:
                 )
             else:
                 raise ValueError(f"不支持的LLM提供商: {self.provider}")
+            
+            # 与 TradingAgentsGraph 中的模型共享同一个响应缓存
+            if self.llm_cache is not None:
+                self.llm.cache = self.llm_cache
                 
             logger.info(f"成功创建{self.provider}适配器，模型: {self.model}")
+            return self.llm
             
         except Exception as e:
             logger.error(f"创建{self.provider}适配器失败: {str(e)}")
@@ -1,8 +1,11 @@
 import time
 import json
 
+from tradingagents.agents.utils.context_compactor import compact_context
+from tradingagents.agents.utils.prompt_layout import build_agent_messages
 
-def create_research_manager(llm, memory):
+
+def create_research_manager(llm, memory, compactor=None):
     def research_manager_node(state) -> dict:
         history = state["investment_debate_state"].get("history", "")
         market_research_report = state["market_report"]
@@ -19,6 +22,9 @@ def create_research_manager(llm, memory):
         for i, rec in enumerate(past_memories, 1):
             past_memory_str += rec["recommendation"] + "\n\n"
 
+        # Reports and older debate turns are summarized when the prompt is over its token budget
+        context = compact_context(compactor, state, history)
+
         prompt = f"""As the portfolio manager and debate facilitator, your role is to critically evaluate this round of debate and make a definitive decision: align with the bear analyst, the bull analyst, or choose Hold only if it is strongly justified based on the arguments presented.
 
 Summarize the key points from both sides concisely, focusing on the most compelling evidence or reasoning. Your recommendation—Buy, Sell, or Hold—must be clear and actionable. Avoid defaulting to Hold simply because both sides have valid points; commit to a stance grounded in the debate's strongest arguments.
@@ -35,8 +41,8 @@ Here are your past reflections on mistakes:
 
 Here is the debate:
 Debate History:
-{history}"""
-        response = llm.invoke(prompt)
+{context['history']}"""
+        response = llm.invoke(build_agent_messages(llm, state, context, prompt))
 
         new_investment_debate_state = {
             "judge_decision": response.content,
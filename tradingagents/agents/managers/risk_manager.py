@@ -1,8 +1,11 @@
 import time
 import json
 
+from tradingagents.agents.utils.context_compactor import compact_context
+from tradingagents.agents.utils.prompt_layout import build_agent_messages
 
-def create_risk_manager(llm, memory):
+
+def create_risk_manager(llm, memory, compactor=None):
     def risk_manager_node(state) -> dict:
 
         company_name = state["company_of_interest"]
@@ -22,6 +25,9 @@ def create_risk_manager(llm, memory):
         for i, rec in enumerate(past_memories, 1):
             past_memory_str += rec["recommendation"] + "\n\n"
 
+        # Reports and older debate turns are summarized when the prompt is over its token budget
+        context = compact_context(compactor, state, history)
+
         prompt = f"""As the Risk Management Judge and Debate Facilitator, your goal is to evaluate the debate between three risk analysts—Risky, Neutral, and Safe/Conservative—and determine the best course of action for the trader. Your decision must result in a clear recommendation: Buy, Sell, or Hold. Choose Hold only if strongly justified by specific arguments, not as a fallback when all sides seem valid. Strive for clarity and decisiveness.
 
 Guidelines for Decision-Making:
@@ -37,13 +43,13 @@ Deliverables:
 ---
 
 **Analysts Debate History:**  
-{history}
+{context['history']}
 
 ---
 
 Focus on actionable insights and continuous improvement. Build on past lessons, critically evaluate all perspectives, and ensure each decision advances better outcomes."""
 
-        response = llm.invoke(prompt)
+        response = llm.invoke(build_agent_messages(llm, state, context, prompt))
 
         new_risk_debate_state = {
             "judge_decision": response.content,
@@ -2,8 +2,11 @@ from langchain_core.messages import AIMessage
 import time
 import json
 
+from tradingagents.agents.utils.context_compactor import compact_context
+from tradingagents.agents.utils.prompt_layout import build_agent_messages
 
-def create_bear_researcher(llm, memory):
+
+def create_bear_researcher(llm, memory, compactor=None):
     def bear_node(state) -> dict:
         investment_debate_state = state["investment_debate_state"]
         history = investment_debate_state.get("history", "")
@@ -22,6 +25,9 @@ def create_bear_researcher(llm, memory):
         for i, rec in enumerate(past_memories, 1):
             past_memory_str += rec["recommendation"] + "\n\n"
 
+        # Reports and older debate turns are summarized when the prompt is over its token budget
+        context = compact_context(compactor, state, history)
+
         prompt = f"""You are a Bear Analyst making the case against investing in the stock. Your goal is to present a well-reasoned argument emphasizing risks, challenges, and negative indicators. Leverage the provided research and data to highlight potential downsides and counter bullish arguments effectively.
 
 Key points to focus on:
@@ -34,17 +40,14 @@ Key points to focus on:
 
 Resources available:
 
-Market research report: {market_research_report}
-Social media sentiment report: {sentiment_report}
-Latest world affairs news: {news_report}
-Company fundamentals report: {fundamentals_report}
-Conversation history of the debate: {history}
+The market research, social media sentiment, world affairs news and company fundamentals reports are given above.
+Conversation history of the debate: {context['history']}
 Last bull argument: {current_response}
 Reflections from similar situations and lessons learned: {past_memory_str}
 Use this information to deliver a compelling bear argument, refute the bull's claims, and engage in a dynamic debate that demonstrates the risks and weaknesses of investing in the stock. You must also address reflections and learn from lessons and mistakes you made in the past.
 """
 
-        response = llm.invoke(prompt)
+        response = llm.invoke(build_agent_messages(llm, state, context, prompt))
 
         argument = f"Bear Analyst: {response.content}"
 
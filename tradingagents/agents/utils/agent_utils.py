@@ -6,14 +6,15 @@ from langchain_core.messages import RemoveMessage
 from langchain_core.tools import tool
 from datetime import date, timedelta, datetime
 import functools
-import pandas as pd
 import os
 from dateutil.relativedelta import relativedelta
-from langchain_openai import ChatOpenAI
-import tradingagents.dataflows.interface as interface
+from tradingagents.lazy_import import lazy_import
 from tradingagents.default_config import DEFAULT_CONFIG
 from langchain_core.messages import HumanMessage
 
+# Dataflow backends are only loaded when a tool is first called
+interface = lazy_import("tradingagents.dataflows.interface")
+
 
 def create_msg_delete():
     def delete_messages(state):
@@ -0,0 +1,215 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List
+
+REPORT_KEYS = ("market_report", "sentiment_report", "news_report", "fundamentals_report")
+
+# Debate turns are appended as "\n<Speaker> Analyst: <argument>"
+_TURN_SPLIT = re.compile(r"\n(?=[A-Z][A-Za-z]* Analyst: )")
+_CJK = re.compile(r"[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uff00-\uffef]")
+
+_REPORT_SUMMARY_PROMPT = """Summarize the following {kind} for a trading debate in at most about {words} words. Keep every figure, date, price level, ratio, named risk and catalyst; drop repetition and filler. Write in the language of the report.
+
+{text}"""
+
+_HISTORY_SUMMARY_PROMPT = """Update the summary of a trading debate with the new turns below, in at most about {words} words. Keep who argued what, the key figures and evidence each side used, and the points still in dispute. Write in the language of the debate.
+
+Current summary:
+{summary}
+
+New turns:
+{text}"""
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count: one per CJK character, one per four other characters."""
+    if not text:
+        return 0
+    cjk = len(_CJK.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def _truncate(text: str, max_tokens: int, keep_tail: bool = False) -> str:
+    """Cut text to about max_tokens, keeping its head (or its tail)."""
+    tokens = estimate_tokens(text)
+    if tokens <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return ""
+    keep = max(int(len(text) * max_tokens / tokens) - 8, 0)
+    return "[...]" + text[len(text) - keep:] if keep_tail else text[:keep] + "[...]"
+
+
+def compact_context(compactor, state, history: str, include_reports: bool = True) -> Dict[str, str]:
+    """Analyst reports and debate history for a prompt.
+
+    Returns them unchanged when no compactor is configured, otherwise as
+    compacted by ``ContextCompactor.compact``.
+    """
+    if compactor is None:
+        reports = {key: state.get(key, "") for key in REPORT_KEYS} if include_reports else {}
+        return {**reports, "history": history}
+    return compactor.compact(state, history, include_reports)
+
+
+class ContextCompactor:
+    """Keeps debate prompts inside a per-call token budget.
+
+    Analyst reports that together exceed their ``report_share`` of
+    ``token_budget`` are replaced by summaries. When the reports plus the
+    debate history still exceed the budget, all but the ``recent_turns``
+    latest debate turns are replaced by a running summary; whatever is still
+    over budget is cut.
+
+    Summaries are cached by content hash, so each report is summarized once
+    however many agents read it, and the summary of older turns is extended
+    with the turns that aged out since it was written instead of being
+    rebuilt, so every turn is summarized once and prompt size stays flat as
+    debates get deeper.
+    """
+
+    def __init__(self, llm, token_budget: int, recent_turns: int = 2,
+                 report_share: float = 0.5, max_entries: int = 256):
+        self.llm = llm
+        self.token_budget = token_budget
+        self.recent_turns = recent_turns
+        self.report_share = report_share
+        self.max_entries = max_entries
+        self._summaries = OrderedDict()
+        self._lock = threading.Lock()
+        self.compactions = 0
+        self.summary_calls = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+
+    def compact(self, state, history: str, include_reports: bool = True) -> Dict[str, str]:
+        """Compact the reports in ``state`` and ``history`` to fit the budget.
+
+        Returns:
+            Dict with the four report keys (if ``include_reports``) and "history"
+        """
+        reports = {key: state.get(key, "") for key in REPORT_KEYS} if include_reports else {}
+        tokens_before = sum(map(estimate_tokens, reports.values())) + estimate_tokens(history)
+
+        # Reports are compacted whenever they are over their share, not only when
+        # the history pushes the prompt over budget, so every agent of a run gets
+        # the same report text and the shared prompt prefix stays cacheable
+        report_budget = int(self.token_budget * self.report_share)
+        if sum(map(estimate_tokens, reports.values())) > report_budget:
+            per_report = report_budget // len(reports)
+            reports = {
+                key: self._compact_report(key, text, per_report)
+                for key, text in reports.items()
+            }
+
+        history_budget = self.token_budget - sum(map(estimate_tokens, reports.values()))
+        history = self._compact_history(history, history_budget)
+
+        tokens_after = sum(map(estimate_tokens, reports.values())) + estimate_tokens(history)
+        if tokens_after < tokens_before:
+            with self._lock:
+                self.compactions += 1
+                self.tokens_before += tokens_before
+                self.tokens_after += tokens_after
+        return {**reports, "history": history}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Prompts compacted, summaries requested and estimated tokens saved."""
+        with self._lock:
+            return {
+                "token_budget": self.token_budget,
+                "compactions": self.compactions,
+                "summary_calls": self.summary_calls,
+                "tokens_before": self.tokens_before,
+                "tokens_after": self.tokens_after,
+                "tokens_saved": self.tokens_before - self.tokens_after,
+            }
+
+    def _cached(self, key):
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is not None:
+                self._summaries.move_to_end(key)
+            return summary
+
+    def _remember(self, key, summary):
+        with self._lock:
+            self._summaries[key] = summary
+            self._summaries.move_to_end(key)
+            while len(self._summaries) > self.max_entries:
+                self._summaries.popitem(last=False)
+
+    def _summarize(self, prompt: str) -> str:
+        with self._lock:
+            self.summary_calls += 1
+        return self.llm.invoke(prompt).content
+
+    def _compact_report(self, kind: str, text: str, max_tokens: int) -> str:
+        if estimate_tokens(text) <= max_tokens:
+            return text
+
+        key = hashlib.sha256(f"{kind}\0{max_tokens}\0{text}".encode("utf-8")).hexdigest()
+        summary = self._cached(key)
+        if summary is None:
+            try:
+                summary = self._summarize(_REPORT_SUMMARY_PROMPT.format(
+                    kind=kind.replace("_", " "), words=max_tokens * 3 // 4, text=text
+                ))
+            except Exception as e:
+                print(f"⚠️ Failed to summarize {kind}, truncating it instead: {e}")
+                return _truncate(text, max_tokens)
+            summary = _truncate(summary, max_tokens)
+            self._remember(key, summary)
+        return summary
+
+    def _compact_history(self, history: str, max_tokens: int) -> str:
+        if estimate_tokens(history) <= max_tokens:
+            return history
+
+        turns = [turn for turn in _TURN_SPLIT.split(history) if turn.strip()]
+        split = max(len(turns) - self.recent_turns, 0)
+        older, recent = turns[:split], turns[split:]
+        recent_text = "\n".join(recent)
+
+        if older:
+            summary_budget = max(max_tokens - estimate_tokens(recent_text), max_tokens // 4)
+            summary = self._summarize_turns(older, summary_budget)
+            if summary:
+                recent_text = f"Summary of the earlier debate:\n{summary}\n\n{recent_text}"
+            else:
+                recent_text = "\n".join(turns)
+
+        return _truncate(recent_text, max_tokens, keep_tail=True)
+
+    def _summarize_turns(self, turns: List[str], max_tokens: int) -> str:
+        """Summary of ``turns``, extending the cached summary of the longest known prefix."""
+        digest = hashlib.sha256()
+        prefix_keys = []
+        for turn in turns:
+            digest.update(turn.encode("utf-8"))
+            digest.update(b"\0")
+            prefix_keys.append(f"turns\0{digest.hexdigest()}")
+
+        start, summary = 0, ""
+        for i in range(len(prefix_keys) - 1, -1, -1):
+            cached = self._cached(prefix_keys[i])
+            if cached is not None:
+                start, summary = i + 1, cached
+                break
+        if start == len(turns):
+            return summary
+
+        try:
+            summary = self._summarize(_HISTORY_SUMMARY_PROMPT.format(
+                words=max_tokens * 3 // 4,
+                summary=summary or "(none yet)",
+                text="\n".join(turns[start:]),
+            ))
+        except Exception as e:
+            print(f"⚠️ Failed to summarize the debate history, truncating it instead: {e}")
+            return ""
+        summary = _truncate(summary, max_tokens)
+        self._remember(prefix_keys[-1], summary)
+        return summary
@@ -1,17 +1,177 @@
-import chromadb
-from chromadb.config import Settings
-from openai import OpenAI
+import importlib.util
 import os
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
-# Import DashScope if available
-try:
-    import dashscope
-    from dashscope import TextEmbedding
-    DASHSCOPE_AVAILABLE = True
-except ImportError:
-    DASHSCOPE_AVAILABLE = False
-    dashscope = None
-    TextEmbedding = None
+from tradingagents.lazy_import import lazy_import
+from .context_compactor import estimate_tokens
+from .memory_store import create_memory_store
+
+# Embedding SDKs are imported when a memory first uses them
+openai = lazy_import("openai")
+
+# DashScope is optional
+DASHSCOPE_AVAILABLE = importlib.util.find_spec("dashscope") is not None
+dashscope = lazy_import("dashscope") if DASHSCOPE_AVAILABLE else None
+
+
+class EmbeddingCache:
+    """Content-hash keyed embedding cache shared by all memories.
+
+    Embeddings are keyed by sha256 of (embedding model, text), held in a
+    bounded in-process LRU and, if ``path`` is given, in a SQLite file so they
+    survive restarts.
+    """
+
+    def __init__(self, max_entries=1024, path=None):
+        self.max_entries = max_entries
+        self.path = path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self.hits = 0
+        self.misses = 0
+
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def make_key(model, text):
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+    def _remember(self, key, embedding):
+        self._entries[key] = embedding
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, model, text):
+        """Get a cached embedding, or None."""
+        key = self.make_key(model, text)
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return embedding
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT vector FROM embeddings WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    embedding = array("d", row[0]).tolist()
+                    self._remember(key, embedding)
+                    self.hits += 1
+                    return embedding
+
+            self.misses += 1
+            return None
+
+    def put(self, model, text, embedding):
+        """Store an embedding."""
+        key = self.make_key(model, text)
+        embedding = list(embedding)
+        with self._lock:
+            self._remember(key, embedding)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    (key, array("d", embedding).tobytes()),
+                )
+                self._db.commit()
+
+
+_embedding_cache = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache(config=None):
+    """Get the process-wide embedding cache, created from the first config seen."""
+    global _embedding_cache
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                config = config or {}
+                _embedding_cache = EmbeddingCache(
+                    max_entries=config.get("embedding_cache_size", 1024),
+                    path=config.get("embedding_cache_path"),
+                )
+    return _embedding_cache
+
+
+# Maximum number of inputs per embedding request
+EMBEDDING_BATCH_LIMITS = {
+    "text-embedding-v1": 25,
+    "text-embedding-v2": 25,
+    "text-embedding-v3": 10,
+}
+# OpenAI-compatible endpoints accept up to 2048 inputs, but the situations are
+# long reports and a request is also capped in total tokens
+DEFAULT_EMBEDDING_BATCH_LIMIT = 64
+# Estimated tokens per embedding request; OpenAI allows 300k, the estimate is
+# rough, so chunks stay well below it
+DEFAULT_EMBEDDING_BATCH_TOKENS = 200_000
+
+
+def embedding_chunks(texts, max_items, max_tokens):
+    """Split texts into request chunks of at most max_items texts and about max_tokens tokens.
+
+    A single text over max_tokens gets a chunk of its own.
+    """
+    chunks, chunk, chunk_tokens = [], [], 0
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if chunk and (len(chunk) >= max_items or chunk_tokens + tokens > max_tokens):
+            chunks.append(chunk)
+            chunk, chunk_tokens = [], 0
+        chunk.append(text)
+        chunk_tokens += tokens
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+class RateLimiter:
+    """Spaces requests so that at most ``requests_per_minute`` start per minute."""
+
+    def __init__(self, requests_per_minute=None):
+        self.min_interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._next_time = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.min_interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_time)
+            self._next_time = start + self.min_interval
+        if start > now:
+            time.sleep(start - now)
+
+
+_rate_limiters = {}
+
+
+def get_embedding_rate_limiter(model, config):
+    """Get the rate limiter shared by every memory using the given embedding model."""
+    with _embedding_cache_lock:
+        limiter = _rate_limiters.get(model)
+        if limiter is None:
+            limiter = RateLimiter(config.get("embedding_requests_per_minute"))
+            _rate_limiters[model] = limiter
+    return limiter
 
 
 class FinancialSituationMemory:
@@ -38,7 +198,7 @@ class FinancialSituationMemory:
                 # Fallback to OpenAI embeddings
                 print("⚠️ DashScope not available or not configured, falling back to OpenAI embeddings")
                 self.embedding = "text-embedding-3-small"
-                self.client = OpenAI(base_url=config.get("backend_url", "https://api.openai.com/v1"))
+                self.client = openai.OpenAI(base_url=config.get("backend_url", "https://api.openai.com/v1"))
             else:
                 # No valid API keys available
                 raise ValueError(
@@ -59,7 +219,7 @@ class FinancialSituationMemory:
                 print("💡 Google AI using DashScope embedding service")
             elif openai_key:
                 self.embedding = "text-embedding-3-small"
-                self.client = OpenAI(base_url=config.get("backend_url", "https://api.openai.com/v1"))
+                self.client = openai.OpenAI(base_url=config.get("backend_url", "https://api.openai.com/v1"))
                 print("⚠️ Google AI falling back to OpenAI embedding service")
             else:
                 raise ValueError(
@@ -69,22 +229,65 @@ class FinancialSituationMemory:
                 )
         elif config["backend_url"] == "http://localhost:11434/v1":
             self.embedding = "nomic-embed-text"
-            self.client = OpenAI(base_url=config["backend_url"])
+            self.client = openai.OpenAI(base_url=config["backend_url"])
         else:
             self.embedding = "text-embedding-3-small"
-            self.client = OpenAI(base_url=config["backend_url"])
+            self.client = openai.OpenAI(base_url=config["backend_url"])
 
-        self.chroma_client = chromadb.Client(Settings(allow_reset=True))
+        self.embedding_cache = get_embedding_cache(config)
 
-        # Try to get existing collection, create new one if it doesn't exist
-        try:
-            self.situation_collection = self.chroma_client.get_collection(name=name)
-        except Exception:
-            # Collection doesn't exist, create new one
-            self.situation_collection = self.chroma_client.create_collection(name=name)
+        # Vector store selected by config["memory_backend"], see create_memory_store
+        self.store = create_memory_store(name, config)
 
     def get_embedding(self, text):
-        """Get embedding for a text using the configured provider"""
+        """Get embedding for a text, computing it only if it is not cached yet"""
+        return self.get_embeddings([text])[0]
+
+    def get_embeddings(self, texts):
+        """Get embeddings for several texts.
+
+        Cached texts are served from the embedding cache; the rest are sent in
+        chunks within the provider's batch limit and a token budget
+        (``embedding_batch_tokens``), one request per chunk, with up to
+        ``embedding_max_concurrency`` chunks in flight under the provider's
+        request rate budget.
+        """
+        embeddings = [self.embedding_cache.get(self.embedding, text) for text in texts]
+
+        missing = list(dict.fromkeys(
+            text for text, embedding in zip(texts, embeddings) if embedding is None
+        ))
+        if not missing:
+            return embeddings
+
+        batch_size = self.config.get(
+            "embedding_batch_size",
+            EMBEDDING_BATCH_LIMITS.get(self.embedding, DEFAULT_EMBEDDING_BATCH_LIMIT),
+        )
+        batch_tokens = self.config.get("embedding_batch_tokens", DEFAULT_EMBEDDING_BATCH_TOKENS)
+        chunks = embedding_chunks(missing, batch_size, batch_tokens)
+        max_workers = min(len(chunks), self.config.get("embedding_max_concurrency", 4))
+
+        if max_workers <= 1:
+            chunk_embeddings = [self._compute_embeddings(chunk) for chunk in chunks]
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                chunk_embeddings = list(executor.map(self._compute_embeddings, chunks))
+
+        computed = {}
+        for chunk, vectors in zip(chunks, chunk_embeddings):
+            for text, embedding in zip(chunk, vectors):
+                self.embedding_cache.put(self.embedding, text, embedding)
+                computed[text] = embedding
+
+        return [
+            embedding if embedding is not None else computed[text]
+            for text, embedding in zip(texts, embeddings)
+        ]
+
+    def _compute_embeddings(self, texts):
+        """Get embeddings for a chunk of texts with one request to the configured provider"""
+        get_embedding_rate_limiter(self.embedding, self.config).wait()
 
         if ((self.llm_provider == "dashscope" or
              "dashscope" in self.llm_provider or
@@ -93,12 +296,15 @@ class FinancialSituationMemory:
             DASHSCOPE_AVAILABLE and self.client is None):
             # Use DashScope embedding model
             try:
-                response = TextEmbedding.call(
+                response = dashscope.TextEmbedding.call(
                     model=self.embedding,
-                    input=text
+                    input=texts
                 )
                 if response.status_code == 200:
-                    return response.output['embeddings'][0]['embedding']
+                    items = sorted(
+                        response.output['embeddings'], key=lambda item: item['text_index']
+                    )
+                    return [item['embedding'] for item in items]
                 else:
                     raise Exception(f"DashScope embedding error: {response.code} - {response.message}")
             except Exception as e:
@@ -106,50 +312,40 @@ class FinancialSituationMemory:
         else:
             # Use OpenAI-compatible embedding model
             response = self.client.embeddings.create(
-                model=self.embedding, input=text
+                model=self.embedding, input=texts
             )
-            return response.data[0].embedding
+            return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
 
     def add_situations(self, situations_and_advice):
         """Add financial situations and their corresponding advice. Parameter is a list of tuples (situation, rec)"""
 
         situations = []
         advice = []
-        ids = []
-        embeddings = []
 
-        offset = self.situation_collection.count()
-
-        for i, (situation, recommendation) in enumerate(situations_and_advice):
+        for situation, recommendation in situations_and_advice:
             situations.append(situation)
             advice.append(recommendation)
-            ids.append(str(offset + i))
-            embeddings.append(self.get_embedding(situation))
-
-        self.situation_collection.add(
-            documents=situations,
-            metadatas=[{"recommendation": rec} for rec in advice],
-            embeddings=embeddings,
-            ids=ids,
-        )
+
+        if not situations:
+            return
+
+        embeddings = self.get_embeddings(situations)
+
+        self.store.add(situations, advice, embeddings)
 
     def get_memories(self, current_situation, n_matches=1):
         """Find matching recommendations using embeddings"""
         query_embedding = self.get_embedding(current_situation)
 
-        results = self.situation_collection.query(
-            query_embeddings=[query_embedding],
-            n_results=n_matches,
-            include=["metadatas", "documents", "distances"],
-        )
+        results = self.store.query(query_embedding, n_matches)
 
         matched_results = []
-        for i in range(len(results["documents"][0])):
+        for situation, recommendation, distance in results:
             matched_results.append(
                 {
-                    "matched_situation": results["documents"][0][i],
-                    "recommendation": results["metadatas"][0][i]["recommendation"],
-                    "similarity_score": 1 - results["distances"][0][i],
+                    "matched_situation": situation,
+                    "recommendation": recommendation,
+                    "similarity_score": 1 - distance,
                 }
             )
 
@@ -0,0 +1,384 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+# hnswlib is optional, only needed for memory_backend="hnsw"
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    HNSWLIB_AVAILABLE = False
+    hnswlib = None
+
+
+def _squared_l2(vectors, queries):
+    """Squared L2 distances between each query row and each vector row."""
+    return (
+        np.einsum("ij,ij->i", queries, queries)[:, None]
+        - 2.0 * (queries @ vectors.T)
+        + np.einsum("ij,ij->i", vectors, vectors)[None, :]
+    )
+
+
+def _top_k(distances, k):
+    """Indices of the k smallest distances of each row, nearest first."""
+    k = min(k, distances.shape[1])
+    if k < distances.shape[1]:
+        nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    else:
+        nearest = np.tile(np.arange(k), (len(distances), 1))
+    order = np.argsort(np.take_along_axis(distances, nearest, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(nearest, order, axis=1)
+
+
+class MemoryStore:
+    """Vector store behind FinancialSituationMemory.
+
+    Backends store (document, recommendation, embedding) rows and return
+    (document, recommendation, distance) tuples, nearest first. Distances are
+    squared L2, Chroma's default space, so similarity scores do not depend on
+    the backend; for the unit-length embeddings returned by OpenAI and
+    DashScope this ranks exactly like cosine similarity.
+    """
+
+    def count(self):
+        raise NotImplementedError
+
+    def add(self, documents, recommendations, embeddings):
+        raise NotImplementedError
+
+    def query_batch(self, embeddings, n_results):
+        """Query several embeddings at once, one result list per embedding."""
+        raise NotImplementedError
+
+    def query(self, embedding, n_results):
+        """Return (document, recommendation, distance) tuples, nearest first."""
+        return self.query_batch([embedding], n_results)[0]
+
+
+class ChromaMemoryStore(MemoryStore):
+    """Ephemeral in-process Chroma collection (the original memory backend)."""
+
+    def __init__(self, name):
+        import chromadb
+        from chromadb.config import Settings
+
+        self.chroma_client = chromadb.Client(Settings(allow_reset=True))
+
+        # Try to get existing collection, create new one if it doesn't exist
+        try:
+            self.situation_collection = self.chroma_client.get_collection(name=name)
+        except Exception:
+            # Collection doesn't exist, create new one
+            self.situation_collection = self.chroma_client.create_collection(name=name)
+
+    def count(self):
+        return self.situation_collection.count()
+
+    def add(self, documents, recommendations, embeddings):
+        offset = self.situation_collection.count()
+        self.situation_collection.add(
+            documents=documents,
+            metadatas=[{"recommendation": rec} for rec in recommendations],
+            embeddings=embeddings,
+            ids=[str(offset + i) for i in range(len(documents))],
+        )
+
+    def query_batch(self, embeddings, n_results):
+        results = self.situation_collection.query(
+            query_embeddings=embeddings,
+            n_results=n_results,
+            include=["metadatas", "documents", "distances"],
+        )
+        return [
+            [
+                (document, metadata["recommendation"], distance)
+                for document, metadata, distance in zip(documents, metadatas, distances)
+            ]
+            for documents, metadatas, distances in zip(
+                results["documents"], results["metadatas"], results["distances"]
+            )
+        ]
+
+
+class NumpyMemoryStore(MemoryStore):
+    """Exact in-memory index over a contiguous float32 matrix.
+
+    Rows are appended into a preallocated matrix that doubles when full, and
+    queries are answered for a whole batch with one matrix product and an
+    argpartition top-k.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.documents = []
+        self.recommendations = []
+        self._vectors = None
+        self._lock = threading.Lock()
+
+    def count(self):
+        return len(self.documents)
+
+    def add(self, documents, recommendations, embeddings):
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(documents):
+            raise ValueError("Expected one embedding per document")
+
+        with self._lock:
+            rows = len(self.documents)
+            if self._vectors is None:
+                self._vectors = np.empty((max(len(vectors), 64), vectors.shape[1]), dtype=np.float32)
+            elif vectors.shape[1] != self._vectors.shape[1]:
+                raise ValueError(
+                    f"Embedding dimension {vectors.shape[1]} does not match store dimension {self._vectors.shape[1]}"
+                )
+
+            needed = rows + len(vectors)
+            if needed > len(self._vectors):
+                grown = np.empty((max(needed, 2 * len(self._vectors)), self._vectors.shape[1]), dtype=np.float32)
+                grown[:rows] = self._vectors[:rows]
+                self._vectors = grown
+
+            self._vectors[rows:needed] = vectors
+            self.documents.extend(documents)
+            self.recommendations.extend(recommendations)
+
+    def query_batch(self, embeddings, n_results):
+        with self._lock:
+            rows = len(self.documents)
+            if rows == 0 or n_results <= 0:
+                return [[] for _ in embeddings]
+            vectors = self._vectors[:rows]
+            documents = self.documents[:rows]
+            recommendations = self.recommendations[:rows]
+
+        distances = _squared_l2(vectors, np.asarray(embeddings, dtype=np.float32))
+        return [
+            [(documents[i], recommendations[i], float(row_distances[i])) for i in nearest]
+            for nearest, row_distances in zip(_top_k(distances, n_results), distances)
+        ]
+
+
+class HnswMemoryStore(MemoryStore):
+    """Approximate in-memory index (hnswlib HNSW graph) for large memories."""
+
+    def __init__(self, name, ef_construction=200, m=16, ef=50):
+        if not HNSWLIB_AVAILABLE:
+            raise ImportError("hnswlib is required for memory_backend='hnsw': pip install hnswlib")
+        self.name = name
+        self.ef_construction = ef_construction
+        self.m = m
+        self.ef = ef
+        self.documents = []
+        self.recommendations = []
+        self._index = None
+        self._lock = threading.Lock()
+
+    def count(self):
+        return len(self.documents)
+
+    def add(self, documents, recommendations, embeddings):
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(documents):
+            raise ValueError("Expected one embedding per document")
+
+        with self._lock:
+            rows = len(self.documents)
+            if self._index is None:
+                # hnswlib's "l2" space returns squared L2 distances
+                self._index = hnswlib.Index(space="l2", dim=vectors.shape[1])
+                self._index.init_index(
+                    max_elements=max(len(vectors), 1024),
+                    ef_construction=self.ef_construction,
+                    M=self.m,
+                )
+                self._index.set_ef(self.ef)
+
+            needed = rows + len(vectors)
+            if needed > self._index.get_max_elements():
+                self._index.resize_index(max(needed, 2 * self._index.get_max_elements()))
+
+            self._index.add_items(vectors, np.arange(rows, needed))
+            self.documents.extend(documents)
+            self.recommendations.extend(recommendations)
+
+    def query_batch(self, embeddings, n_results):
+        with self._lock:
+            rows = len(self.documents)
+            if rows == 0 or n_results <= 0:
+                return [[] for _ in embeddings]
+            k = min(n_results, rows)
+            # ef must be at least k for hnswlib to return k results
+            self._index.set_ef(max(self.ef, k))
+            labels, distances = self._index.knn_query(
+                np.asarray(embeddings, dtype=np.float32), k=k
+            )
+            documents = self.documents
+            recommendations = self.recommendations
+            return [
+                [
+                    (documents[label], recommendations[label], float(distance))
+                    for label, distance in zip(row_labels, row_distances)
+                ]
+                for row_labels, row_distances in zip(labels, distances)
+            ]
+
+
+class DiskMemoryStore(MemoryStore):
+    """Persistent, append-only memory stored under ``{directory}/{name}``.
+
+    Files:
+        vectors.f32    float32 rows, memory-mapped for queries
+        records.jsonl  one {"document", "recommendation"} line per row
+        records.idx    uint64 byte offset of each record line; a row only
+                       exists once its offset is written, so it is appended last
+        meta.json      embedding dimension
+
+    Opening a store only maps the files, so startup does not depend on how many
+    memories it holds, and adding situations appends to the files without
+    rewriting them.
+    """
+
+    def __init__(self, name, directory):
+        self.path = os.path.join(directory, name)
+        os.makedirs(self.path, exist_ok=True)
+
+        self._vectors_path = os.path.join(self.path, "vectors.f32")
+        self._records_path = os.path.join(self.path, "records.jsonl")
+        self._index_path = os.path.join(self.path, "records.idx")
+        self._meta_path = os.path.join(self.path, "meta.json")
+
+        self._lock = threading.Lock()
+        self._dim = None
+        self._vectors = None  # memmap of the first self._mapped_rows rows
+        self._mapped_rows = 0
+
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                self._dim = json.load(f)["dim"]
+
+    def count(self):
+        if not os.path.exists(self._index_path):
+            return 0
+        return os.path.getsize(self._index_path) // 8
+
+    def _get_vectors(self, rows):
+        """Map the first ``rows`` vectors, remapping only when the store has grown."""
+        if self._vectors is None or self._mapped_rows != rows:
+            self._vectors = np.memmap(
+                self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self._dim)
+            )
+            self._mapped_rows = rows
+        return self._vectors
+
+    def add(self, documents, recommendations, embeddings):
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(documents):
+            raise ValueError("Expected one embedding per document")
+
+        with self._lock:
+            if self._dim is None:
+                self._dim = int(vectors.shape[1])
+                with open(self._meta_path, "w", encoding="utf-8") as f:
+                    json.dump({"dim": self._dim}, f)
+            elif vectors.shape[1] != self._dim:
+                raise ValueError(
+                    f"Embedding dimension {vectors.shape[1]} does not match store dimension {self._dim}"
+                )
+
+            rows = self.count()
+
+            # drop a partially written tail left by an interrupted append
+            with open(self._vectors_path, "ab") as f:
+                f.truncate(rows * self._dim * 4)
+
+            offsets = []
+            with open(self._records_path, "ab") as f:
+                for document, recommendation in zip(documents, recommendations):
+                    offsets.append(f.tell())
+                    line = json.dumps(
+                        {"document": document, "recommendation": recommendation},
+                        ensure_ascii=False,
+                    )
+                    f.write(line.encode("utf-8") + b"\n")
+
+            with open(self._vectors_path, "ab") as f:
+                f.write(vectors.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+            with open(self._index_path, "ab") as f:
+                f.write(np.asarray(offsets, dtype=np.uint64).tobytes())
+
+    def _read_records(self, rows):
+        offsets = np.memmap(self._index_path, dtype=np.uint64, mode="r")
+        records = {}
+        with open(self._records_path, "rb") as f:
+            for row in rows:
+                if row not in records:
+                    f.seek(int(offsets[row]))
+                    records[row] = json.loads(f.readline())
+        return records
+
+    def query_batch(self, embeddings, n_results):
+        with self._lock:
+            rows = self.count()
+            if rows == 0 or n_results <= 0:
+                return [[] for _ in embeddings]
+            vectors = self._get_vectors(rows)
+
+        distances = _squared_l2(vectors, np.asarray(embeddings, dtype=np.float32))
+        nearest = _top_k(distances, n_results)
+        records = self._read_records(sorted({int(row) for row in nearest.ravel()}))
+
+        return [
+            [
+                (records[int(row)]["document"], records[int(row)]["recommendation"], float(row_distances[row]))
+                for row in row_nearest
+            ]
+            for row_nearest, row_distances in zip(nearest, distances)
+        ]
+
+
+# In-process stores are shared by name, like collections of the in-process Chroma client
+_shared_stores = {}
+_shared_stores_lock = threading.Lock()
+
+
+def create_memory_store(name, config):
+    """Create the memory backend selected by config["memory_backend"].
+
+    Backends:
+        "numpy"  exact in-memory index (default)
+        "hnsw"   approximate in-memory index, requires hnswlib
+        "chroma" in-process Chroma collection
+        "disk"   persistent memory-mapped store under config["memory_dir"]
+    """
+    backend = config.get("memory_backend", "numpy")
+    if backend == "chroma":
+        return ChromaMemoryStore(name)
+    if backend == "disk":
+        return DiskMemoryStore(name, config.get("memory_dir", "./memory"))
+    if backend not in ("numpy", "hnsw"):
+        raise ValueError(f"Unsupported memory backend: {backend}")
+
+    if backend == "hnsw" and not HNSWLIB_AVAILABLE:
+        print("⚠️ hnswlib not installed, falling back to the exact numpy memory index")
+        backend = "numpy"
+
+    with _shared_stores_lock:
+        store = _shared_stores.get((backend, name))
+        if store is None:
+            if backend == "hnsw":
+                store = HnswMemoryStore(
+                    name,
+                    ef_construction=config.get("memory_hnsw_ef_construction", 200),
+                    m=config.get("memory_hnsw_m", 16),
+                    ef=config.get("memory_hnsw_ef", 50),
+                )
+            else:
+                store = NumpyMemoryStore(name)
+            _shared_stores[(backend, name)] = store
+    return store
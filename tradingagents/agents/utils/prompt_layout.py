@@ -0,0 +1,60 @@
+from typing import Dict, List
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+from .context_compactor import REPORT_KEYS
+
+# Identical for every agent, so providers can reuse the cached prefix
+TEAM_SYSTEM_PROMPT = """You are a member of a multi-agent trading team: bull and bear researchers, a research manager, a trader, risky, safe and neutral risk analysts and a risk management judge. All of you work from the same analyst reports, given below. Your own role and task follow in the next message; answer only as that role."""
+
+_REPORT_TITLES = {
+    "market_report": "Market research report",
+    "sentiment_report": "Social media sentiment report",
+    "news_report": "Latest world affairs news",
+    "fundamentals_report": "Company fundamentals report",
+}
+
+
+def shared_context(state, reports: Dict[str, str]) -> str:
+    """The per-run context every agent prompt starts with.
+
+    Built the same way for every agent of a run (company, trade date and the
+    four reports in a fixed order), so it is byte-identical across calls.
+    """
+    sections = [
+        f"Company of interest: {state['company_of_interest']}",
+        f"Trade date: {state['trade_date']}",
+    ]
+    for key in REPORT_KEYS:
+        sections.append(f"{_REPORT_TITLES[key]}:\n{reports.get(key, '')}")
+    return "\n\n".join(sections)
+
+
+def _supports_cache_control(llm) -> bool:
+    """Anthropic caches a prefix only up to an explicit cache_control breakpoint."""
+    return getattr(llm, "_llm_type", "") == "anthropic-chat"
+
+
+def build_agent_messages(llm, state, reports: Dict[str, str], turn: str) -> List[BaseMessage]:
+    """Lay out an agent prompt as cacheable prefix + volatile turn.
+
+    The system message holds the team prompt and the shared reports, which
+    are the same for every agent in a run; the human message holds the
+    agent's role instructions and the per-call data (debate history, last
+    arguments, memories). OpenAI and DashScope reuse a repeated prefix
+    automatically; for Anthropic the prefix gets a cache_control breakpoint.
+
+    Args:
+        llm: Chat model the messages are sent to
+        state: Agent state (company and trade date)
+        reports: The four analyst reports, e.g. from ``compact_context``
+        turn: Role instructions and volatile data for this call
+    """
+    prefix = f"{TEAM_SYSTEM_PROMPT}\n\n{shared_context(state, reports)}"
+    if _supports_cache_control(llm):
+        system = SystemMessage(content=[
+            {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}}
+        ])
+    else:
+        system = SystemMessage(content=prefix)
+    return [system, HumanMessage(content=turn)]
@@ -6,12 +6,15 @@
 
 import json
 import os
+import threading
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any, Tuple, Union
 from dataclasses import dataclass, asdict
 from pathlib import Path
 from dotenv import load_dotenv
 
+from .usage_ledger import UsageLedger, usage_start_day
+
 try:
     from .mongodb_storage import MongoDBStorage
     MONGODB_AVAILABLE = True
@@ -40,6 +43,7 @@ class PricingConfig:
     input_price_per_1k: float  # 输入token价格（每1000个token）
     output_price_per_1k: float  # 输出token价格（每1000个token）
     currency: str = "CNY"  # 货币单位
+    cached_input_price_per_1k: Optional[float] = None  # 命中提示缓存的输入token价格，未设置时按输入价格
 
 
 @dataclass
@@ -53,6 +57,107 @@ class UsageRecord:
     cost: float  # 成本
     session_id: str  # 会话ID
     analysis_type: str  # 分析类型
+    cached_input_tokens: int = 0  # 输入token中命中提供商提示缓存的部分
+
+
+class PricingRegistry:
+    """
+    定价表
+
+    pricing.json 只在首次使用或文件变化（mtime/大小）时解析，按 (供应商, 模型)
+    建立字典索引，每次计费只需一次 stat 和一次字典查找
+    """
+
+    def __init__(self, pricing_file: Path):
+        self.pricing_file = Path(pricing_file)
+        self._prices: Dict[Tuple[str, str], PricingConfig] = {}
+        self._signature = None
+        self._lock = threading.Lock()
+
+    def _file_signature(self):
+        try:
+            stat = self.pricing_file.stat()
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def _refresh(self):
+        signature = self._file_signature()
+        if signature == self._signature:
+            return
+
+        with self._lock:
+            if signature == self._signature:
+                return
+
+            prices = {}
+            try:
+                with open(self.pricing_file, 'r', encoding='utf-8') as f:
+                    for item in json.load(f):
+                        pricing = PricingConfig(**item)
+                        # 与逐条匹配一致：重复配置以第一条为准
+                        prices.setdefault((pricing.provider, pricing.model_name), pricing)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"加载定价配置失败: {e}")
+
+            self._prices = prices
+            self._signature = signature
+
+    def invalidate(self):
+        """强制下次使用时重新加载"""
+        with self._lock:
+            self._signature = None
+
+    def get(self, provider: str, model_name: str) -> Optional[PricingConfig]:
+        """获取模型定价"""
+        self._refresh()
+        return self._prices.get((provider, model_name))
+
+    @staticmethod
+    def _cost(pricing: PricingConfig, input_tokens: int, output_tokens: int, cached_input_tokens: int) -> float:
+        cached_input_tokens = min(cached_input_tokens or 0, input_tokens)
+        cached_price = pricing.cached_input_price_per_1k
+        if cached_price is None:
+            cached_price = pricing.input_price_per_1k
+        input_cost = ((input_tokens - cached_input_tokens) / 1000) * pricing.input_price_per_1k
+        cached_cost = (cached_input_tokens / 1000) * cached_price
+        output_cost = (output_tokens / 1000) * pricing.output_price_per_1k
+        return round(input_cost + cached_cost + output_cost, 6)
+
+    def calculate_cost(self, provider: str, model_name: str, input_tokens: int, output_tokens: int,
+                       cached_input_tokens: int = 0) -> float:
+        """计算单次使用成本（input_tokens 包含命中缓存的 cached_input_tokens）"""
+        pricing = self.get(provider, model_name)
+        if pricing is None:
+            return 0.0
+        return self._cost(pricing, input_tokens, output_tokens, cached_input_tokens)
+
+    def calculate_costs(self, records: Iterable[Union["UsageRecord", Dict[str, Any]]]) -> List[float]:
+        """按当前定价批量计算使用记录的成本（只检查一次定价文件）"""
+        self._refresh()
+        prices = self._prices
+
+        costs = []
+        for record in records:
+            if isinstance(record, dict):
+                key = (record.get("provider"), record.get("model_name"))
+                input_tokens = record.get("input_tokens", 0)
+                output_tokens = record.get("output_tokens", 0)
+                cached_input_tokens = record.get("cached_input_tokens", 0)
+            else:
+                key = (record.provider, record.model_name)
+                input_tokens = record.input_tokens
+                output_tokens = record.output_tokens
+                cached_input_tokens = record.cached_input_tokens
+
+            pricing = prices.get(key)
+            if pricing is None:
+                costs.append(0.0)
+                continue
+            costs.append(self._cost(pricing, input_tokens, output_tokens, cached_input_tokens))
+        return costs
 
 
 class ConfigManager:
@@ -64,8 +169,10 @@ class ConfigManager:
 
         self.models_file = self.config_dir / "models.json"
         self.pricing_file = self.config_dir / "pricing.json"
-        self.usage_file = self.config_dir / "usage.json"
+        self.usage_file = self.config_dir / "usage.json"  # 旧格式，首次启动时迁移到 usage.jsonl
+        self.usage_ledger_file = self.config_dir / "usage.jsonl"
         self.settings_file = self.config_dir / "settings.json"
+        self.pricing_registry = PricingRegistry(self.pricing_file)
 
         # 加载.env文件（保持向后兼容）
         self._load_env_file()
@@ -76,6 +183,15 @@ class ConfigManager:
 
         self._init_default_configs()
 
+        # JSON文件存储：追加式账本，后台批量写入
+        settings = self.load_settings()
+        self.usage_ledger = UsageLedger(
+            self.usage_ledger_file,
+            legacy_path=self.usage_file,
+            max_records=settings.get("max_usage_records", 10000),
+            flush_interval=settings.get("usage_flush_interval", 1.0),
+        )
+
     def _load_env_file(self):
         """加载.env文件（保持向后兼容）"""
         # 尝试从项目根目录加载.env文件
@@ -208,6 +324,7 @@ class ConfigManager:
                 "currency_preference": "CNY",
                 "auto_save_usage": True,
                 "max_usage_records": 10000,
+                "usage_flush_interval": 1.0,  # 使用记录批量写入间隔（秒）
                 "data_dir": default_data_dir,  # 数据目录配置
                 "cache_dir": os.path.join(default_data_dir, "cache"),  # 缓存目录
                 "results_dir": os.path.join(os.path.expanduser("~"), "Documents", "TradingAgents", "results"),  # 结果目录
@@ -263,33 +380,29 @@ class ConfigManager:
                 json.dump(data, f, ensure_ascii=False, indent=2)
         except Exception as e:
             print(f"保存定价配置失败: {e}")
+        self.pricing_registry.invalidate()
     
     def load_usage_records(self) -> List[UsageRecord]:
         """加载使用记录"""
         try:
-            if not self.usage_file.exists():
-                return []
-            with open(self.usage_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return [UsageRecord(**item) for item in data]
+            return [UsageRecord(**item) for item in self.usage_ledger.read_records()]
         except Exception as e:
             print(f"加载使用记录失败: {e}")
             return []
     
     def save_usage_records(self, records: List[UsageRecord]):
-        """保存使用记录"""
+        """保存使用记录（替换全部记录）"""
         try:
-            data = [asdict(record) for record in records]
-            with open(self.usage_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self.usage_ledger.rewrite([asdict(record) for record in records])
         except Exception as e:
             print(f"保存使用记录失败: {e}")
     
     def add_usage_record(self, provider: str, model_name: str, input_tokens: int, 
-                        output_tokens: int, session_id: str, analysis_type: str = "stock_analysis"):
+                        output_tokens: int, session_id: str, analysis_type: str = "stock_analysis",
+                        cached_input_tokens: int = 0):
         """添加使用记录"""
         # 计算成本
-        cost = self.calculate_cost(provider, model_name, input_tokens, output_tokens)
+        cost = self.calculate_cost(provider, model_name, input_tokens, output_tokens, cached_input_tokens)
         
         record = UsageRecord(
             timestamp=datetime.now().isoformat(),
@@ -299,7 +412,8 @@ class ConfigManager:
             output_tokens=output_tokens,
             cost=cost,
             session_id=session_id,
-            analysis_type=analysis_type
+            analysis_type=analysis_type,
+            cached_input_tokens=cached_input_tokens
         )
         
         # 优先使用MongoDB存储
@@ -310,30 +424,20 @@ class ConfigManager:
             else:
                 print("⚠️ MongoDB保存失败，回退到JSON文件存储")
         
-        # 回退到JSON文件存储
-        records = self.load_usage_records()
-        records.append(record)
-        
-        # 限制记录数量
-        settings = self.load_settings()
-        max_records = settings.get("max_usage_records", 10000)
-        if len(records) > max_records:
-            records = records[-max_records:]
-        
-        self.save_usage_records(records)
+        # 回退到JSON文件存储（追加到账本，超过max_usage_records时由账本压缩）
+        self.usage_ledger.append(asdict(record))
         return record
     
-    def calculate_cost(self, provider: str, model_name: str, input_tokens: int, output_tokens: int) -> float:
+    def calculate_cost(self, provider: str, model_name: str, input_tokens: int, output_tokens: int,
+                       cached_input_tokens: int = 0) -> float:
         """计算使用成本"""
-        pricing_configs = self.load_pricing()
-        
-        for pricing in pricing_configs:
-            if pricing.provider == provider and pricing.model_name == model_name:
-                input_cost = (input_tokens / 1000) * pricing.input_price_per_1k
-                output_cost = (output_tokens / 1000) * pricing.output_price_per_1k
-                return round(input_cost + output_cost, 6)
-        
-        return 0.0
+        return self.pricing_registry.calculate_cost(
+            provider, model_name, input_tokens, output_tokens, cached_input_tokens
+        )
+    
+    def calculate_costs(self, records: Iterable[Union[UsageRecord, Dict[str, Any]]]) -> List[float]:
+        """按当前定价批量计算多条使用记录的成本（用于报表）"""
+        return self.pricing_registry.calculate_costs(records)
     
     def load_settings(self) -> Dict[str, Any]:
         """加载设置，合并.env中的配置"""
@@ -388,6 +492,11 @@ class ConfigManager:
                 json.dump(settings, f, ensure_ascii=False, indent=2)
         except Exception as e:
             print(f"保存设置失败: {e}")
+
+        usage_ledger = getattr(self, "usage_ledger", None)
+        if usage_ledger is not None:
+            usage_ledger.max_records = settings.get("max_usage_records", usage_ledger.max_records)
+            usage_ledger.flush_interval = settings.get("usage_flush_interval", usage_ledger.flush_interval)
     
     def get_enabled_models(self) -> List[ModelConfig]:
         """获取启用的模型"""
@@ -403,7 +512,7 @@ class ConfigManager:
         return None
     
     def get_usage_statistics(self, days: int = 30) -> Dict[str, Any]:
-        """获取使用统计"""
+        """获取使用统计（最近 days 个自然日，含今天）"""
         # 优先使用MongoDB获取统计
         if self.mongodb_storage and self.mongodb_storage.is_connected():
             try:
@@ -419,50 +528,18 @@ class ConfigManager:
             except Exception as e:
                 print(f"⚠️ MongoDB统计获取失败，回退到JSON文件: {e}")
         
-        # 回退到JSON文件统计
-        records = self.load_usage_records()
-        
-        # 过滤最近N天的记录
-        from datetime import datetime, timedelta
-        cutoff_date = datetime.now() - timedelta(days=days)
-        
-        recent_records = []
-        for record in records:
-            try:
-                record_date = datetime.fromisoformat(record.timestamp)
-                if record_date >= cutoff_date:
-                    recent_records.append(record)
-            except:
-                continue
-        
-        # 统计数据
-        total_cost = sum(record.cost for record in recent_records)
-        total_input_tokens = sum(record.input_tokens for record in recent_records)
-        total_output_tokens = sum(record.output_tokens for record in recent_records)
-        
-        # 按供应商统计
-        provider_stats = {}
-        for record in recent_records:
-            if record.provider not in provider_stats:
-                provider_stats[record.provider] = {
-                    "cost": 0,
-                    "input_tokens": 0,
-                    "output_tokens": 0,
-                    "requests": 0
-                }
-            provider_stats[record.provider]["cost"] += record.cost
-            provider_stats[record.provider]["input_tokens"] += record.input_tokens
-            provider_stats[record.provider]["output_tokens"] += record.output_tokens
-            provider_stats[record.provider]["requests"] += 1
+        # 回退到JSON文件统计：使用账本维护的按日汇总
+        summary = self.usage_ledger.summarize(usage_start_day(days))
         
         return {
             "period_days": days,
-            "total_cost": round(total_cost, 4),
-            "total_input_tokens": total_input_tokens,
-            "total_output_tokens": total_output_tokens,
-            "total_requests": len(recent_records),
-            "provider_stats": provider_stats,
-            "records_count": len(recent_records)
+            "total_cost": round(summary["total_cost"], 4),
+            "total_input_tokens": summary["total_input_tokens"],
+            "total_output_tokens": summary["total_output_tokens"],
+            "total_cached_input_tokens": summary["total_cached_input_tokens"],
+            "total_requests": summary["total_requests"],
+            "provider_stats": summary["provider_stats"],
+            "records_count": summary["total_requests"]
         }
     
     def get_data_dir(self) -> str:
@@ -516,8 +593,13 @@ class TokenTracker:
         self.config_manager = config_manager
 
     def track_usage(self, provider: str, model_name: str, input_tokens: int,
-                   output_tokens: int, session_id: str = None, analysis_type: str = "stock_analysis"):
-        """跟踪Token使用"""
+                   output_tokens: int, session_id: str = None, analysis_type: str = "stock_analysis",
+                   cached_input_tokens: int = 0):
+        """
+        跟踪Token使用
+
+        input_tokens 为全部输入token，cached_input_tokens 为其中命中提供商提示缓存的部分
+        """
         if session_id is None:
             session_id = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
@@ -533,7 +615,8 @@ class TokenTracker:
             input_tokens=input_tokens,
             output_tokens=output_tokens,
             session_id=session_id,
-            analysis_type=analysis_type
+            analysis_type=analysis_type,
+            cached_input_tokens=cached_input_tokens
         )
 
         # 检查成本警告
@@ -9,10 +9,11 @@ from datetime import datetime
 from typing import Dict, List, Optional, Any
 from dataclasses import asdict
 from .config_manager import UsageRecord
+from .usage_ledger import usage_start_day
 
 try:
-    from pymongo import MongoClient
-    from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+    from pymongo import MongoClient, UpdateOne
+    from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError, DuplicateKeyError
     MONGODB_AVAILABLE = True
 except ImportError:
     MONGODB_AVAILABLE = False
@@ -38,10 +39,16 @@ class MongoDBStorage:
         
         self.database_name = database_name
         self.collection_name = "token_usage"
+        # 按 日期 × 供应商 × 模型 预聚合的日汇总，写入记录时增量更新
+        self.daily_collection_name = "token_usage_daily"
+        # 记录日汇总回填状态的标记文档，保证只有一个进程执行回填
+        self.meta_collection_name = "token_usage_meta"
         
         self.client = None
         self.db = None
         self.collection = None
+        self.daily_collection = None
+        self.meta_collection = None
         self._connected = False
         
         # 尝试连接
@@ -59,10 +66,15 @@ class MongoDBStorage:
             
             self.db = self.client[self.database_name]
             self.collection = self.db[self.collection_name]
+            self.daily_collection = self.db[self.daily_collection_name]
+            self.meta_collection = self.db[self.meta_collection_name]
             
             # 创建索引以提高查询性能
             self._create_indexes()
             
+            # 首次使用日汇总时，从已有记录回填
+            self._backfill_daily_rollup()
+            
             self._connected = True
             print(f"✅ MongoDB连接成功: {self.database_name}.{self.collection_name}")
             
@@ -90,9 +102,101 @@ class MongoDBStorage:
             # 创建分析类型索引
             self.collection.create_index("analysis_type")
             
+            # 日汇总：每个 日期 × 供应商 × 模型 一条文档
+            self.daily_collection.create_index(
+                [("date", 1), ("provider", 1), ("model_name", 1)],
+                unique=True
+            )
+            
         except Exception as e:
             print(f"创建MongoDB索引失败: {e}")
     
+    def _backfill_daily_rollup(self):
+        """
+        用一次聚合从原始记录构建日汇总（每个数据库只执行一次）
+        
+        先以唯一的 _id 插入标记文档，插入成功的进程才执行回填，多个进程同时启动也不会重复累加；
+        回填用 $max 写入聚合结果而不是 $inc，回填期间其他进程写入记录时累加的数值不会被重复计算
+        """
+        marker_id = "daily_rollup_backfill"
+        try:
+            self.meta_collection.insert_one({
+                '_id': marker_id,
+                'status': 'running',
+                'started_at': datetime.now()
+            })
+        except DuplicateKeyError:
+            # 已由其他进程回填（或正在回填）
+            return
+        except Exception as e:
+            print(f"构建MongoDB日汇总失败: {e}")
+            return
+        
+        try:
+            pipeline = [
+                {
+                    '$group': {
+                        '_id': {
+                            'date': {'$substrCP': ['$timestamp', 0, 10]},
+                            'provider': '$provider',
+                            'model_name': '$model_name'
+                        },
+                        'cost': {'$sum': '$cost'},
+                        'input_tokens': {'$sum': '$input_tokens'},
+                        'output_tokens': {'$sum': '$output_tokens'},
+                        'cached_input_tokens': {'$sum': '$cached_input_tokens'},
+                        'requests': {'$sum': 1}
+                    }
+                }
+            ]
+            # 聚合结果和实时累加的数值都不超过真实总量，取较大者不会重复计算
+            operations = [
+                UpdateOne(
+                    dict(result['_id']),
+                    {'$max': {
+                        'cost': result['cost'],
+                        'input_tokens': result['input_tokens'],
+                        'output_tokens': result['output_tokens'],
+                        'cached_input_tokens': result['cached_input_tokens'],
+                        'requests': result['requests']
+                    }},
+                    upsert=True
+                )
+                for result in self.collection.aggregate(pipeline)
+            ]
+            if operations:
+                self.daily_collection.bulk_write(operations, ordered=False)
+                print(f"✅ 已从原始记录构建 {len(operations)} 条日汇总")
+            self.meta_collection.update_one(
+                {'_id': marker_id},
+                {'$set': {'status': 'done', 'finished_at': datetime.now()}}
+            )
+        except Exception as e:
+            print(f"构建MongoDB日汇总失败: {e}")
+            # 删除标记，下次启动时重新回填
+            try:
+                self.meta_collection.delete_one({'_id': marker_id})
+            except Exception:
+                pass
+    
+    def _update_daily_rollup(self, record_dict: Dict[str, Any]):
+        """把一条记录累加到日汇总"""
+        self.daily_collection.update_one(
+            {
+                'date': str(record_dict['timestamp'])[:10],
+                'provider': record_dict['provider'],
+                'model_name': record_dict['model_name']
+            },
+            {'$inc': {
+                'cost': record_dict['cost'],
+                'input_tokens': record_dict['input_tokens'],
+                'output_tokens': record_dict['output_tokens'],
+                'cached_input_tokens': record_dict.get('cached_input_tokens', 0),
+                'requests': 1
+            }},
+            upsert=True
+        )
+    
     def is_connected(self) -> bool:
         """检查是否连接到MongoDB"""
         return self._connected
@@ -113,6 +217,10 @@ class MongoDBStorage:
             result = self.collection.insert_one(record_dict)
             
             if result.inserted_id:
+                try:
+                    self._update_daily_rollup(record_dict)
+                except Exception as e:
+                    print(f"更新MongoDB日汇总失败: {e}")
                 return True
             else:
                 print("MongoDB插入失败：未返回插入ID")
@@ -158,95 +266,56 @@ class MongoDBStorage:
             print(f"从MongoDB加载记录失败: {e}")
             return []
     
+    def _load_daily_rollup(self, days: int) -> List[Dict[str, Any]]:
+        """读取最近 days 个自然日（含今天）的日汇总"""
+        return list(self.daily_collection.find(
+            {'date': {'$gte': usage_start_day(days)}},
+            {'_id': 0}
+        ))
+    
     def get_usage_statistics(self, days: int = 30) -> Dict[str, Any]:
-        """从MongoDB获取使用统计"""
+        """从MongoDB日汇总获取使用统计（最近 days 个自然日，含今天）"""
         if not self._connected:
             return {}
         
         try:
-            from datetime import timedelta
-            cutoff_date = datetime.now() - timedelta(days=days)
-            
-            # 聚合查询
-            pipeline = [
-                {
-                    '$match': {
-                        'timestamp': {'$gte': cutoff_date.isoformat()}
-                    }
-                },
-                {
-                    '$group': {
-                        '_id': None,
-                        'total_cost': {'$sum': '$cost'},
-                        'total_input_tokens': {'$sum': '$input_tokens'},
-                        'total_output_tokens': {'$sum': '$output_tokens'},
-                        'total_requests': {'$sum': 1}
-                    }
-                }
-            ]
-            
-            result = list(self.collection.aggregate(pipeline))
-            
-            if result:
-                stats = result[0]
-                return {
-                    'period_days': days,
-                    'total_cost': round(stats.get('total_cost', 0), 4),
-                    'total_input_tokens': stats.get('total_input_tokens', 0),
-                    'total_output_tokens': stats.get('total_output_tokens', 0),
-                    'total_requests': stats.get('total_requests', 0)
-                }
-            else:
-                return {
-                    'period_days': days,
-                    'total_cost': 0,
-                    'total_input_tokens': 0,
-                    'total_output_tokens': 0,
-                    'total_requests': 0
-                }
+            rows = self._load_daily_rollup(days)
+            return {
+                'period_days': days,
+                'total_cost': round(sum(row.get('cost', 0) for row in rows), 4),
+                'total_input_tokens': sum(row.get('input_tokens', 0) for row in rows),
+                'total_output_tokens': sum(row.get('output_tokens', 0) for row in rows),
+                'total_cached_input_tokens': sum(row.get('cached_input_tokens', 0) for row in rows),
+                'total_requests': sum(row.get('requests', 0) for row in rows)
+            }
                 
         except Exception as e:
             print(f"获取MongoDB统计失败: {e}")
             return {}
     
     def get_provider_statistics(self, days: int = 30) -> Dict[str, Dict[str, Any]]:
-        """按供应商获取统计信息"""
+        """按供应商获取统计信息（来自日汇总）"""
         if not self._connected:
             return {}
         
         try:
-            from datetime import timedelta
-            cutoff_date = datetime.now() - timedelta(days=days)
-            
-            # 按供应商聚合
-            pipeline = [
-                {
-                    '$match': {
-                        'timestamp': {'$gte': cutoff_date.isoformat()}
-                    }
-                },
-                {
-                    '$group': {
-                        '_id': '$provider',
-                        'cost': {'$sum': '$cost'},
-                        'input_tokens': {'$sum': '$input_tokens'},
-                        'output_tokens': {'$sum': '$output_tokens'},
-                        'requests': {'$sum': 1}
-                    }
-                }
-            ]
-            
-            results = list(self.collection.aggregate(pipeline))
-            
             provider_stats = {}
-            for result in results:
-                provider = result['_id']
-                provider_stats[provider] = {
-                    'cost': round(result.get('cost', 0), 4),
-                    'input_tokens': result.get('input_tokens', 0),
-                    'output_tokens': result.get('output_tokens', 0),
-                    'requests': result.get('requests', 0)
-                }
+            for row in self._load_daily_rollup(days):
+                stats = provider_stats.setdefault(row['provider'], {
+                    'cost': 0,
+                    'input_tokens': 0,
+                    'output_tokens': 0,
+                    'cached_input_tokens': 0,
+                    'requests': 0
+                })
+                stats['cost'] += row.get('cost', 0)
+                stats['input_tokens'] += row.get('input_tokens', 0)
+                stats['output_tokens'] += row.get('output_tokens', 0)
+                stats['cached_input_tokens'] += row.get('cached_input_tokens', 0)
+                stats['requests'] += row.get('requests', 0)
+            
+            for stats in provider_stats.values():
+                stats['cost'] = round(stats['cost'], 4)
             
             return provider_stats
             
@@ -268,6 +337,12 @@ class MongoDBStorage:
             })
             
             deleted_count = result.deleted_count
+            
+            # 日汇总只保留完整保留下来的日期
+            self.daily_collection.delete_many({
+                'date': {'$lt': cutoff_date.date().isoformat()}
+            })
+            
             if deleted_count > 0:
                 print(f"清理了 {deleted_count} 条超过 {days} 天的记录")
             
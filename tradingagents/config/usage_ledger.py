@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+使用记录账本
+以 JSON Lines 追加写入使用记录，后台线程批量刷盘，支持多线程/多进程安全追加与压缩
+"""
+
+import atexit
+import json
+import os
+import threading
+from bisect import bisect_left, insort
+from contextlib import contextmanager
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    try:
+        import msvcrt
+    except ImportError:
+        msvcrt = None
+
+
+def usage_start_day(days: int) -> str:
+    """最近 days 个自然日（含今天）的起始日期 YYYY-MM-DD"""
+    return (date.today() - timedelta(days=max(days, 1) - 1)).isoformat()
+
+
+@contextmanager
+def _locked(lock_path: Path):
+    """跨进程文件锁（POSIX 使用 flock，Windows 使用 msvcrt.locking）"""
+    with open(lock_path, "a+b") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class UsageRollup:
+    """按 日期 × 供应商 × 模型 累计的使用量，查询N天统计只需遍历N个日期"""
+
+    def __init__(self):
+        self.day_keys: List[str] = []  # 有序的日期列表 (YYYY-MM-DD)
+        # 日期 -> (供应商, 模型) -> [成本, 输入token, 输出token, 请求数, 缓存命中的输入token]
+        self.days: Dict[str, Dict[Tuple[str, str], List[float]]] = {}
+
+    def add(self, record: Dict[str, Any]):
+        # ISO 时间戳的前10位即日期，无需解析
+        day = str(record.get("timestamp", ""))[:10]
+        buckets = self.days.get(day)
+        if buckets is None:
+            buckets = self.days[day] = {}
+            insort(self.day_keys, day)
+
+        key = (record.get("provider", ""), record.get("model_name", ""))
+        counters = buckets.get(key)
+        if counters is None:
+            counters = buckets[key] = [0.0, 0, 0, 0, 0]
+        counters[0] += record.get("cost", 0) or 0
+        counters[1] += record.get("input_tokens", 0) or 0
+        counters[2] += record.get("output_tokens", 0) or 0
+        counters[3] += 1
+        counters[4] += record.get("cached_input_tokens", 0) or 0
+
+    def summarize(self, start_day: str) -> Dict[str, Any]:
+        """汇总 start_day（含）之后的使用量"""
+        total_cost = 0.0
+        total_input_tokens = 0
+        total_output_tokens = 0
+        total_cached_input_tokens = 0
+        total_requests = 0
+        provider_stats: Dict[str, Dict[str, Any]] = {}
+
+        for day in self.day_keys[bisect_left(self.day_keys, start_day):]:
+            for (provider, _model), counters in self.days[day].items():
+                cost, input_tokens, output_tokens, requests, cached_input_tokens = counters
+                stats = provider_stats.get(provider)
+                if stats is None:
+                    stats = provider_stats[provider] = {
+                        "cost": 0,
+                        "input_tokens": 0,
+                        "output_tokens": 0,
+                        "cached_input_tokens": 0,
+                        "requests": 0
+                    }
+                stats["cost"] += cost
+                stats["input_tokens"] += input_tokens
+                stats["output_tokens"] += output_tokens
+                stats["cached_input_tokens"] += cached_input_tokens
+                stats["requests"] += requests
+
+                total_cost += cost
+                total_input_tokens += input_tokens
+                total_output_tokens += output_tokens
+                total_cached_input_tokens += cached_input_tokens
+                total_requests += requests
+
+        return {
+            "total_cost": total_cost,
+            "total_input_tokens": total_input_tokens,
+            "total_output_tokens": total_output_tokens,
+            "total_cached_input_tokens": total_cached_input_tokens,
+            "total_requests": total_requests,
+            "provider_stats": provider_stats,
+        }
+
+
+class UsageLedger:
+    """
+    追加式使用记录账本
+
+    每条记录是 usage.jsonl 中的一行。append() 只把记录放入内存缓冲区，
+    后台线程每 flush_interval 秒（或缓冲区达到 batch_size 条时）在文件锁下
+    一次性追加写入，因此每次记录的开销与历史记录数量无关。记录数超过
+    max_records * compact_ratio 时压缩文件，只保留最近 max_records 条。
+
+    首次查询统计时从文件构建 UsageRollup，之后在追加时（包括其他进程的追加，
+    刷盘时按文件增量读取）增量更新，统计查询不再扫描全部记录。
+    """
+
+    def __init__(self, path: Path, legacy_path: Optional[Path] = None,
+                 max_records: int = 10000, flush_interval: float = 1.0,
+                 batch_size: int = 256, compact_ratio: float = 1.5):
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+        self.max_records = max_records
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.compact_ratio = compact_ratio
+
+        self._buffer: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._line_count = 0
+        self._known_size = None  # 已计入 _line_count 的文件字节数
+        self._rollup: Optional[UsageRollup] = None  # 文件记录 + 缓冲区记录的汇总
+        self._writer = None
+        self._closed = False
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if legacy_path is not None:
+            self._migrate_legacy(Path(legacy_path))
+
+        atexit.register(self.close)
+
+    def _migrate_legacy(self, legacy_path: Path):
+        """把旧的 usage.json 一次性转换为 JSON Lines"""
+        if self.path.exists() or not legacy_path.exists():
+            return
+        try:
+            with open(legacy_path, 'r', encoding='utf-8') as f:
+                records = json.load(f)
+            with _locked(self.lock_path):
+                if not self.path.exists():
+                    self._write_all(records)
+            print(f"✅ 使用记录已迁移到 {self.path}")
+        except Exception as e:
+            print(f"⚠️ 迁移使用记录失败: {e}")
+
+    def _ensure_writer(self):
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(
+                target=self._writer_loop, name="usage-ledger-writer", daemon=True
+            )
+            self._writer.start()
+
+    def _writer_loop(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ 写入使用记录失败: {e}")
+
+    def append(self, record: Dict[str, Any]):
+        """追加一条记录（异步刷盘）"""
+        with self._lock:
+            self._buffer.append(record)
+            if self._rollup is not None:
+                self._rollup.add(record)
+            pending = len(self._buffer)
+            closed = self._closed
+            if not closed:
+                self._ensure_writer()
+
+        if closed:
+            # 账本已关闭（进程退出中），直接同步写入
+            self.flush()
+        elif pending >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self):
+        """把缓冲区中的记录写入文件"""
+        with self._flush_lock:
+            with self._lock:
+                records, self._buffer = self._buffer, []
+            if not records:
+                return
+
+            data = "".join(
+                json.dumps(record, ensure_ascii=False) + "\n" for record in records
+            ).encode("utf-8")
+
+            with _locked(self.lock_path):
+                self._catch_up()
+                # 单次 O_APPEND 写入，其他进程的追加不会交错
+                with open(self.path, "ab") as f:
+                    f.write(data)
+                self._line_count += len(records)
+                self._known_size += len(data)
+
+                if self._line_count > self.max_records * self.compact_ratio:
+                    self._compact()
+
+    def _catch_up(self):
+        """计入其他进程追加的记录（调用方需持有文件锁）"""
+        size = self.path.stat().st_size if self.path.exists() else 0
+        if self._known_size is None or size < self._known_size:
+            # 首次使用或文件已被其他进程压缩，重新计数
+            self._known_size = 0
+            self._line_count = 0
+            with self._lock:
+                self._rollup = None
+        if size == self._known_size:
+            return
+
+        with open(self.path, "rb") as f:
+            f.seek(self._known_size)
+            tail = f.read(size - self._known_size)
+        self._known_size += len(tail)
+        self._line_count += tail.count(b"\n")
+
+        with self._lock:
+            if self._rollup is not None:
+                for record in self._parse_lines(tail.decode("utf-8", errors="replace").splitlines()):
+                    self._rollup.add(record)
+
+    @staticmethod
+    def _parse_lines(lines) -> List[Dict[str, Any]]:
+        records = []
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                # 跳过被中断写入的残缺行
+                continue
+        return records
+
+    def _read_all(self) -> List[Dict[str, Any]]:
+        if not self.path.exists():
+            return []
+        with open(self.path, "r", encoding="utf-8") as f:
+            return self._parse_lines(f)
+
+    def _write_all(self, records: List[Dict[str, Any]]):
+        """原子替换整个文件（调用方需持有文件锁）"""
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+        self._line_count = len(records)
+        self._known_size = self.path.stat().st_size
+        with self._lock:
+            # 下次查询统计时重新构建
+            self._rollup = None
+
+    def _compact(self):
+        """只保留最近 max_records 条记录（调用方需持有文件锁）"""
+        records = self._read_all()
+        self._write_all(records[-self.max_records:])
+
+    def read_records(self) -> List[Dict[str, Any]]:
+        """读取所有记录（包括尚未刷盘的记录）"""
+        self.flush()
+        with _locked(self.lock_path):
+            return self._read_all()
+
+    def summarize(self, start_day: str) -> Dict[str, Any]:
+        """
+        汇总 start_day（YYYY-MM-DD，含）之后的使用量
+
+        Returns:
+            total_cost / total_input_tokens / total_output_tokens /
+            total_cached_input_tokens / total_requests / provider_stats
+        """
+        with self._flush_lock, _locked(self.lock_path):
+            # 其他进程压缩过文件时 _catch_up 会丢弃汇总
+            self._catch_up()
+            if self._rollup is None:
+                self._rebuild_rollup()
+            with self._lock:
+                return self._rollup.summarize(start_day)
+
+    def _rebuild_rollup(self):
+        """从文件和缓冲区重新构建汇总（调用方需持有 _flush_lock 和文件锁）"""
+        # 持有 _flush_lock 时没有刷盘在进行，文件 + 缓冲区即全部记录
+        records = self._read_all()
+        self._known_size = self.path.stat().st_size if self.path.exists() else 0
+        self._line_count = len(records)
+
+        rollup = UsageRollup()
+        for record in records:
+            rollup.add(record)
+        with self._lock:
+            for record in self._buffer:
+                rollup.add(record)
+            self._rollup = rollup
+
+    def rewrite(self, records: List[Dict[str, Any]]):
+        """用给定记录替换账本内容"""
+        self.flush()
+        with _locked(self.lock_path):
+            self._write_all(records[-self.max_records:])
+
+    def close(self):
+        """停止后台线程并刷盘"""
+        self._closed = True
+        self._wakeup.set()
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"⚠️ 写入使用记录失败: {e}")
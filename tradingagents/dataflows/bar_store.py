@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Range-Aware OHLCV Bar Store
+Keeps one merged daily bar series per (source, symbol) together with the date
+intervals it covers. A request for any date range is answered from the stored
+bars and only the missing head, tail or inner gaps are fetched, so a backtest
+that slides its window one day at a time makes one tiny fetch per step instead
+of re-downloading the whole range
+
+Bars of finished sessions never change and are kept for good; bars on or after
+the day they were fetched (the current session, by the exchange's calendar
+date) are refetched once older than live_ttl seconds
+
+Sources restate past prices after a split, so each gap is fetched together with
+a stored bar next to it; when that bar's prices changed the symbol's stored
+bars no longer line up with new ones and the requested range is refetched whole
+"""
+
+import os
+import pickle
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import get_config
+
+DateRange = Tuple[date, date]
+
+# fetch(symbol, start_date, end_date) -> bars between the dates (inclusive, YYYY-MM-DD),
+# indexed by date or with a Date column; None or an exception means the fetch failed,
+# an empty frame that there is nothing to store
+BarFetcher = Callable[[str, str, str], Optional[pd.DataFrame]]
+
+_ONE_DAY = timedelta(days=1)
+
+# A stored bar refetched with a gap is only looked for this close to the gap
+_ANCHOR_MAX_DAYS = 14
+# Relative price change of the refetched bar treated as a restatement (split etc.)
+_RESTATED_RTOL = 1e-3
+
+# Exchange time zone of each source; decides which session is still in progress
+SOURCE_TIMEZONES = {
+    "yfinance": "America/New_York",
+    "tdx": "Asia/Shanghai",
+}
+
+
+def _to_date(value) -> date:
+    return pd.Timestamp(value).date()
+
+
+def _exchange_date(timestamp: float, timezone: Optional[str]) -> date:
+    """Calendar date at the exchange for a Unix timestamp (host time zone if None)"""
+    return pd.Timestamp.fromtimestamp(timestamp, tz=timezone).date()
+
+
+def exchange_today(source: str) -> date:
+    """Current calendar date at the exchange of a source"""
+    return _exchange_date(time.time(), SOURCE_TIMEZONES.get(source))
+
+
+def _merge_ranges(ranges: List[DateRange]) -> List[DateRange]:
+    """Merge overlapping or adjacent date ranges"""
+    merged: List[DateRange] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + _ONE_DAY:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def missing_ranges(start: date, end: date, covered: List[DateRange]) -> List[DateRange]:
+    """
+    Get the parts of [start, end] not in the covered ranges
+
+    Args:
+        start: First date requested
+        end: Last date requested
+        covered: Merged, sorted covered ranges
+
+    Returns:
+        Sorted list of (start, end) gaps
+    """
+    gaps = []
+    cursor = start
+    for covered_start, covered_end in covered:
+        if covered_end < cursor:
+            continue
+        if covered_start > end:
+            break
+        if covered_start > cursor:
+            gaps.append((cursor, covered_start - _ONE_DAY))
+        cursor = max(cursor, covered_end + _ONE_DAY)
+        if cursor > end:
+            break
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def normalize_bars(data: pd.DataFrame) -> pd.DataFrame:
+    """Index fetched bars by naive trading date, one row per date"""
+    data = data.copy()
+    if "Date" in data.columns:
+        data = data.set_index("Date")
+    index = pd.DatetimeIndex(pd.to_datetime(data.index))
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    data.index = index.normalize().rename("Date")
+    data = data[~data.index.duplicated(keep="last")]
+    return data.sort_index()
+
+
+class _SymbolBars:
+    """Stored bars of one symbol and the date ranges they cover"""
+
+    __slots__ = ("bars", "final", "live", "mtime")
+
+    def __init__(self):
+        self.bars = pd.DataFrame()
+        # Ranges of finished sessions, never refetched
+        self.final: List[DateRange] = []
+        # (start, end, fetched_at) of the range fetched on or after the fetch day
+        self.live: Optional[Tuple[date, date, float]] = None
+        self.mtime = 0.0
+
+
+class BarStore:
+    """Bar Store - Incremental, range-aware cache of daily OHLCV bars"""
+
+    def __init__(self, cache_dir: str = None, live_ttl: float = 900.0, max_symbols: int = 256):
+        """
+        Initialize bar store
+
+        Args:
+            cache_dir: Directory the bars are persisted in, defaults to {data_cache_dir}/bar_store
+            live_ttl: Seconds the bars of the current session are reused before refetching
+            max_symbols: Maximum number of symbols kept in memory (the rest reload from disk)
+        """
+        if cache_dir is None:
+            cache_dir = os.path.join(get_config()["data_cache_dir"], "bar_store")
+
+        self.cache_dir = Path(cache_dir)
+        self.live_ttl = live_ttl
+        self.max_symbols = max_symbols
+
+        self._symbols: "OrderedDict[Tuple[str, str], _SymbolBars]" = OrderedDict()
+        self._symbol_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.fetches = 0
+        self.full_hits = 0
+
+    def _path(self, source: str, symbol: str) -> Path:
+        safe_symbol = re.sub(r"[^\w.\-^]", "_", symbol)
+        return self.cache_dir / source / f"{safe_symbol}.pkl"
+
+    def _symbol_lock(self, key: Tuple[str, str]) -> threading.Lock:
+        with self._lock:
+            lock = self._symbol_locks.get(key)
+            if lock is None:
+                lock = self._symbol_locks[key] = threading.Lock()
+            return lock
+
+    def _load(self, source: str, symbol: str) -> _SymbolBars:
+        """Get the in-memory entry, reloading it when another process saved newer bars"""
+        key = (source, symbol)
+        path = self._path(source, symbol)
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            mtime = 0.0
+
+        with self._lock:
+            entry = self._symbols.get(key)
+            if entry is not None:
+                self._symbols.move_to_end(key)
+        if entry is not None and entry.mtime >= mtime:
+            return entry
+
+        entry = _SymbolBars()
+        if mtime:
+            try:
+                with open(path, "rb") as f:
+                    saved = pickle.load(f)
+                entry.bars = saved["bars"]
+                entry.final = saved["final"]
+                entry.live = saved["live"]
+                entry.mtime = mtime
+            except Exception as e:
+                print(f"⚠️ Failed to load stored bars {path}: {e}")
+                entry = _SymbolBars()
+
+        with self._lock:
+            self._symbols[key] = entry
+            self._symbols.move_to_end(key)
+            while len(self._symbols) > self.max_symbols:
+                self._symbols.popitem(last=False)
+        return entry
+
+    def _save(self, source: str, symbol: str, entry: _SymbolBars):
+        """Persist the bars atomically"""
+        path = self._path(source, symbol)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                pickle.dump({"bars": entry.bars, "final": entry.final, "live": entry.live},
+                            f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            entry.mtime = path.stat().st_mtime
+        except Exception as e:
+            print(f"⚠️ Failed to save bars for {symbol}: {e}")
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+
+    def _covered(self, entry: _SymbolBars, today: date, timezone: Optional[str]) -> List[DateRange]:
+        covered = list(entry.final)
+        if entry.live is not None:
+            live_start, live_end, fetched_at = entry.live
+            if _exchange_date(fetched_at, timezone) == today and time.time() - fetched_at < self.live_ttl:
+                covered.append((live_start, live_end))
+        return _merge_ranges(covered)
+
+    def _anchor(self, entry: _SymbolBars, gap_start: date, gap_end: date) -> Optional[date]:
+        """A stored bar of a finished session next to a gap, refetched with it to detect restated prices"""
+        if entry.bars.empty:
+            return None
+        dates = entry.bars.index
+        before = dates[dates < pd.Timestamp(gap_start)]
+        after = dates[dates > pd.Timestamp(gap_end)]
+        candidates = []
+        if len(before) and (gap_start - before[-1].date()).days <= _ANCHOR_MAX_DAYS:
+            candidates.append(before[-1].date())
+        if len(after) and (after[0].date() - gap_end).days <= _ANCHOR_MAX_DAYS:
+            candidates.append(after[0].date())
+        for day in candidates:
+            if any(start <= day <= end for start, end in entry.final):
+                return day
+        return None
+
+    @staticmethod
+    def _restated(entry: _SymbolBars, bars: pd.DataFrame, anchor: date) -> bool:
+        """Whether the refetched anchor bar's prices differ from the stored ones"""
+        stamp = pd.Timestamp(anchor)
+        if stamp not in bars.index:
+            return False
+        columns = [c for c in ("Open", "High", "Low", "Close") if c in bars.columns and c in entry.bars.columns]
+        stored = entry.bars.loc[stamp, columns].to_numpy(dtype=float)
+        fresh = bars.loc[stamp, columns].to_numpy(dtype=float)
+        return not np.allclose(stored, fresh, rtol=_RESTATED_RTOL, equal_nan=True)
+
+    def _record(self, entry: _SymbolBars, start: date, end: date, bars: pd.DataFrame, today: date):
+        """Merge fetched bars and mark their range covered"""
+        if bars.empty:
+            # Sources also answer errors with no rows, so an empty range is not
+            # remembered as having no sessions and is asked for again next time
+            return False
+
+        if entry.bars.empty:
+            entry.bars = bars
+        else:
+            kept = entry.bars[~entry.bars.index.isin(bars.index)]
+            entry.bars = pd.concat([kept, bars]).sort_index()
+
+        final_end = min(end, today - _ONE_DAY)
+        if start <= final_end:
+            entry.final = _merge_ranges(entry.final + [(start, final_end)])
+        if end >= today:
+            entry.live = (max(start, today), end, time.time())
+        return True
+
+    def get_bars(self, source: str, symbol: str, start_date: str, end_date: str,
+                 fetch: BarFetcher, force_refresh: bool = False,
+                 timezone: Optional[str] = None) -> pd.DataFrame:
+        """
+        Get the daily bars of a symbol between two dates (inclusive)
+
+        Args:
+            source: Data source the bars come from, e.g. "yfinance" or "tdx"
+            symbol: Stock symbol
+            start_date: Start date (YYYY-MM-DD)
+            end_date: End date (YYYY-MM-DD)
+            fetch: Called for every date range that is not stored yet
+            force_refresh: Refetch the whole range
+            timezone: Exchange time zone, defaults to SOURCE_TIMEZONES[source]; bars
+                from the exchange's current date on are refetched after live_ttl
+
+        Returns:
+            DataFrame indexed by trading date (a copy)
+
+        Raises:
+            RuntimeError: If a missing range could not be fetched
+        """
+        start, end = _to_date(start_date), _to_date(end_date)
+        # The session in progress is the exchange's, not the host's: at 02:00 in
+        # Shanghai the New York session of the previous date is still open
+        if timezone is None:
+            timezone = SOURCE_TIMEZONES.get(source)
+        today = _exchange_date(time.time(), timezone)
+
+        # Requests for the same symbol wait for each other, so overlapping
+        # ranges are fetched once and later requests only fetch what is left
+        with self._symbol_lock((source, symbol)):
+            entry = self._load(source, symbol)
+            gaps = [(start, end)] if force_refresh else missing_ranges(start, end, self._covered(entry, today, timezone))
+
+            with self._lock:
+                self.requests += 1
+                self.fetches += len(gaps)
+                if not gaps:
+                    self.full_hits += 1
+
+            changed = False
+            try:
+                for gap_start, gap_end in gaps:
+                    anchor = None if force_refresh else self._anchor(entry, gap_start, gap_end)
+                    fetch_start = min(gap_start, anchor) if anchor else gap_start
+                    fetch_end = max(gap_end, anchor) if anchor else gap_end
+                    print(f"🌐 Fetching {symbol} bars {gap_start} to {gap_end} from {source}")
+                    bars = fetch(symbol, fetch_start.isoformat(), fetch_end.isoformat())
+                    if bars is None:
+                        raise RuntimeError(f"Failed to fetch {symbol} bars {gap_start} to {gap_end} from {source}")
+                    bars = normalize_bars(bars)
+
+                    if anchor is not None and self._restated(entry, bars, anchor):
+                        # Prices were restated (e.g. a split) since the stored bars were
+                        # fetched, so none of them can be merged with new bars
+                        print(f"⚠️ {source} restated {symbol} prices, dropping stored bars and refetching {start} to {end}")
+                        entry.bars, entry.final, entry.live = pd.DataFrame(), [], None
+                        changed = True
+                        with self._lock:
+                            self.fetches += 1
+                        bars = fetch(symbol, start.isoformat(), end.isoformat())
+                        if bars is None:
+                            raise RuntimeError(f"Failed to fetch {symbol} bars {start} to {end} from {source}")
+                        self._record(entry, start, end, normalize_bars(bars), today)
+                        break
+
+                    if self._record(entry, fetch_start, fetch_end, bars, today):
+                        changed = True
+            finally:
+                # Keep the ranges fetched before a failure
+                if changed:
+                    self._save(source, symbol, entry)
+
+            if entry.bars.empty:
+                return entry.bars.copy()
+            return entry.bars.loc[pd.Timestamp(start):pd.Timestamp(end)].copy()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Requests served, ranges fetched and requests answered without fetching"""
+        with self._lock:
+            return {
+                "symbols_in_memory": len(self._symbols),
+                "requests": self.requests,
+                "fetches": self.fetches,
+                "full_hits": self.full_hits,
+            }
+
+    def clear(self):
+        """Drop all in-memory bars (persisted bars are kept)"""
+        with self._lock:
+            self._symbols.clear()
+
+
+# Global bar store instance
+_global_bar_store = None
+_global_bar_store_lock = threading.Lock()
+
+def get_bar_store() -> BarStore:
+    """
+    Get global bar store instance
+
+    Returns:
+        BarStore instance
+    """
+    global _global_bar_store
+    if _global_bar_store is None:
+        with _global_bar_store_lock:
+            if _global_bar_store is None:
+                _global_bar_store = BarStore(
+                    live_ttl=get_config().get("bar_store_live_ttl", 900)
+                )
+    return _global_bar_store
@@ -1,5 +1,160 @@
 import json
 import os
+import threading
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional
+
+from .config import get_config
+
+
+class FinnhubDataIndex:
+    """
+    Date index over the formatted finnhub json files, cached across calls.
+
+    Each ``{ticker}[_{period}]_data_formatted.json`` file is parsed once and
+    its non-empty dates are kept sorted, so a date range is extracted with two
+    bisects. With ``disk_index`` enabled the parsed file is also rewritten as
+    JSON Lines (one ``[date, entries]`` record per line, in date order) plus an
+    offset table under {data_cache_dir}/finnhub_index, and only the offset
+    table is kept in memory: a 7 day query then reads just those 7 lines.
+    Indexes are rebuilt when the source file's size or mtime changes.
+    """
+
+    INDEX_VERSION = 1
+
+    def __init__(self, index_dir: str = None, disk_index: bool = True):
+        if index_dir is None:
+            index_dir = os.path.join(get_config()["data_cache_dir"], "finnhub_index")
+        self.index_dir = index_dir
+        self.disk_index = disk_index
+        self._indexes: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def _sidecar_paths(self, data_path: str):
+        data_type = os.path.basename(os.path.dirname(os.path.abspath(data_path)))
+        name = os.path.splitext(os.path.basename(data_path))[0]
+        base = os.path.join(self.index_dir, data_type, name)
+        return f"{base}.jsonl", f"{base}.idx.json"
+
+    def _load_disk_index(self, data_path: str, size: int, mtime: float) -> Optional[Dict]:
+        lines_path, table_path = self._sidecar_paths(data_path)
+        if not (os.path.exists(lines_path) and os.path.exists(table_path)):
+            return None
+        try:
+            with open(table_path, "r", encoding="utf-8") as f:
+                table = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Failed to load finnhub index {table_path}: {e}")
+            return None
+        if (
+            table.get("version") != self.INDEX_VERSION
+            or table.get("size") != size
+            or table.get("mtime") != mtime
+        ):
+            return None
+        return {
+            "size": size,
+            "mtime": mtime,
+            "dates": table["dates"],
+            "offsets": table["offsets"],
+            "lines_path": lines_path,
+        }
+
+    def _write_disk_index(self, data_path: str, size: int, mtime: float,
+                          dates: List[str], data: Dict) -> Optional[Dict]:
+        lines_path, table_path = self._sidecar_paths(data_path)
+        try:
+            os.makedirs(os.path.dirname(lines_path), exist_ok=True)
+            offsets = [0]
+            with open(lines_path, "wb") as f:
+                for key in dates:
+                    line = (json.dumps([key, data[key]]) + "\n").encode("utf-8")
+                    f.write(line)
+                    offsets.append(offsets[-1] + len(line))
+            with open(table_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "version": self.INDEX_VERSION,
+                        "size": size,
+                        "mtime": mtime,
+                        "dates": dates,
+                        "offsets": offsets,
+                    },
+                    f,
+                )
+        except Exception as e:
+            print(f"⚠️ Failed to save finnhub index for {data_path}: {e}")
+            return None
+        return {
+            "size": size,
+            "mtime": mtime,
+            "dates": dates,
+            "offsets": offsets,
+            "lines_path": lines_path,
+        }
+
+    def _get_index(self, data_path: str) -> Dict:
+        stat = os.stat(data_path)
+        size, mtime = stat.st_size, stat.st_mtime
+
+        with self._lock:
+            cached = self._indexes.get(data_path)
+        if cached and cached["size"] == size and cached["mtime"] == mtime:
+            return cached
+
+        index = None
+        if self.disk_index:
+            index = self._load_disk_index(data_path, size, mtime)
+
+        if index is None:
+            with open(data_path, "r") as f:
+                data = json.load(f)
+            dates = sorted(key for key, value in data.items() if len(value) > 0)
+
+            if self.disk_index:
+                index = self._write_disk_index(data_path, size, mtime, dates, data)
+            if index is None:
+                # keep the parsed data in memory instead
+                index = {
+                    "size": size,
+                    "mtime": mtime,
+                    "dates": dates,
+                    "values": [data[key] for key in dates],
+                }
+
+        with self._lock:
+            self._indexes[data_path] = index
+        return index
+
+    def get_range(self, data_path: str, start_date: str, end_date: str) -> Dict:
+        """Get the non-empty entries whose date key is within [start_date, end_date]."""
+        index = self._get_index(data_path)
+        dates = index["dates"]
+        lo = bisect_left(dates, start_date)
+        hi = bisect_right(dates, end_date)
+        if lo >= hi:
+            return {}
+
+        if "values" in index:
+            return dict(zip(dates[lo:hi], index["values"][lo:hi]))
+
+        offsets = index["offsets"]
+        with open(index["lines_path"], "rb") as f:
+            f.seek(offsets[lo])
+            chunk = f.read(offsets[hi] - offsets[lo])
+        return dict(json.loads(line) for line in chunk.splitlines())
+
+
+# Global index instance
+_global_finnhub_index = None
+
+
+def get_finnhub_index() -> FinnhubDataIndex:
+    """Get the process-wide finnhub data index."""
+    global _global_finnhub_index
+    if _global_finnhub_index is None:
+        _global_finnhub_index = FinnhubDataIndex()
+    return _global_finnhub_index
 
 
 def get_data_in_range(ticker, start_date, end_date, data_type, data_dir, period=None):
@@ -25,12 +180,5 @@ def get_data_in_range(ticker, start_date, end_date, data_type, data_dir, period=
             data_dir, "finnhub_data", data_type, f"{ticker}_data_formatted.json"
         )
 
-    data = open(data_path, "r")
-    data = json.load(data)
-
     # filter keys (date, str in format YYYY-MM-DD) by the date range (str, str in format YYYY-MM-DD)
-    filtered_data = {}
-    for key, value in data.items():
-        if start_date <= key <= end_date and len(value) > 0:
-            filtered_data[key] = value
-    return filtered_data
+    return get_finnhub_index().get_range(data_path, start_date, end_date)
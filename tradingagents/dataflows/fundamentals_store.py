@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+SimFin Fundamentals Store
+Parses the bulk SimFin statement files once, partitions rows by ticker sorted by
+Publish Date, and answers point-in-time "latest report published on or before
+a date" lookups with a binary search
+"""
+
+import os
+import pickle
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import get_config
+
+# statement type -> (directory, file prefix) under {data_dir}/fundamental_data/simfin_data_all
+SIMFIN_STATEMENTS = {
+    "balance_sheet": ("balance_sheet", "us-balance"),
+    "cash_flow": ("cash_flow", "us-cashflow"),
+    "income_statements": ("income_statements", "us-income"),
+}
+
+
+class _StatementTable:
+    """All companies' rows of one statement file, partitioned by ticker"""
+
+    def __init__(self, df: pd.DataFrame):
+        # rows without a publish date can never be "published on or before" a date
+        df = df[df["Publish Date"].notna()]
+        # keep the original row labels, lookups are positional
+        df = df.sort_values(["Ticker", "Publish Date"], kind="mergesort")
+        self.df = df
+        self.publish_ns = df["Publish Date"].values.astype("datetime64[ns]").astype("int64")
+
+        # ticker -> (first row, end row) of its contiguous, publish-date sorted block
+        tickers = df["Ticker"].values
+        self.partitions: Dict[str, Tuple[int, int]] = {}
+        if len(tickers):
+            boundaries = np.flatnonzero(tickers[1:] != tickers[:-1]) + 1
+            starts = np.concatenate(([0], boundaries))
+            ends = np.concatenate((boundaries, [len(tickers)]))
+            for start, end in zip(starts, ends):
+                self.partitions[tickers[start]] = (int(start), int(end))
+
+    def latest(self, ticker: str, curr_date: pd.Timestamp) -> Optional[pd.Series]:
+        """Get the latest row of a ticker published on or before curr_date"""
+        bounds = self.partitions.get(ticker)
+        if bounds is None:
+            return None
+
+        start, end = bounds
+        publish_ns = self.publish_ns[start:end]
+        pos = int(np.searchsorted(publish_ns, curr_date.value, side="right"))
+        if pos == 0:
+            return None
+
+        # several reports may share the latest publish date, keep the first one
+        pos = int(np.searchsorted(publish_ns, publish_ns[pos - 1], side="left"))
+        return self.df.iloc[start + pos]
+
+
+class FundamentalsStore:
+    """Fundamentals Store - Point-in-time lookups over SimFin statement files"""
+
+    CACHE_VERSION = 1
+
+    def __init__(self, cache_dir: str = None):
+        """
+        Initialize fundamentals store
+
+        Args:
+            cache_dir: Directory for the binary table cache, defaults to {data_cache_dir}/fundamentals_store
+        """
+        if cache_dir is None:
+            cache_dir = os.path.join(get_config()["data_cache_dir"], "fundamentals_store")
+
+        self.cache_dir = Path(cache_dir)
+        self._tables: Dict[str, Tuple[float, _StatementTable]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def statement_path(data_dir: str, statement: str, freq: str) -> str:
+        """Get the path of a SimFin statement CSV"""
+        directory, prefix = SIMFIN_STATEMENTS[statement]
+        return os.path.join(
+            data_dir,
+            "fundamental_data",
+            "simfin_data_all",
+            directory,
+            "companies",
+            "us",
+            f"{prefix}-{freq}.csv",
+        )
+
+    def _cache_path(self, csv_path: str) -> Path:
+        return self.cache_dir / f"{Path(csv_path).stem}.pkl"
+
+    def _load_cache(self, csv_path: str, csv_mtime: float) -> Optional[pd.DataFrame]:
+        """Load the parsed frame if it was built from the current source file"""
+        cache_path = self._cache_path(csv_path)
+        if not cache_path.exists():
+            return None
+
+        try:
+            with open(cache_path, "rb") as f:
+                cached = pickle.load(f)
+            if cached.get("version") == self.CACHE_VERSION and cached.get("source_mtime") == csv_mtime:
+                return cached["data"]
+        except Exception as e:
+            print(f"⚠️ Failed to load fundamentals cache {cache_path}: {e}")
+        return None
+
+    def _save_cache(self, csv_path: str, csv_mtime: float, df: pd.DataFrame):
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(self._cache_path(csv_path), "wb") as f:
+                pickle.dump(
+                    {"version": self.CACHE_VERSION, "source_mtime": csv_mtime, "data": df},
+                    f,
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+        except Exception as e:
+            print(f"⚠️ Failed to save fundamentals cache: {e}")
+
+    @staticmethod
+    def _parse_csv(csv_path: str) -> pd.DataFrame:
+        df = pd.read_csv(csv_path, sep=";")
+
+        # Convert date strings to datetime objects and remove any time components
+        df["Report Date"] = pd.to_datetime(df["Report Date"], utc=True).dt.normalize()
+        df["Publish Date"] = pd.to_datetime(df["Publish Date"], utc=True).dt.normalize()
+        return df
+
+    def _get_table(self, csv_path: str) -> _StatementTable:
+        csv_mtime = os.path.getmtime(csv_path)
+
+        with self._lock:
+            cached = self._tables.get(csv_path)
+        if cached is not None and cached[0] == csv_mtime:
+            return cached[1]
+
+        df = self._load_cache(csv_path, csv_mtime)
+        if df is None:
+            df = self._parse_csv(csv_path)
+            self._save_cache(csv_path, csv_mtime, df)
+
+        table = _StatementTable(df)
+        with self._lock:
+            self._tables[csv_path] = (csv_mtime, table)
+        return table
+
+    def get_latest_statement(self, ticker: str, statement: str, freq: str,
+                             curr_date: str, data_dir: str = None) -> Optional[pd.Series]:
+        """
+        Get the most recent statement of a company published on or before curr_date
+
+        Args:
+            ticker: Stock symbol
+            statement: "balance_sheet", "cash_flow" or "income_statements"
+            freq: Reporting frequency, annual / quarterly
+            curr_date: Current date (YYYY-MM-DD)
+            data_dir: Data directory, defaults to the configured data_dir
+
+        Returns:
+            The statement row, or None if nothing was published before curr_date
+        """
+        if data_dir is None:
+            data_dir = get_config()["data_dir"]
+
+        table = self._get_table(self.statement_path(data_dir, statement, freq))
+        curr_date_dt = pd.to_datetime(curr_date, utc=True).normalize()
+        return table.latest(ticker, curr_date_dt)
+
+
+# Global fundamentals store instance
+_global_fundamentals_store = None
+
+def get_fundamentals_store() -> FundamentalsStore:
+    """
+    Get global fundamentals store instance
+
+    Returns:
+        FundamentalsStore instance
+    """
+    global _global_fundamentals_store
+    if _global_fundamentals_store is None:
+        _global_fundamentals_store = FundamentalsStore()
+    return _global_fundamentals_store
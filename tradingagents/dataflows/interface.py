@@ -1,27 +1,32 @@
 from typing import Annotated, Dict
-from .reddit_utils import fetch_top_from_category
-from .yfin_utils import *
-from .stockstats_utils import *
-from .googlenews_utils import *
-
-# Import Chinese finance utilities if available
-try:
-    from .chinese_finance_utils import get_chinese_social_sentiment
-except ImportError:
-    def get_chinese_social_sentiment(*args, **kwargs):
-        return "Chinese finance utilities not available"
+from .reddit_utils import fetch_top_from_category_range
 from .finnhub_utils import get_data_in_range
+from .price_store import get_price_store, frame_with_date_column
+from .fundamentals_store import get_fundamentals_store
 from dateutil.relativedelta import relativedelta
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import json
 import os
 import pandas as pd
-from tqdm import tqdm
-import yfinance as yf
-from openai import OpenAI
+from tradingagents.lazy_import import lazy_import
 from .config import get_config, set_config, DATA_DIR
 
+# Backends that pull in heavy dependencies are imported on first use
+yf = lazy_import("yfinance")
+openai = lazy_import("openai")
+stockstats_utils = lazy_import("tradingagents.dataflows.stockstats_utils")
+googlenews_utils = lazy_import("tradingagents.dataflows.googlenews_utils")
+
+
+def get_chinese_social_sentiment(*args, **kwargs):
+    # Chinese finance utilities are optional (requests, bs4)
+    try:
+        from .chinese_finance_utils import get_chinese_social_sentiment as _get_chinese_social_sentiment
+    except ImportError:
+        return "Chinese finance utilities not available"
+    return _get_chinese_social_sentiment(*args, **kwargs)
+
 
 def get_finnhub_news(
     ticker: Annotated[
@@ -163,35 +168,16 @@ def get_simfin_balance_sheet(
     ],
     curr_date: Annotated[str, "current date you are trading at, yyyy-mm-dd"],
 ):
-    data_path = os.path.join(
-        DATA_DIR,
-        "fundamental_data",
-        "simfin_data_all",
-        "balance_sheet",
-        "companies",
-        "us",
-        f"us-balance-{freq}.csv",
+    # Get the most recent balance sheet published on or before the current date
+    latest_balance_sheet = get_fundamentals_store().get_latest_statement(
+        ticker, "balance_sheet", freq, curr_date, DATA_DIR
     )
-    df = pd.read_csv(data_path, sep=";")
-
-    # Convert date strings to datetime objects and remove any time components
-    df["Report Date"] = pd.to_datetime(df["Report Date"], utc=True).dt.normalize()
-    df["Publish Date"] = pd.to_datetime(df["Publish Date"], utc=True).dt.normalize()
-
-    # Convert the current date to datetime and normalize
-    curr_date_dt = pd.to_datetime(curr_date, utc=True).normalize()
-
-    # Filter the DataFrame for the given ticker and for reports that were published on or before the current date
-    filtered_df = df[(df["Ticker"] == ticker) & (df["Publish Date"] <= curr_date_dt)]
 
     # Check if there are any available reports; if not, return a notification
-    if filtered_df.empty:
+    if latest_balance_sheet is None:
         print("No balance sheet available before the given current date.")
         return ""
 
-    # Get the most recent balance sheet by selecting the row with the latest Publish Date
-    latest_balance_sheet = filtered_df.loc[filtered_df["Publish Date"].idxmax()]
-
     # drop the SimFinID column
     latest_balance_sheet = latest_balance_sheet.drop("SimFinId")
 
@@ -210,35 +196,16 @@ def get_simfin_cashflow(
     ],
     curr_date: Annotated[str, "current date you are trading at, yyyy-mm-dd"],
 ):
-    data_path = os.path.join(
-        DATA_DIR,
-        "fundamental_data",
-        "simfin_data_all",
-        "cash_flow",
-        "companies",
-        "us",
-        f"us-cashflow-{freq}.csv",
+    # Get the most recent cash flow statement published on or before the current date
+    latest_cash_flow = get_fundamentals_store().get_latest_statement(
+        ticker, "cash_flow", freq, curr_date, DATA_DIR
     )
-    df = pd.read_csv(data_path, sep=";")
-
-    # Convert date strings to datetime objects and remove any time components
-    df["Report Date"] = pd.to_datetime(df["Report Date"], utc=True).dt.normalize()
-    df["Publish Date"] = pd.to_datetime(df["Publish Date"], utc=True).dt.normalize()
-
-    # Convert the current date to datetime and normalize
-    curr_date_dt = pd.to_datetime(curr_date, utc=True).normalize()
-
-    # Filter the DataFrame for the given ticker and for reports that were published on or before the current date
-    filtered_df = df[(df["Ticker"] == ticker) & (df["Publish Date"] <= curr_date_dt)]
 
     # Check if there are any available reports; if not, return a notification
-    if filtered_df.empty:
+    if latest_cash_flow is None:
         print("No cash flow statement available before the given current date.")
         return ""
 
-    # Get the most recent cash flow statement by selecting the row with the latest Publish Date
-    latest_cash_flow = filtered_df.loc[filtered_df["Publish Date"].idxmax()]
-
     # drop the SimFinID column
     latest_cash_flow = latest_cash_flow.drop("SimFinId")
 
@@ -257,35 +224,16 @@ def get_simfin_income_statements(
     ],
     curr_date: Annotated[str, "current date you are trading at, yyyy-mm-dd"],
 ):
-    data_path = os.path.join(
-        DATA_DIR,
-        "fundamental_data",
-        "simfin_data_all",
-        "income_statements",
-        "companies",
-        "us",
-        f"us-income-{freq}.csv",
+    # Get the most recent income statement published on or before the current date
+    latest_income = get_fundamentals_store().get_latest_statement(
+        ticker, "income_statements", freq, curr_date, DATA_DIR
     )
-    df = pd.read_csv(data_path, sep=";")
-
-    # Convert date strings to datetime objects and remove any time components
-    df["Report Date"] = pd.to_datetime(df["Report Date"], utc=True).dt.normalize()
-    df["Publish Date"] = pd.to_datetime(df["Publish Date"], utc=True).dt.normalize()
-
-    # Convert the current date to datetime and normalize
-    curr_date_dt = pd.to_datetime(curr_date, utc=True).normalize()
-
-    # Filter the DataFrame for the given ticker and for reports that were published on or before the current date
-    filtered_df = df[(df["Ticker"] == ticker) & (df["Publish Date"] <= curr_date_dt)]
 
     # Check if there are any available reports; if not, return a notification
-    if filtered_df.empty:
+    if latest_income is None:
         print("No income statement available before the given current date.")
         return ""
 
-    # Get the most recent income statement by selecting the row with the latest Publish Date
-    latest_income = filtered_df.loc[filtered_df["Publish Date"].idxmax()]
-
     # drop the SimFinID column
     latest_income = latest_income.drop("SimFinId")
 
@@ -307,7 +255,7 @@ def get_google_news(
     before = start_date - relativedelta(days=look_back_days)
     before = before.strftime("%Y-%m-%d")
 
-    news_results = getNewsData(query, before, curr_date)
+    news_results = googlenews_utils.getNewsData(query, before, curr_date)
 
     news_str = ""
 
@@ -340,26 +288,20 @@ def get_reddit_global_news(
     before = start_date - relativedelta(days=look_back_days)
     before = before.strftime("%Y-%m-%d")
 
-    posts = []
-    # iterate from start_date to end_date
+    # collect every date from before to start_date and read them in one pass
     curr_date = datetime.strptime(before, "%Y-%m-%d")
-
-    total_iterations = (start_date - curr_date).days + 1
-    pbar = tqdm(desc=f"Getting Global News on {start_date}", total=total_iterations)
-
+    dates = []
     while curr_date <= start_date:
-        curr_date_str = curr_date.strftime("%Y-%m-%d")
-        fetch_result = fetch_top_from_category(
-            "global_news",
-            curr_date_str,
-            max_limit_per_day,
-            data_path=os.path.join(DATA_DIR, "reddit_data"),
-        )
-        posts.extend(fetch_result)
+        dates.append(curr_date.strftime("%Y-%m-%d"))
         curr_date += relativedelta(days=1)
-        pbar.update(1)
 
-    pbar.close()
+    fetch_result = fetch_top_from_category_range(
+        "global_news",
+        dates,
+        max_limit_per_day,
+        data_path=os.path.join(DATA_DIR, "reddit_data"),
+    )
+    posts = [post for date in dates for post in fetch_result[date]]
 
     if len(posts) == 0:
         return ""
@@ -394,31 +336,21 @@ def get_reddit_company_news(
     before = start_date - relativedelta(days=look_back_days)
     before = before.strftime("%Y-%m-%d")
 
-    posts = []
-    # iterate from start_date to end_date
+    # collect every date from before to start_date and read them in one pass
     curr_date = datetime.strptime(before, "%Y-%m-%d")
-
-    total_iterations = (start_date - curr_date).days + 1
-    pbar = tqdm(
-        desc=f"Getting Company News for {ticker} on {start_date}",
-        total=total_iterations,
-    )
-
+    dates = []
     while curr_date <= start_date:
-        curr_date_str = curr_date.strftime("%Y-%m-%d")
-        fetch_result = fetch_top_from_category(
-            "company_news",
-            curr_date_str,
-            max_limit_per_day,
-            ticker,
-            data_path=os.path.join(DATA_DIR, "reddit_data"),
-        )
-        posts.extend(fetch_result)
+        dates.append(curr_date.strftime("%Y-%m-%d"))
         curr_date += relativedelta(days=1)
 
-        pbar.update(1)
-
-    pbar.close()
+    fetch_result = fetch_top_from_category_range(
+        "company_news",
+        dates,
+        max_limit_per_day,
+        ticker,
+        data_path=os.path.join(DATA_DIR, "reddit_data"),
+    )
+    posts = [post for date in dates for post in fetch_result[date]]
 
     if len(posts) == 0:
         return ""
@@ -525,39 +457,41 @@ def get_stock_stats_indicators_window(
     curr_date = datetime.strptime(curr_date, "%Y-%m-%d")
     before = curr_date - relativedelta(days=look_back_days)
 
-    if not online:
-        # read from YFin data
-        data = pd.read_csv(
-            os.path.join(
-                DATA_DIR,
-                f"market_data/price_data/{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
-            )
+    # load the price data and compute the indicator once for the whole window
+    try:
+        window_values = stockstats_utils.StockstatsUtils.get_stock_stats_window(
+            symbol,
+            indicator,
+            before.strftime("%Y-%m-%d"),
+            end_date,
+            os.path.join(DATA_DIR, "market_data", "price_data"),
+            online=online,
         )
-        data["Date"] = pd.to_datetime(data["Date"], utc=True)
-        dates_in_df = data["Date"].astype(str).str[:10]
-
-        ind_string = ""
-        while curr_date >= before:
-            # only do the trading dates
-            if curr_date.strftime("%Y-%m-%d") in dates_in_df.values:
-                indicator_value = get_stockstats_indicator(
-                    symbol, indicator, curr_date.strftime("%Y-%m-%d"), online
-                )
-
-                ind_string += f"{curr_date.strftime('%Y-%m-%d')}: {indicator_value}\n"
+    except Exception as e:
+        if not online:
+            raise
+        print(
+            f"Error getting stockstats indicator data for indicator {indicator} from {before.strftime('%Y-%m-%d')} to {end_date}: {e}"
+        )
+        window_values = None
 
+    ind_string = ""
+    while curr_date >= before:
+        curr_date_str = curr_date.strftime("%Y-%m-%d")
+        if window_values is None:
+            indicator_value = ""
+        elif curr_date in window_values.index:
+            indicator_value = str(window_values.loc[curr_date])
+        elif online:
+            indicator_value = "N/A: Not a trading day (weekend or holiday)"
+        else:
+            # offline data only reports the trading dates
             curr_date = curr_date - relativedelta(days=1)
-    else:
-        # online gathering
-        ind_string = ""
-        while curr_date >= before:
-            indicator_value = get_stockstats_indicator(
-                symbol, indicator, curr_date.strftime("%Y-%m-%d"), online
-            )
+            continue
 
-            ind_string += f"{curr_date.strftime('%Y-%m-%d')}: {indicator_value}\n"
+        ind_string += f"{curr_date_str}: {indicator_value}\n"
 
-            curr_date = curr_date - relativedelta(days=1)
+        curr_date = curr_date - relativedelta(days=1)
 
     result_str = (
         f"## {indicator} values from {before.strftime('%Y-%m-%d')} to {end_date}:\n\n"
@@ -582,7 +516,7 @@ def get_stockstats_indicator(
     curr_date = curr_date.strftime("%Y-%m-%d")
 
     try:
-        indicator_value = StockstatsUtils.get_stock_stats(
+        indicator_value = stockstats_utils.StockstatsUtils.get_stock_stats(
             symbol,
             indicator,
             curr_date,
@@ -608,25 +542,16 @@ def get_YFin_data_window(
     before = date_obj - relativedelta(days=look_back_days)
     start_date = before.strftime("%Y-%m-%d")
 
-    # read in data
-    data = pd.read_csv(
-        os.path.join(
-            DATA_DIR,
-            f"market_data/price_data/{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
+    # Slice the date range (inclusive) from the shared price store
+    filtered_data = frame_with_date_column(
+        get_price_store().get_range(
+            symbol,
+            start_date,
+            curr_date,
+            os.path.join(DATA_DIR, "market_data", "price_data"),
         )
     )
 
-    # Extract just the date part for comparison
-    data["DateOnly"] = data["Date"].str[:10]
-
-    # Filter data between the start and end dates (inclusive)
-    filtered_data = data[
-        (data["DateOnly"] >= start_date) & (data["DateOnly"] <= curr_date)
-    ]
-
-    # Drop the temporary column we created
-    filtered_data = filtered_data.drop("DateOnly", axis=1)
-
     # Set pandas display options to show the full DataFrame
     with pd.option_context(
         "display.max_rows", None, "display.max_columns", None, "display.width", None
@@ -686,39 +611,27 @@ def get_YFin_data(
     start_date: Annotated[str, "Start date in yyyy-mm-dd format"],
     end_date: Annotated[str, "End date in yyyy-mm-dd format"],
 ) -> str:
-    # read in data
-    data = pd.read_csv(
-        os.path.join(
-            DATA_DIR,
-            f"market_data/price_data/{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
-        )
-    )
-
     if end_date > "2025-03-25":
         raise Exception(
             f"Get_YFin_Data: {end_date} is outside of the data range of 2015-01-01 to 2025-03-25"
         )
 
-    # Extract just the date part for comparison
-    data["DateOnly"] = data["Date"].str[:10]
-
-    # Filter data between the start and end dates (inclusive)
-    filtered_data = data[
-        (data["DateOnly"] >= start_date) & (data["DateOnly"] <= end_date)
-    ]
-
-    # Drop the temporary column we created
-    filtered_data = filtered_data.drop("DateOnly", axis=1)
-
-    # remove the index from the dataframe
-    filtered_data = filtered_data.reset_index(drop=True)
+    # Slice the date range (inclusive) from the shared price store
+    filtered_data = frame_with_date_column(
+        get_price_store().get_range(
+            symbol,
+            start_date,
+            end_date,
+            os.path.join(DATA_DIR, "market_data", "price_data"),
+        )
+    )
 
     return filtered_data
 
 
 def get_stock_news_openai(ticker, curr_date):
     config = get_config()
-    client = OpenAI(base_url=config["backend_url"])
+    client = openai.OpenAI(base_url=config["backend_url"])
 
     response = client.responses.create(
         model=config["quick_think_llm"],
@@ -753,7 +666,7 @@ def get_stock_news_openai(ticker, curr_date):
 
 def get_global_news_openai(curr_date):
     config = get_config()
-    client = OpenAI(base_url=config["backend_url"])
+    client = openai.OpenAI(base_url=config["backend_url"])
 
     response = client.responses.create(
         model=config["quick_think_llm"],
@@ -788,7 +701,7 @@ def get_global_news_openai(curr_date):
 
 def get_fundamentals_openai(ticker, curr_date):
     config = get_config()
-    client = OpenAI(base_url=config["backend_url"])
+    client = openai.OpenAI(base_url=config["backend_url"])
 
     response = client.responses.create(
         model=config["quick_think_llm"],
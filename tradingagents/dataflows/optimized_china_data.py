@@ -9,8 +9,10 @@ import time
 import random
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
+from .bar_store import exchange_today, get_bar_store
 from .cache_manager import get_cache
 from .config import get_config
+from .single_flight import get_single_flight
 
 
 class OptimizedChinaDataProvider:
@@ -18,6 +20,7 @@ class OptimizedChinaDataProvider:
     
     def __init__(self):
         self.cache = get_cache()
+        self.bar_store = get_bar_store()
         self.config = get_config()
         self.last_api_call = 0
         self.min_api_interval = 0.5  # 通达信API调用间隔较短
@@ -49,52 +52,54 @@ class OptimizedChinaDataProvider:
         Returns:
             格式化的股票数据字符串
         """
+        # 同一股票、同一区间的并发请求只查询一次缓存、调用一次API
+        return get_single_flight().do(
+            ("china_stock_data", symbol, start_date, end_date, force_refresh),
+            self._get_stock_data, symbol, start_date, end_date, force_refresh
+        )
+    
+    def _get_stock_data(self, symbol: str, start_date: str, end_date: str,
+                        force_refresh: bool) -> str:
+        """从K线库读取区间数据（只向通达信API获取缺少的日期），再生成报告"""
         print(f"📈 获取A股数据: {symbol} ({start_date} 到 {end_date})")
         
-        # 检查缓存（除非强制刷新）
-        if not force_refresh:
-            cache_key = self.cache.find_cached_stock_data(
-                symbol=symbol,
-                start_date=start_date,
-                end_date=end_date,
-                data_source="tdx"
+        try:
+            from .tdx_utils import get_tdx_provider, compute_technical_indicators, format_china_stock_data, quote_from_bars
+            
+            bars = self.bar_store.get_bars(
+                "tdx", symbol, start_date, end_date, self._fetch_tdx_bars, force_refresh
             )
+            if bars.empty:
+                raise RuntimeError(f"未能获取股票 {symbol} 的历史数据")
             
-            if cache_key:
-                cached_data = self.cache.load_stock_data(cache_key)
-                if cached_data:
-                    print(f"⚡ 从缓存加载A股数据: {symbol}")
-                    return cached_data
-        
-        # 缓存未命中，从通达信API获取
-        print(f"🌐 从通达信API获取数据: {symbol}")
-        
-        try:
-            # API限制处理
-            self._wait_for_rate_limit()
+            # 技术指标按截至 end_date 的40天计算（与 get_stock_technical_indicators 相同），
+            # 区间已在K线库中时不访问网络
+            indicator_start = (datetime.strptime(end_date, '%Y-%m-%d') - timedelta(days=40)).strftime('%Y-%m-%d')
+            try:
+                recent_bars = self.bar_store.get_bars(
+                    "tdx", symbol, indicator_start, end_date, self._fetch_tdx_bars
+                )
+            except Exception as e:
+                print(f"⚠️ 获取技术指标区间失败，使用请求区间计算: {e}")
+                recent_bars = bars
+            indicators = compute_technical_indicators(recent_bars) if not recent_bars.empty else {}
             
-            # 调用通达信API
-            from .tdx_utils import get_china_stock_data
+            # 只有区间包含交易所当天时才需要实时行情，历史区间用最后一根日线
+            realtime_data = {}
+            if datetime.strptime(end_date, '%Y-%m-%d').date() >= exchange_today("tdx"):
+                try:
+                    self._wait_for_rate_limit()
+                    realtime_data = get_tdx_provider().get_real_time_data(symbol)
+                except Exception as e:
+                    print(f"⚠️ 获取实时行情失败，使用最新日线: {e}")
+            if not realtime_data:
+                realtime_data = quote_from_bars(symbol, bars)
             
-            formatted_data = get_china_stock_data(
-                stock_code=symbol,
-                start_date=start_date,
-                end_date=end_date
+            formatted_data = format_china_stock_data(
+                symbol, bars, realtime_data, indicators, start_date, end_date
             )
             
-            # 检查是否获取成功
-            if "❌" in formatted_data or "错误" in formatted_data:
-                print(f"❌ 通达信API调用失败: {symbol}")
-                # 尝试从旧缓存获取数据
-                old_cache = self._try_get_old_cache(symbol, start_date, end_date)
-                if old_cache:
-                    print(f"📁 使用过期缓存数据: {symbol}")
-                    return old_cache
-                
-                # 生成备用数据
-                return self._generate_fallback_data(symbol, start_date, end_date, "通达信API调用失败")
-            
-            # 保存到缓存
+            # 保存到缓存，API不可用时作为备用数据
             self.cache.save_stock_data(
                 symbol=symbol,
                 data=formatted_data,
@@ -119,6 +124,28 @@ class OptimizedChinaDataProvider:
             # 生成备用数据
             return self._generate_fallback_data(symbol, start_date, end_date, error_msg)
     
+    def _fetch_tdx_bars(self, symbol: str, start_date: str, end_date: str):
+        """
+        从通达信API获取 start_date 到 end_date 的日线，供K线库补齐缺少的日期
+        
+        通达信按条数从最新一根K线往前取，所以请求到今天再截取区间，
+        否则较早的区间会因条数不够而缺少开头的数据
+        """
+        from .tdx_utils import get_tdx_provider
+        
+        self._wait_for_rate_limit()
+        df = get_tdx_provider().get_stock_history_data(
+            symbol, start_date, datetime.now().strftime('%Y-%m-%d')
+        )
+        if df.empty:
+            # 连接失败时同样返回空数据
+            return None
+        if len(df) >= 800 and df.index[0] > datetime.strptime(start_date, '%Y-%m-%d'):
+            # 达到通达信单次800条的上限，更早的日期没有取到
+            print(f"⚠️ 通达信只能获取最近800个交易日的数据: {symbol}")
+            return None
+        return df[start_date:end_date]
+    
     def get_fundamentals_data(self, symbol: str, force_refresh: bool = False) -> str:
         """
         获取A股基本面数据 - 优先使用缓存
@@ -11,8 +11,10 @@ from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 import yfinance as yf
 import pandas as pd
+from .bar_store import get_bar_store
 from .cache_manager import get_cache
 from .config import get_config
+from .single_flight import get_single_flight
 
 
 class OptimizedUSDataProvider:
@@ -20,6 +22,7 @@ class OptimizedUSDataProvider:
     
     def __init__(self):
         self.cache = get_cache()
+        self.bar_store = get_bar_store()
         self.config = get_config()
         self.last_api_call = 0
         self.min_api_interval = 1.0  # Minimum API call interval (seconds)
@@ -43,6 +46,9 @@ class OptimizedUSDataProvider:
         """
         Get US stock data - prioritize cache usage
         
+        Concurrent requests for the same symbol and range share one cache
+        lookup and fetch
+        
         Args:
             symbol: Stock symbol
             start_date: Start date (YYYY-MM-DD)
@@ -52,40 +58,20 @@ class OptimizedUSDataProvider:
         Returns:
             Formatted stock data string
         """
+        return get_single_flight().do(
+            ("us_stock_data", symbol, start_date, end_date, force_refresh),
+            self._get_stock_data, symbol, start_date, end_date, force_refresh
+        )
+    
+    def _get_stock_data(self, symbol: str, start_date: str, end_date: str,
+                        force_refresh: bool) -> str:
+        """Read the bars from the bar store (fetching only missing dates), falling back to FINNHUB"""
         try:
-            # Check cache first (unless force refresh)
-            if not force_refresh:
-                cache_key = self.cache.find_cached_stock_data(
-                    symbol, start_date, end_date, "optimized_yfinance"
-                )
-                
-                if cache_key and self.cache.is_cache_valid(cache_key, symbol):
-                    cached_data = self.cache.load_stock_data(cache_key)
-                    if cached_data:
-                        print(f"📖 Using cached data for {symbol}")
-                        if isinstance(cached_data, pd.DataFrame):
-                            return self._format_stock_data(cached_data, symbol)
-                        else:
-                            return cached_data
-            
-            # Fetch new data from API
-            print(f"🌐 Fetching new data for {symbol} from {start_date} to {end_date}")
-            
-            # Wait for rate limit
-            self._wait_for_rate_limit()
-            
-            # Try Yahoo Finance first
             try:
-                data = self._fetch_from_yfinance(symbol, start_date, end_date)
-                if data is not None and not data.empty:
-                    # Cache the DataFrame
-                    cache_key = self.cache.save_stock_data(
-                        symbol, data, start_date, end_date, "optimized_yfinance"
-                    )
-                    
-                    # Format and return
+                data = self._get_bars(symbol, start_date, end_date, force_refresh)
+                if not data.empty:
                     formatted_data = self._format_stock_data(data, symbol)
-                    print(f"✅ Successfully fetched and cached data for {symbol}")
+                    print(f"✅ Successfully loaded data for {symbol}")
                     return formatted_data
                 else:
                     print(f"⚠️ No data returned from Yahoo Finance for {symbol}")
@@ -93,12 +79,22 @@ class OptimizedUSDataProvider:
             except Exception as e:
                 print(f"❌ Yahoo Finance error for {symbol}: {e}")
             
-            # Fallback: Try FINNHUB (if API key available)
+            # Fallback: Try FINNHUB (if API key available), cached by the exact range
+            if not force_refresh:
+                cache_key = self.cache.find_cached_stock_data(
+                    symbol, start_date, end_date, "optimized_finnhub"
+                )
+                if cache_key and self.cache.is_cache_valid(cache_key, symbol):
+                    cached_data = self.cache.load_stock_data(cache_key)
+                    if cached_data:
+                        print(f"📖 Using cached FINNHUB data for {symbol}")
+                        return cached_data
+            
             try:
                 finnhub_data = self._fetch_from_finnhub(symbol, start_date, end_date)
                 if finnhub_data:
                     # Cache the string data
-                    cache_key = self.cache.save_stock_data(
+                    self.cache.save_stock_data(
                         symbol, finnhub_data, start_date, end_date, "optimized_finnhub"
                     )
                     print(f"✅ Successfully fetched data from FINNHUB for {symbol}")
@@ -117,32 +113,41 @@ class OptimizedUSDataProvider:
             print(error_msg)
             return error_msg
     
-    def _fetch_from_yfinance(self, symbol: str, start_date: str, end_date: str) -> Optional[pd.DataFrame]:
-        """Fetch data from Yahoo Finance"""
-        try:
-            ticker = yf.Ticker(symbol)
-            data = ticker.history(start=start_date, end=end_date)
-            
-            if data.empty:
-                print(f"⚠️ No data available for {symbol} in the specified date range")
-                return None
-            
-            # Reset index to make Date a column
-            data = data.reset_index()
-            
-            # Ensure we have the required columns
-            required_columns = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
-            missing_columns = [col for col in required_columns if col not in data.columns]
-            
-            if missing_columns:
-                print(f"⚠️ Missing columns for {symbol}: {missing_columns}")
-                return None
-            
-            return data[required_columns]
-            
-        except Exception as e:
-            print(f"❌ Yahoo Finance fetch error for {symbol}: {e}")
-            return None
+    def _get_bars(self, symbol: str, start_date: str, end_date: str,
+                  force_refresh: bool = False) -> pd.DataFrame:
+        """
+        Get daily bars with a Date column from the bar store
+        
+        Only the dates not stored yet are fetched from Yahoo Finance. As with
+        yfinance, end_date is exclusive
+        """
+        last_date = (datetime.strptime(end_date, '%Y-%m-%d') - timedelta(days=1)).strftime('%Y-%m-%d')
+        data = self.bar_store.get_bars(
+            "yfinance", symbol, start_date, last_date, self._fetch_from_yfinance, force_refresh
+        )
+        return data.reset_index()
+    
+    def _fetch_from_yfinance(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+        """Fetch daily bars between two dates (inclusive) from Yahoo Finance for the bar store"""
+        self._wait_for_rate_limit()
+        
+        ticker = yf.Ticker(symbol)
+        end = (datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+        # Unadjusted prices: dividend-adjusted ones change with every payout and
+        # could not be merged with the stored bars; the store detects splits itself
+        data = ticker.history(start=start_date, end=end, auto_adjust=False)
+        
+        if data.empty:
+            # No sessions in the range (weekend, holiday) or unknown symbol
+            return data
+        
+        # Ensure we have the required columns
+        required_columns = ['Open', 'High', 'Low', 'Close', 'Volume']
+        missing_columns = [col for col in required_columns if col not in data.columns]
+        if missing_columns:
+            raise ValueError(f"Missing columns for {symbol}: {missing_columns}")
+        
+        return data[required_columns]
     
     def _fetch_from_finnhub(self, symbol: str, start_date: str, end_date: str) -> Optional[str]:
         """Fetch data from FINNHUB API"""
@@ -294,8 +299,8 @@ class OptimizedUSDataProvider:
             if not indicators:
                 return basic_data
             
-            # Fetch DataFrame for indicator calculation
-            data_df = self._fetch_from_yfinance(symbol, start_date, end_date)
+            # Stored bars for indicator calculation
+            data_df = self._get_bars(symbol, start_date, end_date)
             if data_df is None or data_df.empty:
                 return basic_data
             
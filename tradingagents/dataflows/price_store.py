@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Process-wide Price Store
+Loads each offline YFin price CSV once into a DatetimeIndex-ed frame, keeps the
+frames in a bounded LRU and converts the CSV into a binary sidecar on first use
+so later processes skip CSV parsing entirely
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+import pandas as pd
+
+from .config import get_config
+
+# File name pattern of the offline Yahoo Finance price data
+YFIN_PRICE_FILE = "{symbol}-YFin-data-2015-01-01-2025-03-25.csv"
+
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Adj Close"]
+
+
+class PriceStore:
+    """Price Store - Shared, bounded in-memory cache of per-symbol price frames"""
+
+    def __init__(self, max_symbols: int = 64, cache_dir: str = None):
+        """
+        Initialize price store
+
+        Args:
+            max_symbols: Maximum number of symbol frames kept in memory
+            cache_dir: Directory for binary sidecars, defaults to {data_cache_dir}/price_store
+        """
+        if cache_dir is None:
+            cache_dir = os.path.join(get_config()["data_cache_dir"], "price_store")
+
+        self.cache_dir = Path(cache_dir)
+        self.max_symbols = max_symbols
+
+        self._frames: "OrderedDict[str, Tuple[float, pd.DataFrame]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def _csv_path(self, symbol: str, price_dir: str = None) -> str:
+        """Get the offline CSV path of a symbol"""
+        if price_dir is None:
+            price_dir = os.path.join(get_config()["data_dir"], "market_data", "price_data")
+        return os.path.join(price_dir, YFIN_PRICE_FILE.format(symbol=symbol))
+
+    def _sidecar_path(self, csv_path: str, file_format: str) -> Path:
+        """Get the binary sidecar path for a CSV file"""
+        return self.cache_dir / f"{Path(csv_path).stem}.{file_format}"
+
+    @staticmethod
+    def _normalize_frame(data: pd.DataFrame) -> pd.DataFrame:
+        """Index the raw CSV frame by trading date and type the numeric columns"""
+        data = data.copy()
+        data.index = pd.DatetimeIndex(
+            pd.to_datetime(data.pop("Date").astype(str).str[:10]), name="Date"
+        )
+        for col in data.columns:
+            if col in PRICE_COLUMNS:
+                data[col] = pd.to_numeric(data[col], errors="coerce").astype("float64")
+            else:
+                data[col] = pd.to_numeric(data[col], errors="coerce")
+        return data.sort_index()
+
+    def _load_sidecar(self, csv_path: str, csv_mtime: float) -> Optional[pd.DataFrame]:
+        """Load a binary sidecar that is at least as new as its CSV"""
+        for file_format, reader in (("parquet", pd.read_parquet), ("pkl", pd.read_pickle)):
+            sidecar = self._sidecar_path(csv_path, file_format)
+            try:
+                if sidecar.exists() and sidecar.stat().st_mtime >= csv_mtime:
+                    return reader(sidecar)
+            except Exception as e:
+                print(f"⚠️ Failed to load price sidecar {sidecar}: {e}")
+        return None
+
+    def _save_sidecar(self, csv_path: str, frame: pd.DataFrame):
+        """Write the normalized frame as Parquet, falling back to pickle"""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            print(f"⚠️ Failed to create price store directory: {e}")
+            return
+
+        try:
+            frame.to_parquet(self._sidecar_path(csv_path, "parquet"))
+            return
+        except ImportError:
+            # pyarrow/fastparquet not installed
+            pass
+        except Exception as e:
+            print(f"⚠️ Failed to write parquet price sidecar: {e}")
+
+        try:
+            frame.to_pickle(self._sidecar_path(csv_path, "pkl"))
+        except Exception as e:
+            print(f"⚠️ Failed to write price sidecar: {e}")
+
+    def get_frame(self, symbol: str, price_dir: str = None) -> pd.DataFrame:
+        """
+        Get the full price history of a symbol
+
+        Args:
+            symbol: Stock symbol
+            price_dir: Directory of the offline CSV files, defaults to {data_dir}/market_data/price_data
+
+        Returns:
+            DataFrame indexed by trading date. The frame is shared, callers must not modify it
+
+        Raises:
+            FileNotFoundError: If the offline CSV does not exist
+        """
+        csv_path = self._csv_path(symbol, price_dir)
+        csv_mtime = os.path.getmtime(csv_path)
+
+        with self._lock:
+            cached = self._frames.get(csv_path)
+            if cached is not None and cached[0] == csv_mtime:
+                self._frames.move_to_end(csv_path)
+                self.hits += 1
+                return cached[1]
+
+        frame = self._load_sidecar(csv_path, csv_mtime)
+        if frame is None:
+            frame = self._normalize_frame(pd.read_csv(csv_path))
+            self._save_sidecar(csv_path, frame)
+
+        with self._lock:
+            self.misses += 1
+            self._frames[csv_path] = (csv_mtime, frame)
+            self._frames.move_to_end(csv_path)
+            while len(self._frames) > self.max_symbols:
+                self._frames.popitem(last=False)
+
+        return frame
+
+    def get_range(self, symbol: str, start_date: str, end_date: str,
+                  price_dir: str = None) -> pd.DataFrame:
+        """
+        Get the price rows of a symbol between two dates (inclusive)
+
+        Args:
+            symbol: Stock symbol
+            start_date: Start date (YYYY-MM-DD)
+            end_date: End date (YYYY-MM-DD)
+            price_dir: Directory of the offline CSV files
+
+        Returns:
+            DataFrame indexed by trading date
+        """
+        frame = self.get_frame(symbol, price_dir)
+        return frame.loc[pd.Timestamp(start_date):pd.Timestamp(end_date)]
+
+    def clear(self):
+        """Drop all in-memory frames"""
+        with self._lock:
+            self._frames.clear()
+
+
+# Global price store instance
+_global_price_store = None
+_global_price_store_lock = threading.Lock()
+
+def get_price_store() -> PriceStore:
+    """
+    Get global price store instance
+
+    Returns:
+        PriceStore instance
+    """
+    global _global_price_store
+    if _global_price_store is None:
+        with _global_price_store_lock:
+            if _global_price_store is None:
+                _global_price_store = PriceStore()
+    return _global_price_store
+
+
+def frame_with_date_column(frame: pd.DataFrame) -> pd.DataFrame:
+    """Turn a store frame back into the CSV layout with a YYYY-MM-DD Date column"""
+    data = frame.reset_index()
+    data["Date"] = data["Date"].dt.strftime("%Y-%m-%d")
+    return data
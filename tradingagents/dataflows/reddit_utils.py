@@ -1,12 +1,16 @@
 import requests
 import time
 import json
+import mmap
+import threading
 from datetime import datetime, timedelta
 from contextlib import contextmanager
-from typing import Annotated
+from typing import Annotated, Dict, List, Tuple
 import os
 import re
 
+from .config import get_config
+
 ticker_to_company = {
     "AAPL": "Apple",
     "MSFT": "Microsoft",
@@ -49,73 +53,284 @@ ticker_to_company = {
 }
 
 
-def fetch_top_from_category(
+class RedditCorpusIndex:
+    """
+    Per-date byte offset index over the subreddit .jsonl dumps.
+
+    Each file is scanned once to record, for every posting date, the byte
+    offset and length of its lines. The index is kept in memory and persisted
+    under {data_cache_dir}/reddit_index, and is rebuilt when the source file's
+    size or mtime changes. Reads mmap the file and decode only the lines of the
+    requested dates.
+    """
+
+    INDEX_VERSION = 1
+
+    def __init__(self, index_dir: str = None):
+        if index_dir is None:
+            index_dir = os.path.join(get_config()["data_cache_dir"], "reddit_index")
+        self.index_dir = index_dir
+        self._indexes: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def _index_path(self, data_file: str) -> str:
+        parent = os.path.basename(os.path.dirname(os.path.abspath(data_file)))
+        name = os.path.basename(data_file)
+        return os.path.join(self.index_dir, parent, f"{name}.idx.json")
+
+    @staticmethod
+    def _file_signature(data_file: str) -> Tuple[int, float]:
+        stat = os.stat(data_file)
+        return stat.st_size, stat.st_mtime
+
+    @staticmethod
+    def build_file_index(data_file: str) -> Dict[str, List[List[int]]]:
+        """Scan a .jsonl file once and map each posting date to [offset, length] pairs."""
+        offsets: Dict[str, List[List[int]]] = {}
+        offset = 0
+        with open(data_file, "rb") as f:
+            for line in f:
+                length = len(line)
+                if line.strip():
+                    parsed_line = json.loads(line)
+                    post_date = datetime.utcfromtimestamp(
+                        parsed_line["created_utc"]
+                    ).strftime("%Y-%m-%d")
+                    offsets.setdefault(post_date, []).append([offset, length])
+                offset += length
+        return offsets
+
+    def get_file_index(self, data_file: str) -> Dict[str, List[List[int]]]:
+        """Get the date index of a file, loading or (re)building it if needed."""
+        size, mtime = self._file_signature(data_file)
+
+        with self._lock:
+            cached = self._indexes.get(data_file)
+        if cached and cached["size"] == size and cached["mtime"] == mtime:
+            return cached["dates"]
+
+        index_path = self._index_path(data_file)
+        index = None
+        if os.path.exists(index_path):
+            try:
+                with open(index_path, "r", encoding="utf-8") as f:
+                    index = json.load(f)
+                if (
+                    index.get("version") != self.INDEX_VERSION
+                    or index.get("size") != size
+                    or index.get("mtime") != mtime
+                ):
+                    index = None
+            except Exception as e:
+                print(f"⚠️ Failed to load reddit index {index_path}: {e}")
+                index = None
+
+        if index is None:
+            index = {
+                "version": self.INDEX_VERSION,
+                "size": size,
+                "mtime": mtime,
+                "dates": self.build_file_index(data_file),
+            }
+            try:
+                os.makedirs(os.path.dirname(index_path), exist_ok=True)
+                with open(index_path, "w", encoding="utf-8") as f:
+                    json.dump(index, f)
+            except Exception as e:
+                print(f"⚠️ Failed to save reddit index {index_path}: {e}")
+
+        with self._lock:
+            self._indexes[data_file] = index
+        return index["dates"]
+
+    def build_category(self, category_dir: str):
+        """Build (or refresh) the indexes of every .jsonl file in a category."""
+        for data_file in os.listdir(category_dir):
+            if data_file.endswith(".jsonl"):
+                self.get_file_index(os.path.join(category_dir, data_file))
+
+    def read_dates(self, data_file: str, dates: List[str]) -> Dict[str, List[dict]]:
+        """Decode only the lines of the given dates from a .jsonl file."""
+        file_index = self.get_file_index(data_file)
+        wanted = [d for d in dates if d in file_index]
+        result = {d: [] for d in dates}
+        if not wanted:
+            return result
+
+        with open(data_file, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for d in wanted:
+                    result[d] = [
+                        json.loads(mm[offset : offset + length])
+                        for offset, length in file_index[d]
+                    ]
+        return result
+
+
+# Global index instance
+_global_reddit_index = None
+
+
+def get_reddit_index() -> RedditCorpusIndex:
+    """Get the process-wide reddit corpus index."""
+    global _global_reddit_index
+    if _global_reddit_index is None:
+        _global_reddit_index = RedditCorpusIndex()
+    return _global_reddit_index
+
+
+def company_search_terms(ticker: str) -> List[str]:
+    """Get the names/aliases a ticker is searched by, plus the ticker itself."""
+    if "OR" in ticker_to_company[ticker]:
+        search_terms = ticker_to_company[ticker].split(" OR ")
+    else:
+        search_terms = [ticker_to_company[ticker]]
+
+    search_terms.append(ticker)
+    return search_terms
+
+
+class CompanyMatcher:
+    """
+    Case-insensitive matcher of company names/aliases for many tickers at once.
+
+    All terms are compiled into a single alternation (longest first). ``search``
+    answers "does any ticker match" with one regex scan, while ``tag`` finds
+    every ticker mentioned in a text: a zero-width lookahead reports the longest
+    term starting at each position, and any shorter term matching at the same
+    position must be a prefix of it, so the tickers of those prefixes are added
+    from a table built up front.
+    """
+
+    def __init__(self, ticker_terms: Dict[str, List[str]]):
+        self.tickers = list(ticker_terms)
+
+        self._term_tickers: Dict[str, set] = {}
+        for ticker, terms in ticker_terms.items():
+            for term in terms:
+                if term:
+                    self._term_tickers.setdefault(term.lower(), set()).add(ticker)
+
+        terms = sorted(self._term_tickers, key=len, reverse=True)
+        alternation = "|".join(re.escape(term) for term in terms) or "(?!)"
+        self._pattern = re.compile(alternation, re.IGNORECASE)
+        self._tag_pattern = re.compile(f"(?=({alternation}))", re.IGNORECASE)
+
+        # tickers of a term and of every other term that is a prefix of it
+        self._prefix_tickers: Dict[str, frozenset] = {}
+        for term in terms:
+            matched = set()
+            for other, other_tickers in self._term_tickers.items():
+                if term.startswith(other):
+                    matched |= other_tickers
+            self._prefix_tickers[term] = frozenset(matched)
+
+    @classmethod
+    def for_tickers(cls, tickers: List[str] = None) -> "CompanyMatcher":
+        """Build a matcher from ticker_to_company (all known tickers by default)."""
+        if tickers is None:
+            tickers = list(ticker_to_company)
+        return cls({ticker: company_search_terms(ticker) for ticker in tickers})
+
+    def search(self, *texts: str) -> bool:
+        """Whether any of the texts mentions any of the matcher's tickers."""
+        return any(self._pattern.search(text) for text in texts if text)
+
+    def _tickers_matching(self, matched: str) -> frozenset:
+        """Tickers of every term that matches the start of ``matched``, compared like the pattern."""
+        return frozenset(
+            ticker
+            for term, term_tickers in self._term_tickers.items()
+            if re.match(re.escape(term), matched, re.IGNORECASE)
+            for ticker in term_tickers
+        )
+
+    def tag(self, *texts: str) -> set:
+        """Get every ticker mentioned in any of the texts."""
+        found = set()
+        for text in texts:
+            if not text:
+                continue
+            for match in self._tag_pattern.finditer(text):
+                matched = match.group(1)
+                tickers = self._prefix_tickers.get(matched.lower())
+                if tickers is None:
+                    # case-insensitive matches whose lower() differs from the term,
+                    # e.g. "Teſla" for "tesla"
+                    tickers = self._tickers_matching(matched)
+                found |= tickers
+                if len(found) == len(self.tickers):
+                    return found
+        return found
+
+
+_company_matchers: Dict[str, CompanyMatcher] = {}
+
+
+def get_company_matcher(ticker: str) -> CompanyMatcher:
+    """Get the cached single-ticker matcher used to filter company news."""
+    matcher = _company_matchers.get(ticker)
+    if matcher is None:
+        matcher = CompanyMatcher.for_tickers([ticker])
+        _company_matchers[ticker] = matcher
+    return matcher
+
+
+def fetch_top_from_category_range(
     category: Annotated[
         str, "Category to fetch top post from. Collection of subreddits."
     ],
-    date: Annotated[str, "Date to fetch top posts from."],
-    max_limit: Annotated[int, "Maximum number of posts to fetch."],
+    dates: Annotated[List[str], "Dates (yyyy-mm-dd) to fetch top posts from."],
+    max_limit: Annotated[int, "Maximum number of posts to fetch per date."],
     query: Annotated[str, "Optional query to search for in the subreddit."] = None,
     data_path: Annotated[
         str,
         "Path to the data folder. Default is 'reddit_data'.",
     ] = "reddit_data",
-):
-    base_path = data_path
+) -> Dict[str, List[dict]]:
+    """
+    Fetch the top posts of a category for several dates in one pass.
 
-    all_content = []
+    Returns:
+        dict mapping each date to its posts, in the same order
+        fetch_top_from_category would return them for that date
+    """
+    base_path = data_path
+    category_path = os.path.join(base_path, category)
+    category_files = os.listdir(category_path)
 
-    if max_limit < len(os.listdir(os.path.join(base_path, category))):
+    if max_limit < len(category_files):
         raise ValueError(
             "REDDIT FETCHING ERROR: max limit is less than the number of files in the category. Will not be able to fetch any posts"
         )
 
-    limit_per_subreddit = max_limit // len(
-        os.listdir(os.path.join(base_path, category))
-    )
+    limit_per_subreddit = max_limit // len(category_files)
 
-    for data_file in os.listdir(os.path.join(base_path, category)):
+    company_matcher = None
+    if "company" in category and query:
+        company_matcher = get_company_matcher(query)
+
+    reddit_index = get_reddit_index()
+    all_content = {date: [] for date in dates}
+
+    for data_file in category_files:
         # check if data_file is a .jsonl file
         if not data_file.endswith(".jsonl"):
             continue
 
-        all_content_curr_subreddit = []
-
-        with open(os.path.join(base_path, category, data_file), "rb") as f:
-            for i, line in enumerate(f):
-                # skip empty lines
-                if not line.strip():
-                    continue
-
-                parsed_line = json.loads(line)
+        posts_by_date = reddit_index.read_dates(
+            os.path.join(category_path, data_file), list(all_content)
+        )
 
-                # select only lines that are from the date
-                post_date = datetime.utcfromtimestamp(
-                    parsed_line["created_utc"]
-                ).strftime("%Y-%m-%d")
-                if post_date != date:
-                    continue
+        for post_date, parsed_lines in posts_by_date.items():
+            all_content_curr_subreddit = []
 
+            for parsed_line in parsed_lines:
                 # if is company_news, check that the title or the content has the company's name (query) mentioned
-                if "company" in category and query:
-                    search_terms = []
-                    if "OR" in ticker_to_company[query]:
-                        search_terms = ticker_to_company[query].split(" OR ")
-                    else:
-                        search_terms = [ticker_to_company[query]]
-
-                    search_terms.append(query)
-
-                    found = False
-                    for term in search_terms:
-                        if re.search(
-                            term, parsed_line["title"], re.IGNORECASE
-                        ) or re.search(term, parsed_line["selftext"], re.IGNORECASE):
-                            found = True
-                            break
-
-                    if not found:
-                        continue
+                if company_matcher is not None and not company_matcher.search(
+                    parsed_line["title"], parsed_line["selftext"]
+                ):
+                    continue
 
                 post = {
                     "title": parsed_line["title"],
@@ -127,9 +342,104 @@ def fetch_top_from_category(
 
                 all_content_curr_subreddit.append(post)
 
-        # sort all_content_curr_subreddit by upvote_ratio in descending order
-        all_content_curr_subreddit.sort(key=lambda x: x["upvotes"], reverse=True)
+            # sort all_content_curr_subreddit by upvote_ratio in descending order
+            all_content_curr_subreddit.sort(key=lambda x: x["upvotes"], reverse=True)
+
+            all_content[post_date].extend(
+                all_content_curr_subreddit[:limit_per_subreddit]
+            )
+
+    return all_content
+
+
+def fetch_top_from_category(
+    category: Annotated[
+        str, "Category to fetch top post from. Collection of subreddits."
+    ],
+    date: Annotated[str, "Date to fetch top posts from."],
+    max_limit: Annotated[int, "Maximum number of posts to fetch."],
+    query: Annotated[str, "Optional query to search for in the subreddit."] = None,
+    data_path: Annotated[
+        str,
+        "Path to the data folder. Default is 'reddit_data'.",
+    ] = "reddit_data",
+):
+    return fetch_top_from_category_range(
+        category, [date], max_limit, query, data_path=data_path
+    )[date]
+
+
+def fetch_top_by_ticker_range(
+    category: Annotated[
+        str, "Category to fetch top post from. Collection of subreddits."
+    ],
+    dates: Annotated[List[str], "Dates (yyyy-mm-dd) to fetch top posts from."],
+    max_limit: Annotated[int, "Maximum number of posts to fetch per ticker and date."],
+    tickers: Annotated[
+        List[str], "Tickers to tag posts for. Defaults to every known ticker."
+    ] = None,
+    data_path: Annotated[
+        str,
+        "Path to the data folder. Default is 'reddit_data'.",
+    ] = "reddit_data",
+) -> Dict[str, Dict[str, List[dict]]]:
+    """
+    Batch version of fetch_top_from_category for a whole ticker universe.
+
+    Each post in the requested dates is decoded once and tagged with every
+    ticker it mentions, so the corpus is read a single time no matter how many
+    tickers are asked for.
+
+    Returns:
+        dict of ticker -> date -> posts, where each list equals what
+        fetch_top_from_category(category, date, max_limit, ticker) returns
+    """
+    category_path = os.path.join(data_path, category)
+    category_files = os.listdir(category_path)
+
+    if max_limit < len(category_files):
+        raise ValueError(
+            "REDDIT FETCHING ERROR: max limit is less than the number of files in the category. Will not be able to fetch any posts"
+        )
+
+    limit_per_subreddit = max_limit // len(category_files)
+
+    matcher = CompanyMatcher.for_tickers(tickers)
+    reddit_index = get_reddit_index()
+    all_content = {
+        ticker: {date: [] for date in dates} for ticker in matcher.tickers
+    }
+
+    for data_file in category_files:
+        if not data_file.endswith(".jsonl"):
+            continue
+
+        posts_by_date = reddit_index.read_dates(
+            os.path.join(category_path, data_file), list(dates)
+        )
+
+        for post_date, parsed_lines in posts_by_date.items():
+            content_curr_subreddit = {}
+
+            for parsed_line in parsed_lines:
+                matched_tickers = matcher.tag(
+                    parsed_line["title"], parsed_line["selftext"]
+                )
+                if not matched_tickers:
+                    continue
+
+                post = {
+                    "title": parsed_line["title"],
+                    "content": parsed_line["selftext"],
+                    "url": parsed_line["url"],
+                    "upvotes": parsed_line["ups"],
+                    "posted_date": post_date,
+                }
+                for ticker in matched_tickers:
+                    content_curr_subreddit.setdefault(ticker, []).append(post)
 
-        all_content.extend(all_content_curr_subreddit[:limit_per_subreddit])
+            for ticker, posts in content_curr_subreddit.items():
+                posts.sort(key=lambda x: x["upvotes"], reverse=True)
+                all_content[ticker][post_date].extend(posts[:limit_per_subreddit])
 
     return all_content
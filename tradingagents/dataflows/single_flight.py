@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Single-Flight Request Coalescing
+Collapses concurrent identical data fetches into one in-flight request whose
+result (or exception) is handed to every caller that asked for the same key
+while it was running. Works across threads and asyncio tasks; an optional
+file or Redis lock extends the coordination to other processes, so a second
+process waits for the first one's fetch and then finds its result in the cache
+"""
+
+import asyncio
+import functools
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from .config import get_config
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+SINGLE_FLIGHT_LOCK_BACKENDS = (None, "file", "redis")
+
+
+class _Call:
+    """One in-flight fetch and its outcome"""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class FileLock:
+    """Exclusive advisory lock on a lock file, shared by all processes on the host"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = None
+
+    def acquire(self, timeout: float) -> bool:
+        """Try to take the lock for up to timeout seconds"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a+b")
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                if time.monotonic() >= deadline:
+                    self._file.close()
+                    self._file = None
+                    return False
+                time.sleep(0.05)
+
+    def release(self):
+        """Release the lock"""
+        if self._file is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
+
+
+class SingleFlight:
+    """Single Flight - Run each concurrently requested key only once"""
+
+    def __init__(self, lock_backend: Optional[str] = None, lock_timeout: float = 300.0,
+                 lock_dir: str = None, namespace: str = "tradingagents:singleflight"):
+        """
+        Initialize single flight
+
+        Args:
+            lock_backend: Cross-process lock, None (this process only), "file" or "redis"
+            lock_timeout: Seconds to wait for another process's fetch before fetching anyway;
+                also the expiry of Redis locks left by crashed processes
+            lock_dir: Directory for lock files, defaults to {data_cache_dir}/locks
+            namespace: Prefix of the Redis lock names
+        """
+        if lock_backend not in SINGLE_FLIGHT_LOCK_BACKENDS:
+            raise ValueError(
+                f"Unsupported single flight lock: {lock_backend}, "
+                f"choose from {SINGLE_FLIGHT_LOCK_BACKENDS}"
+            )
+        if lock_dir is None:
+            lock_dir = os.path.join(get_config()["data_cache_dir"], "locks")
+
+        self.lock_backend = lock_backend
+        self.lock_timeout = lock_timeout
+        self.lock_dir = Path(lock_dir)
+        self.namespace = namespace
+
+        self._calls: Dict[Hashable, _Call] = {}
+        self._async_calls: Dict[Any, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._redis_client = None
+        self.fetches = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def _digest(key: Hashable) -> str:
+        return hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+
+    def _get_redis_client(self):
+        if self._redis_client is None:
+            from ..config.database_manager import get_redis_client
+            self._redis_client = get_redis_client()
+        return self._redis_client
+
+    def _acquire_process_lock(self, key: Hashable):
+        """Take the cross-process lock of a key, returning a release callable or None"""
+        if self.lock_backend is None:
+            return None
+
+        digest = self._digest(key)
+        if self.lock_backend == "redis":
+            client = self._get_redis_client()
+            if client is None:
+                print("⚠️ Redis not available, single flight coordinates this process only")
+                self.lock_backend = None
+                return None
+            # Not thread-local, so an asyncio caller may release it from another thread
+            lock = client.lock(f"{self.namespace}:{digest}", timeout=self.lock_timeout,
+                               blocking_timeout=self.lock_timeout, thread_local=False)
+            acquired = lock.acquire()
+        else:
+            lock = FileLock(self.lock_dir / f"{digest}.lock")
+            acquired = lock.acquire(self.lock_timeout)
+
+        if not acquired:
+            print(f"⚠️ Waited {self.lock_timeout:.0f}s for another process to fetch {key!r}, fetching anyway")
+            return None
+        return lock.release
+
+    @contextmanager
+    def _process_lock(self, key: Hashable):
+        release = self._acquire_process_lock(key)
+        try:
+            yield
+        finally:
+            if release is not None:
+                try:
+                    release()
+                except Exception as e:
+                    print(f"⚠️ Failed to release single flight lock for {key!r}: {e}")
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Call fn(*args, **kwargs), unless a call for the same key is already running
+
+        Args:
+            key: Identifies identical requests, e.g. (source, symbol, start_date, end_date)
+            fn: Fetch function; it should look in the cache itself before fetching, so a
+                process that waited for another process's lock finds the stored result
+
+        Returns:
+            The result of the single call, shared by all callers of the key; callers
+            must not modify it in place
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.fetches += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            with self._process_lock(key):
+                call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def ado(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Async version of do
+
+        A coroutine function is awaited once per key and event loop; a plain function
+        runs in the loop's executor through do, so it is also shared with threads
+        """
+        loop = asyncio.get_running_loop()
+        if not asyncio.iscoroutinefunction(fn):
+            return await loop.run_in_executor(
+                None, functools.partial(self.do, key, fn, *args, **kwargs)
+            )
+
+        loop_key = (id(loop), key)
+        with self._lock:
+            future = self._async_calls.get(loop_key)
+            leader = future is None
+            if leader:
+                future = self._async_calls[loop_key] = loop.create_future()
+                self.fetches += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            # Shielded so a cancelled waiter does not cancel the shared fetch
+            return await asyncio.shield(future)
+
+        release = None
+        try:
+            release = await loop.run_in_executor(None, self._acquire_process_lock, key)
+            result = await fn(*args, **kwargs)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved, nobody may be waiting for it
+            future.exception()
+            raise
+        finally:
+            if release is not None:
+                try:
+                    release()
+                except Exception as e:
+                    print(f"⚠️ Failed to release single flight lock for {key!r}: {e}")
+            with self._lock:
+                del self._async_calls[loop_key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Fetches run and requests served by another caller's fetch"""
+        with self._lock:
+            return {
+                "lock_backend": self.lock_backend,
+                "fetches": self.fetches,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls) + len(self._async_calls),
+            }
+
+
+# Global single flight instance
+_single_flight: Optional[SingleFlight] = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    """
+    Get the global single flight instance shared by all data providers
+
+    The cross-process lock comes from config["single_flight_lock"]
+    """
+    global _single_flight
+    with _single_flight_lock:
+        if _single_flight is None:
+            config = get_config()
+            _single_flight = SingleFlight(
+                lock_backend=config.get("single_flight_lock"),
+                lock_timeout=config.get("single_flight_lock_timeout", 300.0),
+            )
+        return _single_flight
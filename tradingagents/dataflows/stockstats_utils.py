@@ -4,9 +4,65 @@ from stockstats import wrap
 from typing import Annotated
 import os
 from .config import get_config
+from .price_store import get_price_store, frame_with_date_column
 
 
 class StockstatsUtils:
+    @staticmethod
+    def _load_price_data(
+        symbol: Annotated[str, "ticker symbol for the company"],
+        data_dir: Annotated[
+            str,
+            "directory where the stock data is stored.",
+        ],
+        online: Annotated[
+            bool,
+            "whether to use online tools to fetch data or offline tools. If True, will use online tools.",
+        ] = False,
+    ) -> pd.DataFrame:
+        """Load the full price history for a symbol with a YYYY-mm-dd string Date column."""
+        if not online:
+            try:
+                frame = get_price_store().get_frame(symbol, data_dir)
+            except FileNotFoundError:
+                raise Exception("Stockstats fail: Yahoo Finance data not fetched yet!")
+            return frame_with_date_column(frame)
+
+        # Get today's date as YYYY-mm-dd to add to cache
+        today_date = pd.Timestamp.today()
+
+        end_date = today_date
+        start_date = today_date - pd.DateOffset(years=15)
+        start_date = start_date.strftime("%Y-%m-%d")
+        end_date = end_date.strftime("%Y-%m-%d")
+
+        # Get config and ensure cache directory exists
+        config = get_config()
+        os.makedirs(config["data_cache_dir"], exist_ok=True)
+
+        data_file = os.path.join(
+            config["data_cache_dir"],
+            f"{symbol}-YFin-data-{start_date}-{end_date}.csv",
+        )
+
+        if os.path.exists(data_file):
+            data = pd.read_csv(data_file)
+            data["Date"] = pd.to_datetime(data["Date"])
+        else:
+            data = yf.download(
+                symbol,
+                start=start_date,
+                end=end_date,
+                multi_level_index=False,
+                progress=False,
+                auto_adjust=True,
+            )
+            data = data.reset_index()
+            data.to_csv(data_file, index=False)
+
+        data["Date"] = pd.to_datetime(data["Date"]).dt.strftime("%Y-%m-%d")
+        return data
+
     @staticmethod
     def get_stock_stats(
         symbol: Annotated[str, "ticker symbol for the company"],
@@ -25,63 +81,54 @@ class StockstatsUtils:
             "whether to use online tools to fetch data or offline tools. If True, will use online tools.",
         ] = False,
     ):
-        df = None
-        data = None
+        curr_date = pd.to_datetime(curr_date).strftime("%Y-%m-%d")
+        values = StockstatsUtils.get_stock_stats_window(
+            symbol, indicator, curr_date, curr_date, data_dir, online=online
+        )
 
-        if not online:
-            try:
-                data = pd.read_csv(
-                    os.path.join(
-                        data_dir,
-                        f"{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
-                    )
-                )
-                df = wrap(data)
-            except FileNotFoundError:
-                raise Exception("Stockstats fail: Yahoo Finance data not fetched yet!")
+        if not values.empty:
+            return values.iloc[0]
         else:
-            # Get today's date as YYYY-mm-dd to add to cache
-            today_date = pd.Timestamp.today()
-            curr_date = pd.to_datetime(curr_date)
-
-            end_date = today_date
-            start_date = today_date - pd.DateOffset(years=15)
-            start_date = start_date.strftime("%Y-%m-%d")
-            end_date = end_date.strftime("%Y-%m-%d")
-
-            # Get config and ensure cache directory exists
-            config = get_config()
-            os.makedirs(config["data_cache_dir"], exist_ok=True)
+            return "N/A: Not a trading day (weekend or holiday)"
 
-            data_file = os.path.join(
-                config["data_cache_dir"],
-                f"{symbol}-YFin-data-{start_date}-{end_date}.csv",
-            )
+    @staticmethod
+    def get_stock_stats_window(
+        symbol: Annotated[str, "ticker symbol for the company"],
+        indicator: Annotated[
+            str, "quantitative indicators based off of the stock data for the company"
+        ],
+        start_date: Annotated[str, "start date of the window, YYYY-mm-dd"],
+        end_date: Annotated[str, "end date of the window (inclusive), YYYY-mm-dd"],
+        data_dir: Annotated[
+            str,
+            "directory where the stock data is stored.",
+        ],
+        online: Annotated[
+            bool,
+            "whether to use online tools to fetch data or offline tools. If True, will use online tools.",
+        ] = False,
+    ) -> pd.Series:
+        """
+        Compute an indicator once over the full price history and return the
+        values for every trading day in [start_date, end_date].
 
-            if os.path.exists(data_file):
-                data = pd.read_csv(data_file)
-                data["Date"] = pd.to_datetime(data["Date"])
-            else:
-                data = yf.download(
-                    symbol,
-                    start=start_date,
-                    end=end_date,
-                    multi_level_index=False,
-                    progress=False,
-                    auto_adjust=True,
-                )
-                data = data.reset_index()
-                data.to_csv(data_file, index=False)
+        The price data is loaded a single time and stockstats computes the
+        indicator over the whole series (so look-back based indicators such as
+        close_200_sma stay correct at the start of the window); the window is
+        then taken with a DatetimeIndex slice.
 
-            df = wrap(data)
-            df["Date"] = df["Date"].dt.strftime("%Y-%m-%d")
-            curr_date = curr_date.strftime("%Y-%m-%d")
+        Returns:
+            pd.Series indexed by trading date (ascending) with the indicator values
+        """
+        data = StockstatsUtils._load_price_data(symbol, data_dir, online)
+        df = wrap(data)
+        series = df[indicator]  # trigger stockstats to calculate the indicator
 
-        df[indicator]  # trigger stockstats to calculate the indicator
-        matching_rows = df[df["Date"].str.startswith(curr_date)]
+        # stockstats indexes the frame by the date column
+        series = pd.Series(
+            series.values,
+            index=pd.to_datetime(series.index.astype(str).str[:10]),
+            name=indicator,
+        ).sort_index()
 
-        if not matching_rows.empty:
-            indicator_value = matching_rows[indicator].values[0]
-            return indicator_value
-        else:
-            return "N/A: Not a trading day (weekend or holiday)"
+        return series.loc[pd.Timestamp(start_date) : pd.Timestamp(end_date)]
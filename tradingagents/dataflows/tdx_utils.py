@@ -355,41 +355,7 @@ class TongDaXinDataProvider:
             if df.empty:
                 return {}
             
-            # 计算技术指标
-            indicators = {}
-            
-            # 移动平均线
-            indicators['MA5'] = df['Close'].rolling(5).mean().iloc[-1] if len(df) >= 5 else None
-            indicators['MA10'] = df['Close'].rolling(10).mean().iloc[-1] if len(df) >= 10 else None
-            indicators['MA20'] = df['Close'].rolling(20).mean().iloc[-1] if len(df) >= 20 else None
-            
-            # RSI
-            if len(df) >= 14:
-                delta = df['Close'].diff()
-                gain = (delta.where(delta > 0, 0)).rolling(14).mean()
-                loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-                rs = gain / loss
-                indicators['RSI'] = (100 - (100 / (1 + rs))).iloc[-1]
-            
-            # MACD
-            if len(df) >= 26:
-                exp1 = df['Close'].ewm(span=12).mean()
-                exp2 = df['Close'].ewm(span=26).mean()
-                macd = exp1 - exp2
-                signal = macd.ewm(span=9).mean()
-                indicators['MACD'] = macd.iloc[-1]
-                indicators['MACD_Signal'] = signal.iloc[-1]
-                indicators['MACD_Histogram'] = (macd - signal).iloc[-1]
-            
-            # 布林带
-            if len(df) >= 20:
-                sma = df['Close'].rolling(20).mean()
-                std = df['Close'].rolling(20).std()
-                indicators['BB_Upper'] = (sma + 2 * std).iloc[-1]
-                indicators['BB_Middle'] = sma.iloc[-1]
-                indicators['BB_Lower'] = (sma - 2 * std).iloc[-1]
-            
-            return indicators
+            return compute_technical_indicators(df)
             
         except Exception as e:
             print(f"计算技术指标失败: {e}")
@@ -601,6 +567,117 @@ _common_stock_names = {
     '688599': '天合光能',
 }
 
+def compute_technical_indicators(df: pd.DataFrame) -> Dict:
+    """
+    根据日线数据计算技术指标（MA、RSI、MACD、布林带）
+    Args:
+        df: 按日期排序、包含 Close 列的历史数据
+    Returns:
+        Dict: 最新一日的技术指标，数据不足的指标不计算
+    """
+    indicators = {}
+    
+    # 移动平均线
+    indicators['MA5'] = df['Close'].rolling(5).mean().iloc[-1] if len(df) >= 5 else None
+    indicators['MA10'] = df['Close'].rolling(10).mean().iloc[-1] if len(df) >= 10 else None
+    indicators['MA20'] = df['Close'].rolling(20).mean().iloc[-1] if len(df) >= 20 else None
+    
+    # RSI
+    if len(df) >= 14:
+        delta = df['Close'].diff()
+        gain = (delta.where(delta > 0, 0)).rolling(14).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+        rs = gain / loss
+        indicators['RSI'] = (100 - (100 / (1 + rs))).iloc[-1]
+    
+    # MACD
+    if len(df) >= 26:
+        exp1 = df['Close'].ewm(span=12).mean()
+        exp2 = df['Close'].ewm(span=26).mean()
+        macd = exp1 - exp2
+        signal = macd.ewm(span=9).mean()
+        indicators['MACD'] = macd.iloc[-1]
+        indicators['MACD_Signal'] = signal.iloc[-1]
+        indicators['MACD_Histogram'] = (macd - signal).iloc[-1]
+    
+    # 布林带
+    if len(df) >= 20:
+        sma = df['Close'].rolling(20).mean()
+        std = df['Close'].rolling(20).std()
+        indicators['BB_Upper'] = (sma + 2 * std).iloc[-1]
+        indicators['BB_Middle'] = sma.iloc[-1]
+        indicators['BB_Lower'] = (sma - 2 * std).iloc[-1]
+    
+    return indicators
+
+
+def quote_from_bars(stock_code: str, df: pd.DataFrame) -> Dict:
+    """
+    用最后一根日线代替实时行情（区间已结束或实时行情获取失败时），不访问网络
+    Args:
+        stock_code: 股票代码
+        df: 按日期排序的历史日线数据
+    Returns:
+        Dict: 与 get_real_time_data 相同字段的行情
+    """
+    last = df.iloc[-1]
+    last_close = df['Close'].iloc[-2] if len(df) >= 2 else last['Open']
+    return {
+        'code': stock_code,
+        'name': _stock_name_cache.get(stock_code) or _common_stock_names.get(stock_code, f'股票{stock_code}'),
+        'price': last['Close'],
+        'last_close': last_close,
+        'volume': int(last['Volume']),
+        'change_percent': ((last['Close'] - last_close) / last_close * 100) if last_close > 0 else 0,
+        'update_time': df.index[-1].strftime('%Y-%m-%d'),
+    }
+
+
+def format_china_stock_data(stock_code: str, df: pd.DataFrame, realtime_data: Dict,
+                            indicators: Dict, start_date: str, end_date: str) -> str:
+    """
+    格式化中国股票数据分析报告
+    Args:
+        stock_code: 股票代码
+        df: 区间内的历史日线数据
+        realtime_data: 实时行情
+        indicators: 技术指标
+        start_date: 开始日期 'YYYY-MM-DD'
+        end_date: 结束日期 'YYYY-MM-DD'
+    Returns:
+        str: 格式化的股票数据
+    """
+    return f"""
+# {stock_code} 股票数据分析
+
+## 📊 实时行情
+- 股票名称: {realtime_data.get('name', 'N/A')}
+- 当前价格: ¥{realtime_data.get('price', 0):.2f}
+- 涨跌幅: {realtime_data.get('change_percent', 0):.2f}%
+- 成交量: {realtime_data.get('volume', 0):,}手
+- 更新时间: {realtime_data.get('update_time', 'N/A')}
+
+## 📈 历史数据概览
+- 数据期间: {start_date} 至 {end_date}
+- 数据条数: {len(df)}条
+- 期间最高: ¥{df['High'].max():.2f}
+- 期间最低: ¥{df['Low'].min():.2f}
+- 期间涨幅: {((df['Close'].iloc[-1] - df['Close'].iloc[0]) / df['Close'].iloc[0] * 100):.2f}%
+
+## 🔍 技术指标
+- MA5: ¥{indicators.get('MA5', 0):.2f}
+- MA10: ¥{indicators.get('MA10', 0):.2f}
+- MA20: ¥{indicators.get('MA20', 0):.2f}
+- RSI: {indicators.get('RSI', 0):.2f}
+- MACD: {indicators.get('MACD', 0):.4f}
+
+## 📋 最近5日数据
+{df.tail().to_string()}
+
+数据来源: 通达信API (实时数据)
+"""
+
+
 def get_tdx_provider() -> TongDaXinDataProvider:
     """获取通达信数据提供器实例"""
     global _tdx_provider
@@ -628,6 +705,16 @@ def get_china_stock_data(stock_code: str, start_date: str, end_date: str) -> str
     Returns:
         str: 格式化的股票数据
     """
+    # 多个分析师或批量任务同时请求同一股票、同一区间时只获取一次
+    from .single_flight import get_single_flight
+    return get_single_flight().do(
+        ("tdx_stock_data", stock_code, start_date, end_date),
+        _get_china_stock_data, stock_code, start_date, end_date
+    )
+
+
+def _get_china_stock_data(stock_code: str, start_date: str, end_date: str) -> str:
+    """依次查询MongoDB缓存、文件缓存，未命中时从通达信API获取"""
     print(f"📊 正在获取中国股票数据: {stock_code} ({start_date} 到 {end_date})")
 
     # 优先尝试从数据库缓存加载数据（使用统一的database_manager）
@@ -694,35 +781,7 @@ def get_china_stock_data(stock_code: str, start_date: str, end_date: str) -> str
         indicators = provider.get_stock_technical_indicators(stock_code)
         
         # 格式化输出
-        result = f"""
-# {stock_code} 股票数据分析
-
-## 📊 实时行情
-- 股票名称: {realtime_data.get('name', 'N/A')}
-- 当前价格: ¥{realtime_data.get('price', 0):.2f}
-- 涨跌幅: {realtime_data.get('change_percent', 0):.2f}%
-- 成交量: {realtime_data.get('volume', 0):,}手
-- 更新时间: {realtime_data.get('update_time', 'N/A')}
-
-## 📈 历史数据概览
-- 数据期间: {start_date} 至 {end_date}
-- 数据条数: {len(df)}条
-- 期间最高: ¥{df['High'].max():.2f}
-- 期间最低: ¥{df['Low'].min():.2f}
-- 期间涨幅: {((df['Close'].iloc[-1] - df['Close'].iloc[0]) / df['Close'].iloc[0] * 100):.2f}%
-
-## 🔍 技术指标
-- MA5: ¥{indicators.get('MA5', 0):.2f}
-- MA10: ¥{indicators.get('MA10', 0):.2f}
-- MA20: ¥{indicators.get('MA20', 0):.2f}
-- RSI: {indicators.get('RSI', 0):.2f}
-- MACD: {indicators.get('MACD', 0):.4f}
-
-## 📋 最近5日数据
-{df.tail().to_string()}
-
-数据来源: 通达信API (实时数据)
-"""
+        result = format_china_stock_data(stock_code, df, realtime_data, indicators, start_date, end_date)
 
         # 优先保存到数据库缓存（使用统一的database_manager）
         try:
@@ -15,10 +15,50 @@ DEFAULT_CONFIG = {
     "deep_think_llm": "o4-mini",
     "quick_think_llm": "gpt-4o-mini",
     "backend_url": "https://api.openai.com/v1",
+    # LLM response cache: "off", "record" (reuse responses, record new ones) or
+    # "replay" (cached responses only, never calls the model); stored in a local SQLite file
+    "llm_cache_mode": os.getenv("TRADINGAGENTS_LLM_CACHE", "off"),
+    "llm_cache_path": os.getenv("TRADINGAGENTS_LLM_CACHE_PATH", "./llm_cache/responses.sqlite"),
     # Debate and discussion settings
     "max_debate_rounds": 1,
     "max_risk_discuss_rounds": 1,
     "max_recur_limit": 100,
+    # Token budget for the reports + debate history in each debate/judge prompt; above it
+    # reports and all but the latest context_recent_turns turns are summarized (None = off)
+    "context_token_budget": None,
+    "context_recent_turns": 2,
+    # Run the selected analysts concurrently instead of one after another
+    "parallel_analysts": False,
+    # Maximum number of (ticker, date) jobs run at once by propagate_batch/apropagate_many
+    "max_concurrent_jobs": 4,
+    # Write the per-ticker JSON Lines state log gzip-compressed (full_states_log.jsonl.gz)
+    "state_log_compress": False,
+    # BUY/SELL/HOLD is read from the final decision by rules; below this confidence the
+    # quick-thinking LLM extracts it instead (set above 1.0 to always use the LLM)
+    "decision_min_confidence": 0.8,
+    # Reflection LLM calls in flight per provider in reflect_and_remember(_batch); 1 = sequential
+    "reflection_max_concurrency": 5,
+    # Memory settings
+    # Embeddings are cached by content hash in memory; set a path to also keep them on disk
+    "embedding_cache_size": 1024,
+    "embedding_cache_path": None,
+    # Embedding requests: chunks sent concurrently and optional request rate budget
+    "embedding_max_concurrency": 4,
+    "embedding_requests_per_minute": None,
+    # Memory vector store: "numpy" (exact, in-process), "hnsw" (approximate, needs hnswlib),
+    # "chroma" (in-process Chroma) or "disk" (persistent, memory-mapped under memory_dir)
+    "memory_backend": "numpy",
+    "memory_dir": os.getenv("TRADINGAGENTS_MEMORY_DIR", "./memory"),
+    "memory_hnsw_m": 16,
+    "memory_hnsw_ef_construction": 200,
+    "memory_hnsw_ef": 50,
+    # Data fetches: concurrent identical requests share one fetch; set "file" or "redis"
+    # to also coordinate processes on this host / sharing the Redis server (None = in-process)
+    "single_flight_lock": None,
+    "single_flight_lock_timeout": 300,
+    # Daily bars are kept per symbol and only missing dates are fetched; bars of the
+    # current session are refetched after this many seconds
+    "bar_store_live_ttl": 900,
     # Tool settings
     "online_tools": True,
 
@@ -1,11 +1,23 @@
 # TradingAgents/graph/__init__.py
 
-from .trading_graph import TradingAgentsGraph
-from .conditional_logic import ConditionalLogic
-from .setup import GraphSetup
-from .propagation import Propagator
-from .reflection import Reflector
-from .signal_processing import SignalProcessor
+# Components are imported on first access, building the graph pulls in the
+# agents, LangGraph and the selected LLM provider
+from tradingagents.lazy_import import lazy_attributes
+
+__getattr__, __dir__ = lazy_attributes(
+    __name__,
+    {
+        "TradingAgentsGraph": ".trading_graph",
+        "ConditionalLogic": ".conditional_logic",
+        "GraphSetup": ".setup",
+        "Propagator": ".propagation",
+        "Reflector": ".reflection",
+        "SignalProcessor": ".signal_processing",
+        "StateLogger": ".state_logger",
+        "StateLogReader": ".state_logger",
+        "get_state_logger": ".state_logger",
+    },
+)
 
 __all__ = [
     "TradingAgentsGraph",
@@ -14,4 +26,7 @@ __all__ = [
     "Propagator",
     "Reflector",
     "SignalProcessor",
+    "StateLogger",
+    "StateLogReader",
+    "get_state_logger",
 ]
@@ -1,15 +1,57 @@
 # TradingAgents/graph/reflection.py
 
-from typing import Dict, Any
-from langchain_openai import ChatOpenAI
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterable, List, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
+
+# (memory key, component type, decision text in the final state) for every
+# agent that learns from its past decisions
+REFLECTION_COMPONENTS = (
+    ("bull", "BULL", lambda state: state["investment_debate_state"]["bull_history"]),
+    ("bear", "BEAR", lambda state: state["investment_debate_state"]["bear_history"]),
+    ("trader", "TRADER", lambda state: state["trader_investment_plan"]),
+    ("invest_judge", "INVEST JUDGE", lambda state: state["investment_debate_state"]["judge_decision"]),
+    ("risk_manager", "RISK JUDGE", lambda state: state["risk_debate_state"]["judge_decision"]),
+)
+
+_provider_semaphores = {}
+_provider_semaphores_lock = threading.Lock()
+
+
+def get_provider_semaphore(provider: str, max_concurrency: int) -> threading.BoundedSemaphore:
+    """Get the semaphore capping concurrent reflection calls to an LLM provider.
+
+    Shared by every Reflector in the process, so concurrent batches against
+    the same provider stay under one cap; the first caller sets its size.
+    """
+    with _provider_semaphores_lock:
+        semaphore = _provider_semaphores.get(provider)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(max(1, max_concurrency))
+            _provider_semaphores[provider] = semaphore
+    return semaphore
 
 
 class Reflector:
     """Handles reflection on decisions and updating memory."""
 
-    def __init__(self, quick_thinking_llm: ChatOpenAI):
-        """Initialize the reflector with an LLM."""
+    def __init__(self, quick_thinking_llm: "ChatOpenAI", max_concurrency: int = 5,
+                 provider: str = "default"):
+        """Initialize the reflector with an LLM.
+
+        Args:
+            quick_thinking_llm: LLM writing the reflections
+            max_concurrency: Maximum reflection calls in flight to ``provider``
+                (1 reflects one component after another)
+            provider: LLM provider name the concurrency cap is shared under
+        """
         self.quick_thinking_llm = quick_thinking_llm
+        self.max_concurrency = max(1, max_concurrency)
+        self.provider = provider
         self.reflection_system_prompt = self._get_reflection_prompt()
 
     def _get_reflection_prompt(self) -> str:
@@ -119,3 +161,71 @@ Adhere strictly to these instructions, and ensure your output is detailed, accur
             "RISK JUDGE", judge_decision, situation, returns_losses
         )
         risk_manager_memory.add_situations([(situation, result)])
+
+    def _reflect_limited(self, component_type: str, report: str, situation: str, returns_losses) -> str:
+        with get_provider_semaphore(self.provider, self.max_concurrency):
+            return self._reflect_on_component(component_type, report, situation, returns_losses)
+
+    def reflect_batch(
+        self,
+        states_and_returns: Iterable[Tuple[Dict[str, Any], Any]],
+        memories: Dict[str, Any],
+    ) -> Dict[str, List[str]]:
+        """Reflect on many past runs at once and update the memories.
+
+        Every (run, component) reflection is an independent LLM call, so they
+        run concurrently, up to ``max_concurrency`` per provider. The lessons
+        are then added with one ``add_situations`` call per memory, which
+        embeds them in batches and inserts them together.
+
+        Args:
+            states_and_returns: (final state, returns/losses) pairs
+            memories: Memory per component key of ``REFLECTION_COMPONENTS``
+                ("bull", "bear", "trader", "invest_judge", "risk_manager");
+                components without a memory are skipped
+
+        Returns:
+            The reflections written per component key, in input order
+
+        Raises:
+            The first reflection error, after the successful reflections have
+            been added to the memories
+        """
+        tasks = []
+        for current_state, returns_losses in states_and_returns:
+            situation = self._extract_current_situation(current_state)
+            for key, component_type, get_report in REFLECTION_COMPONENTS:
+                if key in memories:
+                    tasks.append((key, component_type, get_report(current_state), situation, returns_losses))
+
+        if not tasks:
+            return {}
+
+        def run(task):
+            _key, component_type, report, situation, returns_losses = task
+            return self._reflect_limited(component_type, report, situation, returns_losses)
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(tasks))) as executor:
+            futures = [executor.submit(run, task) for task in tasks]
+
+        lessons: Dict[str, List[Tuple[str, str]]] = {}
+        errors = []
+        for task, future in zip(tasks, futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                errors.append(e)
+                continue
+            lessons.setdefault(task[0], []).append((task[3], result))
+
+        for key, situations_and_advice in lessons.items():
+            memories[key].add_situations(situations_and_advice)
+
+        if errors:
+            print(f"⚠️ {len(errors)} of {len(tasks)} reflections failed")
+            raise errors[0]
+
+        return {
+            key: [result for _situation, result in situations_and_advice]
+            for key, situations_and_advice in lessons.items()
+        }
@@ -1,7 +1,6 @@
 # TradingAgents/graph/setup.py
 
-from typing import Dict, Any
-from langchain_openai import ChatOpenAI
+from typing import Dict, Any, TYPE_CHECKING
 from langgraph.graph import END, StateGraph, START
 from langgraph.prebuilt import ToolNode
 
@@ -11,14 +10,25 @@ from tradingagents.agents.utils.agent_utils import Toolkit
 
 from .conditional_logic import ConditionalLogic
 
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
+# State key each analyst writes its report to
+ANALYST_REPORT_KEYS = {
+    "market": "market_report",
+    "social": "sentiment_report",
+    "news": "news_report",
+    "fundamentals": "fundamentals_report",
+}
+
 
 class GraphSetup:
     """Handles the setup and configuration of the agent graph."""
 
     def __init__(
         self,
-        quick_thinking_llm: ChatOpenAI,
-        deep_thinking_llm: ChatOpenAI,
+        quick_thinking_llm: "ChatOpenAI",
+        deep_thinking_llm: "ChatOpenAI",
         toolkit: Toolkit,
         tool_nodes: Dict[str, ToolNode],
         bull_memory,
@@ -27,8 +37,13 @@ class GraphSetup:
         invest_judge_memory,
         risk_manager_memory,
         conditional_logic: ConditionalLogic,
+        context_compactor=None,
     ):
-        """Initialize with required components."""
+        """Initialize with required components.
+
+        ``context_compactor`` (a ``ContextCompactor``) keeps the debate and
+        judge prompts inside a token budget; None sends full reports and history.
+        """
         self.quick_thinking_llm = quick_thinking_llm
         self.deep_thinking_llm = deep_thinking_llm
         self.toolkit = toolkit
@@ -39,9 +54,52 @@ class GraphSetup:
         self.invest_judge_memory = invest_judge_memory
         self.risk_manager_memory = risk_manager_memory
         self.conditional_logic = conditional_logic
+        self.context_compactor = context_compactor
+
+    def _create_parallel_analyst(self, analyst_type, analyst_node, tool_node):
+        """Wrap an analyst and its tool loop in a subgraph with its own message channel.
+
+        The returned node runs the subgraph from a fresh message history and only
+        writes the analyst's report back, so several analysts can run as
+        concurrent branches of the main graph without sharing messages.
+        """
+        analyst_name = f"{analyst_type.capitalize()} Analyst"
+        tools_name = f"tools_{analyst_type}"
+        report_key = ANALYST_REPORT_KEYS[analyst_type]
+
+        subgraph = StateGraph(AgentState)
+        subgraph.add_node(analyst_name, analyst_node)
+        subgraph.add_node(tools_name, tool_node)
+        subgraph.add_edge(START, analyst_name)
+        subgraph.add_conditional_edges(
+            analyst_name,
+            getattr(self.conditional_logic, f"should_continue_{analyst_type}"),
+            {
+                tools_name: tools_name,
+                f"Msg Clear {analyst_type.capitalize()}": END,
+            },
+        )
+        subgraph.add_edge(tools_name, analyst_name)
+        compiled = subgraph.compile()
+
+        def parallel_analyst_node(state, config):
+            result = compiled.invoke(
+                {
+                    "messages": [("human", state["company_of_interest"])],
+                    "company_of_interest": state["company_of_interest"],
+                    "trade_date": state["trade_date"],
+                    report_key: "",
+                },
+                config,
+            )
+            return {report_key: result.get(report_key, "")}
+
+        return parallel_analyst_node
 
     def setup_graph(
-        self, selected_analysts=["market", "social", "news", "fundamentals"]
+        self,
+        selected_analysts=["market", "social", "news", "fundamentals"],
+        parallel_analysts=False,
     ):
         """Set up and compile the agent workflow graph.
 
@@ -51,6 +109,10 @@ class GraphSetup:
                 - "social": Social media analyst
                 - "news": News analyst
                 - "fundamentals": Fundamentals analyst
+            parallel_analysts (bool): Run the selected analysts as concurrent
+                branches from START, each with an isolated message channel, and
+                join them before the Bull Researcher. Otherwise they run in
+                sequence sharing the message channel.
         """
         if len(selected_analysts) == 0:
             raise ValueError("Trading Agents Graph Setup Error: no analysts selected!")
@@ -90,22 +152,24 @@ class GraphSetup:
 
         # Create researcher and manager nodes
         bull_researcher_node = create_bull_researcher(
-            self.quick_thinking_llm, self.bull_memory
+            self.quick_thinking_llm, self.bull_memory, self.context_compactor
         )
         bear_researcher_node = create_bear_researcher(
-            self.quick_thinking_llm, self.bear_memory
+            self.quick_thinking_llm, self.bear_memory, self.context_compactor
         )
         research_manager_node = create_research_manager(
-            self.deep_thinking_llm, self.invest_judge_memory
+            self.deep_thinking_llm, self.invest_judge_memory, self.context_compactor
+        )
+        trader_node = create_trader(
+            self.quick_thinking_llm, self.trader_memory, self.context_compactor
         )
-        trader_node = create_trader(self.quick_thinking_llm, self.trader_memory)
 
         # Create risk analysis nodes
-        risky_analyst = create_risky_debator(self.quick_thinking_llm)
-        neutral_analyst = create_neutral_debator(self.quick_thinking_llm)
-        safe_analyst = create_safe_debator(self.quick_thinking_llm)
+        risky_analyst = create_risky_debator(self.quick_thinking_llm, self.context_compactor)
+        neutral_analyst = create_neutral_debator(self.quick_thinking_llm, self.context_compactor)
+        safe_analyst = create_safe_debator(self.quick_thinking_llm, self.context_compactor)
         risk_manager_node = create_risk_manager(
-            self.deep_thinking_llm, self.risk_manager_memory
+            self.deep_thinking_llm, self.risk_manager_memory, self.context_compactor
         )
 
         # Create workflow
@@ -113,6 +177,14 @@ class GraphSetup:
 
         # Add analyst nodes to the graph
         for analyst_type, node in analyst_nodes.items():
+            if parallel_analysts:
+                workflow.add_node(
+                    f"{analyst_type.capitalize()} Analyst",
+                    self._create_parallel_analyst(
+                        analyst_type, node, tool_nodes[analyst_type]
+                    ),
+                )
+                continue
             workflow.add_node(f"{analyst_type.capitalize()} Analyst", node)
             workflow.add_node(
                 f"Msg Clear {analyst_type.capitalize()}", delete_nodes[analyst_type]
@@ -130,30 +202,40 @@ class GraphSetup:
         workflow.add_node("Risk Judge", risk_manager_node)
 
         # Define edges
-        # Start with the first analyst
-        first_analyst = selected_analysts[0]
-        workflow.add_edge(START, f"{first_analyst.capitalize()} Analyst")
-
-        # Connect analysts in sequence
-        for i, analyst_type in enumerate(selected_analysts):
-            current_analyst = f"{analyst_type.capitalize()} Analyst"
-            current_tools = f"tools_{analyst_type}"
-            current_clear = f"Msg Clear {analyst_type.capitalize()}"
-
-            # Add conditional edges for current analyst
-            workflow.add_conditional_edges(
-                current_analyst,
-                getattr(self.conditional_logic, f"should_continue_{analyst_type}"),
-                [current_tools, current_clear],
-            )
-            workflow.add_edge(current_tools, current_analyst)
-
-            # Connect to next analyst or to Bull Researcher if this is the last analyst
-            if i < len(selected_analysts) - 1:
-                next_analyst = f"{selected_analysts[i+1].capitalize()} Analyst"
-                workflow.add_edge(current_clear, next_analyst)
-            else:
-                workflow.add_edge(current_clear, "Bull Researcher")
+        if parallel_analysts:
+            # Fan out all analysts from START and join them before the Bull Researcher
+            analyst_names = [
+                f"{analyst_type.capitalize()} Analyst"
+                for analyst_type in analyst_nodes
+            ]
+            for analyst_name in analyst_names:
+                workflow.add_edge(START, analyst_name)
+            workflow.add_edge(analyst_names, "Bull Researcher")
+        else:
+            # Start with the first analyst
+            first_analyst = selected_analysts[0]
+            workflow.add_edge(START, f"{first_analyst.capitalize()} Analyst")
+
+            # Connect analysts in sequence
+            for i, analyst_type in enumerate(selected_analysts):
+                current_analyst = f"{analyst_type.capitalize()} Analyst"
+                current_tools = f"tools_{analyst_type}"
+                current_clear = f"Msg Clear {analyst_type.capitalize()}"
+
+                # Add conditional edges for current analyst
+                workflow.add_conditional_edges(
+                    current_analyst,
+                    getattr(self.conditional_logic, f"should_continue_{analyst_type}"),
+                    [current_tools, current_clear],
+                )
+                workflow.add_edge(current_tools, current_analyst)
+
+                # Connect to next analyst or to Bull Researcher if this is the last analyst
+                if i < len(selected_analysts) - 1:
+                    next_analyst = f"{selected_analysts[i+1].capitalize()} Analyst"
+                    workflow.add_edge(current_clear, next_analyst)
+                else:
+                    workflow.add_edge(current_clear, "Bull Researcher")
 
         # Add remaining edges
         workflow.add_conditional_edges(
@@ -1,14 +1,102 @@
 # TradingAgents/graph/signal_processing.py
 
-from langchain_openai import ChatOpenAI
+import re
+from typing import TYPE_CHECKING, Optional, Tuple
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
+
+DECISIONS = ("BUY", "SELL", "HOLD")
+
+EXPLICIT_CONFIDENCE = 0.9
+
+_ZH_DECISIONS = {
+    "买入": "BUY",
+    "增持": "BUY",
+    "卖出": "SELL",
+    "减持": "SELL",
+    "持有": "HOLD",
+    "观望": "HOLD",
+}
+
+_EN = r"(?<!/)(BUY|SELL|HOLD)\b(?!\s*/)"  # not the "BUY/HOLD/SELL" template itself
+_ZH = r"(?<!/)(买入|增持|卖出|减持|持有|观望|BUY|SELL|HOLD)(?![A-Za-z]|\s*/)"
+
+# (confidence, pattern), most explicit phrasing first. Explicit statements
+# (EXPLICIT_CONFIDENCE and above) must all agree; weaker rules only decide
+# when there is no explicit statement and all their matches agree.
+_DECISION_RULES = [
+    (0.99, re.compile(r"FINAL\s+TRANSACTION\s+PROPOSAL\s*[:：]?\s*\**\s*" + _EN, re.IGNORECASE)),
+    (0.95, re.compile(r"最终(?:交易)?(?:建议|决策|决定|提案|结论)\s*[:：为是]?\s*\**\s*" + _ZH, re.IGNORECASE)),
+    (0.9, re.compile(
+        r"(?:final\s+)?(?:recommendation|decision|verdict|call)\s*(?:is|:)\s*(?:to\s+)?\**\s*" + _EN,
+        re.IGNORECASE,
+    )),
+    (0.9, re.compile(r"(?:投资|操作)?(?:建议|决策|决定|结论)\s*[:：为是]\s*\**\s*" + _ZH, re.IGNORECASE)),
+    (0.8, re.compile(r"\*\*\s*" + _EN + r"\s*\*\*", re.IGNORECASE)),
+    # bare upper-case decision words; prose like "hold the line" is lower case
+    (0.6, re.compile(r"\b" + _EN)),
+]
+
+
+def _normalize_decision(word: str) -> str:
+    return _ZH_DECISIONS.get(word, word.upper())
+
+
+def extract_decision(text: str) -> Tuple[Optional[str], float]:
+    """
+    Extract BUY/SELL/HOLD from a trade decision without calling an LLM.
+
+    Args:
+        text: Final trade decision written by the Risk Judge (English or Chinese)
+
+    Returns:
+        (decision, confidence); decision is None when the text is ambiguous
+    """
+    if not text:
+        return None, 0.0
+
+    # The judge often quotes the trader's "FINAL TRANSACTION PROPOSAL" before
+    # giving its own recommendation, so explicit statements of every rule are
+    # compared, not just those of the strongest rule that matches
+    explicit = {}
+    for confidence, pattern in _DECISION_RULES:
+        if confidence < EXPLICIT_CONFIDENCE:
+            break
+        for match in pattern.findall(text):
+            decision = _normalize_decision(match)
+            explicit[decision] = max(explicit.get(decision, 0.0), confidence)
+    if len(explicit) > 1:
+        return None, 0.0
+    if explicit:
+        return next(iter(explicit.items()))
+
+    for confidence, pattern in _DECISION_RULES:
+        if confidence >= EXPLICIT_CONFIDENCE:
+            continue
+        found = {_normalize_decision(match) for match in pattern.findall(text)}
+        if len(found) == 1:
+            return found.pop(), confidence
+        if len(found) > 1:
+            # conflicting statements at this level are not resolved by weaker rules
+            return None, 0.0
+    return None, 0.0
 
 
 class SignalProcessor:
     """Processes trading signals to extract actionable decisions."""
 
-    def __init__(self, quick_thinking_llm: ChatOpenAI):
-        """Initialize with an LLM for processing."""
+    def __init__(self, quick_thinking_llm: "ChatOpenAI", min_confidence: float = 0.8):
+        """Initialize with an LLM for processing.
+
+        Args:
+            quick_thinking_llm: LLM used when the rule-based extractor is unsure
+            min_confidence: Rule-based decisions below this confidence fall back
+                to the LLM; above 1.0 the LLM is always used
+        """
         self.quick_thinking_llm = quick_thinking_llm
+        self.min_confidence = min_confidence
 
     def process_signal(self, full_signal: str) -> str:
         """
@@ -20,6 +108,10 @@ class SignalProcessor:
         Returns:
             Extracted decision (BUY, SELL, or HOLD)
         """
+        decision, confidence = extract_decision(full_signal)
+        if decision is not None and confidence >= self.min_confidence:
+            return decision
+
         messages = [
             (
                 "system",
@@ -0,0 +1,199 @@
+# TradingAgents/graph/state_logger.py
+
+import atexit
+import gzip
+import json
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    try:
+        import msvcrt
+    except ImportError:
+        msvcrt = None
+
+
+@contextmanager
+def _locked(lock_path: str):
+    """Cross-process file lock (flock on POSIX, msvcrt.locking on Windows)."""
+    with open(lock_path, "a+b") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class StateLogger:
+    """Appends one compact record per run to a JSON Lines state log.
+
+    Records are queued and written by a background thread, so logging does not
+    block the run, and every write is a single append: the cost of a run does
+    not depend on how many runs were logged before it. Next to each log an
+    ``.idx`` file gets one ``trade_date<TAB>offset<TAB>length`` line per record
+    so ``StateLogReader`` can load single dates without reading the whole log.
+
+    With ``compress`` each record is written as its own gzip member
+    (``.jsonl.gz``); the file is still a valid gzip stream and single records
+    can be decompressed from their offset.
+
+    The record and its index line are appended under a ``.lock`` file, so
+    several processes can log to the same directory. Within a process use
+    ``get_state_logger`` to share one logger and writer thread.
+    """
+
+    def __init__(self, compress: bool = False):
+        self.compress = compress
+        self._queue = queue.Queue()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        atexit.register(self.flush)
+
+    @staticmethod
+    def log_path(directory: str, compress: bool = False) -> str:
+        """Path of the state log in a directory."""
+        return os.path.join(
+            directory, "full_states_log.jsonl.gz" if compress else "full_states_log.jsonl"
+        )
+
+    def log(self, directory: str, record: Dict[str, Any]):
+        """Queue a record for appending to the state log in ``directory``."""
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._writer_loop, name="state-log-writer", daemon=True
+                )
+                self._thread.start()
+        self._queue.put((directory, record))
+
+    def flush(self):
+        """Block until every queued record is written."""
+        self._queue.join()
+
+    def _writer_loop(self):
+        while True:
+            directory, record = self._queue.get()
+            try:
+                self._write(directory, record)
+            except Exception as e:
+                print(f"⚠️ Failed to write state log in {directory}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, directory: str, record: Dict[str, Any]):
+        os.makedirs(directory, exist_ok=True)
+        path = self.log_path(directory, self.compress)
+
+        data = (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        if self.compress:
+            data = gzip.compress(data)
+
+        # The offset is only right if nobody appends between reading it and
+        # writing the index line
+        with _locked(path + ".lock"):
+            with open(path, "ab") as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(data)
+            with open(path + ".idx", "a", encoding="utf-8") as f:
+                f.write(f"{record['trade_date']}\t{offset}\t{len(data)}\n")
+
+
+_state_loggers: Dict[bool, StateLogger] = {}
+_state_loggers_lock = threading.Lock()
+
+
+def get_state_logger(compress: bool = False) -> StateLogger:
+    """Get the process-wide state logger (one per ``compress`` setting)."""
+    with _state_loggers_lock:
+        logger = _state_loggers.get(compress)
+        if logger is None:
+            logger = _state_loggers[compress] = StateLogger(compress=compress)
+        return logger
+
+
+class StateLogReader:
+    """Reads a state log written by ``StateLogger``, one date at a time."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.compressed = path.endswith(".gz")
+        self._index = None
+
+    @classmethod
+    def for_directory(cls, directory: str) -> "StateLogReader":
+        """Open the state log in a directory, compressed or not."""
+        compressed = StateLogger.log_path(directory, compress=True)
+        if os.path.exists(compressed):
+            return cls(compressed)
+        return cls(StateLogger.log_path(directory))
+
+    def refresh(self):
+        """Drop the cached index to see records appended since it was loaded."""
+        self._index = None
+
+    def _load_index(self) -> Dict[str, List[tuple]]:
+        """trade_date -> [(offset, length), ...] in write order."""
+        if self._index is not None:
+            return self._index
+
+        index: Dict[str, List[tuple]] = {}
+        if os.path.exists(self.path + ".idx"):
+            with open(self.path + ".idx", "r", encoding="utf-8") as f:
+                for line in f:
+                    parts = line.rstrip("\n").split("\t")
+                    if len(parts) == 3:
+                        index.setdefault(parts[0], []).append((int(parts[1]), int(parts[2])))
+        elif not self.compressed and os.path.exists(self.path):
+            # rebuild from the log itself
+            offset = 0
+            with open(self.path, "rb") as f:
+                for line in f:
+                    if line.strip():
+                        trade_date = str(json.loads(line)["trade_date"])
+                        index.setdefault(trade_date, []).append((offset, len(line)))
+                    offset += len(line)
+        self._index = index
+        return index
+
+    def _read_at(self, offset: int, length: int) -> Dict[str, Any]:
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            data = f.read(length)
+        if self.compressed:
+            data = gzip.decompress(data)
+        return json.loads(data)
+
+    def dates(self) -> List[str]:
+        """Sorted trade dates present in the log."""
+        return sorted(self._load_index())
+
+    def load(self, trade_date) -> Optional[Dict[str, Any]]:
+        """Load the latest record logged for a trade date, or None."""
+        entries = self._load_index().get(str(trade_date))
+        if not entries:
+            return None
+        return self._read_at(*entries[-1])
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over all records in write order."""
+        opener = gzip.open if self.compressed else open
+        if not os.path.exists(self.path):
+            return
+        with opener(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
@@ -1,40 +1,39 @@
 # TradingAgents/graph/trading_graph.py
 
 import os
-from pathlib import Path
-import json
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date
 from typing import Dict, Any, Tuple, List, Optional
 
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
-from langchain_google_genai import ChatGoogleGenerativeAI
+import importlib.util
 
-# Import DashScope adapter if available
-try:
-    from tradingagents.llm_adapters.dashscope_adapter import ChatDashScope
-    DASHSCOPE_AVAILABLE = True
-except ImportError:
-    DASHSCOPE_AVAILABLE = False
-    ChatDashScope = None
+# Provider chat model classes are imported in __init__ for the configured
+# provider only; checking for DashScope does not import it
+DASHSCOPE_AVAILABLE = importlib.util.find_spec("dashscope") is not None
 
 from langgraph.prebuilt import ToolNode
 
+from shared.cache.llm_response_cache import get_llm_response_cache
+
 from tradingagents.agents import *
 from tradingagents.default_config import DEFAULT_CONFIG
 from tradingagents.agents.utils.memory import FinancialSituationMemory
+from tradingagents.agents.utils.context_compactor import ContextCompactor
 from tradingagents.agents.utils.agent_states import (
     AgentState,
     InvestDebateState,
     RiskDebateState,
 )
-from tradingagents.dataflows.interface import set_config
+from tradingagents.dataflows.config import set_config
 
 from .conditional_logic import ConditionalLogic
 from .setup import GraphSetup
 from .propagation import Propagator
 from .reflection import Reflector
 from .signal_processing import SignalProcessor
+from .state_logger import get_state_logger
 
 
 class TradingAgentsGraph:
@@ -65,42 +64,63 @@ class TradingAgentsGraph:
             exist_ok=True,
         )
 
-        # Initialize LLMs
+        # Initialize LLMs; both share one response cache when llm_cache_mode is not "off"
+        llm_cache = get_llm_response_cache(
+            self.config.get("llm_cache_mode", "off"), self.config.get("llm_cache_path")
+        )
+        # Token usage, including provider prompt-cache hits, is recorded by the
+        # TokenTracker; ChatDashScope records its own usage
+        from tradingagents.llm_adapters.usage_callback import TokenUsageCallbackHandler
+
+        usage_callbacks = [TokenUsageCallbackHandler(self.config["llm_provider"].lower())]
         if self.config["llm_provider"].lower() == "openai" or self.config["llm_provider"] == "ollama" or self.config["llm_provider"] == "openrouter":
-            self.deep_thinking_llm = ChatOpenAI(model=self.config["deep_think_llm"], base_url=self.config["backend_url"])
-            self.quick_thinking_llm = ChatOpenAI(model=self.config["quick_think_llm"], base_url=self.config["backend_url"])
+            from langchain_openai import ChatOpenAI
+
+            self.deep_thinking_llm = ChatOpenAI(model=self.config["deep_think_llm"], base_url=self.config["backend_url"], cache=llm_cache, callbacks=usage_callbacks)
+            self.quick_thinking_llm = ChatOpenAI(model=self.config["quick_think_llm"], base_url=self.config["backend_url"], cache=llm_cache, callbacks=usage_callbacks)
         elif self.config["llm_provider"].lower() == "anthropic":
-            self.deep_thinking_llm = ChatAnthropic(model=self.config["deep_think_llm"], base_url=self.config["backend_url"])
-            self.quick_thinking_llm = ChatAnthropic(model=self.config["quick_think_llm"], base_url=self.config["backend_url"])
+            from langchain_anthropic import ChatAnthropic
+
+            self.deep_thinking_llm = ChatAnthropic(model=self.config["deep_think_llm"], base_url=self.config["backend_url"], cache=llm_cache, callbacks=usage_callbacks)
+            self.quick_thinking_llm = ChatAnthropic(model=self.config["quick_think_llm"], base_url=self.config["backend_url"], cache=llm_cache, callbacks=usage_callbacks)
         elif self.config["llm_provider"].lower() == "google":
+            from langchain_google_genai import ChatGoogleGenerativeAI
+
             google_api_key = os.getenv('GOOGLE_API_KEY')
             self.deep_thinking_llm = ChatGoogleGenerativeAI(
                 model=self.config["deep_think_llm"],
                 google_api_key=google_api_key,
                 temperature=0.1,
-                max_tokens=2000
+                max_tokens=2000,
+                cache=llm_cache,
+                callbacks=usage_callbacks
             )
             self.quick_thinking_llm = ChatGoogleGenerativeAI(
                 model=self.config["quick_think_llm"],
                 google_api_key=google_api_key,
                 temperature=0.1,
-                max_tokens=2000
+                max_tokens=2000,
+                cache=llm_cache,
+                callbacks=usage_callbacks
             )
         elif (self.config["llm_provider"].lower() == "dashscope" or
               "dashscope" in self.config["llm_provider"].lower() or
               "alibaba" in self.config["llm_provider"].lower()):
             if not DASHSCOPE_AVAILABLE:
                 raise ValueError("DashScope adapter not available. Please install dashscope package: pip install dashscope")
+            from tradingagents.llm_adapters.dashscope_adapter import ChatDashScope
 
             self.deep_thinking_llm = ChatDashScope(
                 model=self.config["deep_think_llm"],
                 temperature=0.1,
-                max_tokens=2000
+                max_tokens=2000,
+                cache=llm_cache
             )
             self.quick_thinking_llm = ChatDashScope(
                 model=self.config["quick_think_llm"],
                 temperature=0.1,
-                max_tokens=2000
+                max_tokens=2000,
+                cache=llm_cache
             )
         else:
             raise ValueError(f"Unsupported LLM provider: {self.config['llm_provider']}")
@@ -117,6 +137,15 @@ class TradingAgentsGraph:
         # Create tool nodes
         self.tool_nodes = self._create_tool_nodes()
 
+        # Summarize reports and older debate turns in prompts over the token budget
+        self.context_compactor = None
+        if self.config.get("context_token_budget"):
+            self.context_compactor = ContextCompactor(
+                self.quick_thinking_llm,
+                self.config["context_token_budget"],
+                recent_turns=self.config.get("context_recent_turns", 2),
+            )
+
         # Initialize components
         self.conditional_logic = ConditionalLogic()
         self.graph_setup = GraphSetup(
@@ -130,19 +159,33 @@ class TradingAgentsGraph:
             self.invest_judge_memory,
             self.risk_manager_memory,
             self.conditional_logic,
+            self.context_compactor,
         )
 
         self.propagator = Propagator()
-        self.reflector = Reflector(self.quick_thinking_llm)
-        self.signal_processor = SignalProcessor(self.quick_thinking_llm)
+        self.reflector = Reflector(
+            self.quick_thinking_llm,
+            max_concurrency=self.config.get("reflection_max_concurrency", 5),
+            provider=self.config["llm_provider"].lower(),
+        )
+        self.signal_processor = SignalProcessor(
+            self.quick_thinking_llm, self.config.get("decision_min_confidence", 0.8)
+        )
 
         # State tracking
         self.curr_state = None
         self.ticker = None
-        self.log_states_dict = {}  # date to full state dict
+        # One compact record per run, appended in the background by a logger
+        # shared by every graph in the process
+        self.state_logger = get_state_logger(
+            compress=self.config.get("state_log_compress", False)
+        )
 
         # Set up the graph
-        self.graph = self.graph_setup.setup_graph(selected_analysts)
+        self.graph = self.graph_setup.setup_graph(
+            selected_analysts,
+            parallel_analysts=self.config.get("parallel_analysts", False),
+        )
 
     def _create_tool_nodes(self) -> Dict[str, ToolNode]:
         """Create tool nodes for different data sources."""
@@ -224,9 +267,119 @@ class TradingAgentsGraph:
         # Return decision and processed signal
         return final_state, self.process_signal(final_state["final_trade_decision"])
 
-    def _log_state(self, trade_date, final_state):
-        """Log the final state to a JSON file."""
-        self.log_states_dict[str(trade_date)] = {
+    @staticmethod
+    def _new_job_result(company_name, trade_date):
+        """Create the result record of a batch job."""
+        return {
+            "ticker": company_name,
+            "trade_date": str(trade_date),
+            "final_state": None,
+            "decision": None,
+            "error": None,
+        }
+
+    def _run_job(self, company_name, trade_date):
+        """Run one (ticker, date) job without touching the single-run state."""
+        result = self._new_job_result(company_name, trade_date)
+        try:
+            init_agent_state = self.propagator.create_initial_state(
+                company_name, trade_date
+            )
+            final_state = self.graph.invoke(
+                init_agent_state, **self.propagator.get_graph_args()
+            )
+            self._log_state(trade_date, final_state, ticker=company_name)
+            result["final_state"] = final_state
+            result["decision"] = self.process_signal(
+                final_state["final_trade_decision"]
+            )
+        except Exception as e:
+            result["error"] = e
+        return result
+
+    def propagate_batch(self, jobs, max_concurrency=None):
+        """Run the graph for many (ticker, trade_date) jobs concurrently.
+
+        The compiled graph, LLM clients, toolkit and memories are shared; every
+        job gets its own state and does not change ``ticker``/``curr_state``.
+
+        Args:
+            jobs: Iterable of (ticker, trade_date) pairs
+            max_concurrency: Maximum number of jobs in flight, defaults to
+                config["max_concurrent_jobs"]
+
+        Yields:
+            One dict per job as it completes, with keys ticker, trade_date,
+            final_state, decision and error (the exception if the job failed)
+        """
+        if max_concurrency is None:
+            max_concurrency = self.config.get("max_concurrent_jobs", 4)
+
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+            futures = [
+                executor.submit(self._run_job, company_name, trade_date)
+                for company_name, trade_date in jobs
+            ]
+            for future in as_completed(futures):
+                yield future.result()
+
+    async def apropagate_many(self, jobs, max_concurrency=None):
+        """Async version of propagate_batch.
+
+        Jobs run through the graph's async API under a semaphore; signal
+        processing and state logging run in the default executor.
+
+        Yields:
+            One result dict per job as it completes (see propagate_batch)
+        """
+        if max_concurrency is None:
+            max_concurrency = self.config.get("max_concurrent_jobs", 4)
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        loop = asyncio.get_running_loop()
+
+        async def run(company_name, trade_date):
+            result = self._new_job_result(company_name, trade_date)
+            async with semaphore:
+                try:
+                    init_agent_state = self.propagator.create_initial_state(
+                        company_name, trade_date
+                    )
+                    final_state = await self.graph.ainvoke(
+                        init_agent_state, **self.propagator.get_graph_args()
+                    )
+                    await loop.run_in_executor(
+                        None,
+                        functools.partial(
+                            self._log_state, trade_date, final_state, ticker=company_name
+                        ),
+                    )
+                    result["final_state"] = final_state
+                    result["decision"] = await loop.run_in_executor(
+                        None, self.process_signal, final_state["final_trade_decision"]
+                    )
+                except Exception as e:
+                    result["error"] = e
+            return result
+
+        tasks = [
+            asyncio.ensure_future(run(company_name, trade_date))
+            for company_name, trade_date in jobs
+        ]
+        for task in asyncio.as_completed(tasks):
+            yield await task
+
+    def _log_state(self, trade_date, final_state, ticker=None):
+        """Append the final state to the ticker's JSON Lines state log.
+
+        ``ticker`` is given by batch runs, which do not set ``self.ticker``.
+        Records are written by a background thread; call
+        ``self.state_logger.flush()`` before reading the log in-process, and
+        use ``StateLogReader`` to load single dates.
+        """
+        if ticker is None:
+            ticker = self.ticker
+
+        record = {
             "company_of_interest": final_state["company_of_interest"],
             "trade_date": final_state["trade_date"],
             "market_report": final_state["market_report"],
@@ -255,33 +408,40 @@ class TradingAgentsGraph:
             "investment_plan": final_state["investment_plan"],
             "final_trade_decision": final_state["final_trade_decision"],
         }
+        record["trade_date"] = str(record["trade_date"])
 
-        # Save to file
-        directory = Path(f"eval_results/{self.ticker}/TradingAgentsStrategy_logs/")
-        directory.mkdir(parents=True, exist_ok=True)
+        self.state_logger.log(f"eval_results/{ticker}/TradingAgentsStrategy_logs/", record)
 
-        with open(
-            f"eval_results/{self.ticker}/TradingAgentsStrategy_logs/full_states_log_{trade_date}.json",
-            "w",
-        ) as f:
-            json.dump(self.log_states_dict, f, indent=4)
+    def _reflection_memories(self):
+        """Memory of each component the Reflector learns for."""
+        return {
+            "bull": self.bull_memory,
+            "bear": self.bear_memory,
+            "trader": self.trader_memory,
+            "invest_judge": self.invest_judge_memory,
+            "risk_manager": self.risk_manager_memory,
+        }
 
     def reflect_and_remember(self, returns_losses):
-        """Reflect on decisions and update memory based on returns."""
-        self.reflector.reflect_bull_researcher(
-            self.curr_state, returns_losses, self.bull_memory
-        )
-        self.reflector.reflect_bear_researcher(
-            self.curr_state, returns_losses, self.bear_memory
-        )
-        self.reflector.reflect_trader(
-            self.curr_state, returns_losses, self.trader_memory
-        )
-        self.reflector.reflect_invest_judge(
-            self.curr_state, returns_losses, self.invest_judge_memory
+        """Reflect on decisions and update memory based on returns.
+
+        The five component reflections run concurrently (up to
+        config["reflection_max_concurrency"] per provider) and their lessons
+        are added to the memories together at the end.
+        """
+        self.reflector.reflect_batch(
+            [(self.curr_state, returns_losses)], self._reflection_memories()
         )
-        self.reflector.reflect_risk_manager(
-            self.curr_state, returns_losses, self.risk_manager_memory
+
+    def reflect_and_remember_batch(self, states_and_returns):
+        """Reflect on many past runs at once, e.g. after a backtest.
+
+        Args:
+            states_and_returns: Iterable of (final_state, returns_losses)
+                pairs, e.g. the final states from ``propagate_batch``
+        """
+        return self.reflector.reflect_batch(
+            states_and_returns, self._reflection_memories()
         )
 
     def process_signal(self, full_signal):
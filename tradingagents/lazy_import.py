@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Lazy Imports
+Helpers that defer importing provider SDKs and dataflow backends until they
+are first used, so importing tradingagents stays cheap in short-lived workers
+"""
+
+import importlib
+import threading
+from typing import Callable, Dict, List, Tuple
+
+
+class LazyModule:
+    """Module proxy that imports the real module on first attribute access"""
+
+    def __init__(self, name: str):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+        self.__dict__["_lock"] = threading.Lock()
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            with self.__dict__["_lock"]:
+                module = self.__dict__["_module"]
+                if module is None:
+                    module = importlib.import_module(self.__dict__["_name"])
+                    self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_module"] is not None else "not loaded"
+        return f"<lazy module '{self.__dict__['_name']}' ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """
+    Get a proxy for a module that is imported on first attribute access
+
+    Args:
+        name: Absolute module name, e.g. "yfinance"
+    """
+    return LazyModule(name)
+
+
+def lazy_attributes(package: str, attribute_modules: Dict[str, str]) -> Tuple[Callable, Callable]:
+    """
+    Build module-level ``__getattr__``/``__dir__`` (PEP 562) for a package
+    whose public names are imported from their submodules on first access
+
+    Args:
+        package: The package's ``__name__``
+        attribute_modules: Public name -> relative submodule defining it
+
+    Returns:
+        (__getattr__, __dir__) to assign in the package's __init__
+    """
+    import sys
+
+    def __getattr__(name: str):
+        module_name = attribute_modules.get(name)
+        if module_name is None:
+            raise AttributeError(f"module '{package}' has no attribute '{name}'")
+        value = getattr(importlib.import_module(module_name, package), name)
+        # cache on the package so later lookups skip __getattr__
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[package])) | set(attribute_modules))
+
+    return __getattr__, __dir__
@@ -1,4 +1,10 @@
 # LLM Adapters for TradingAgents
-from .dashscope_adapter import ChatDashScope
+# Adapters are imported on first access so the provider SDK is only loaded when used
+from tradingagents.lazy_import import lazy_attributes
 
-__all__ = ["ChatDashScope"]
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    "ChatDashScope": ".dashscope_adapter",
+    "TokenUsageCallbackHandler": ".usage_callback",
+})
+
+__all__ = ["ChatDashScope", "TokenUsageCallbackHandler"]
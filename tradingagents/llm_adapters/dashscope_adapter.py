@@ -5,10 +5,13 @@
 
 import os
 import json
-from typing import Any, Dict, List, Optional, Union, Iterator, AsyncIterator, Sequence
+import asyncio
+import weakref
+from typing import Any, Dict, List, Optional, Tuple, Union, Iterator, AsyncIterator, Sequence
+import aiohttp
 from langchain_core.language_models.chat_models import BaseChatModel
-from langchain_core.messages import BaseMessage, AIMessage, HumanMessage, SystemMessage
-from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.messages import BaseMessage, AIMessage, AIMessageChunk, HumanMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
 from langchain_core.callbacks.manager import CallbackManagerForLLMRun, AsyncCallbackManagerForLLMRun
 from langchain_core.tools import BaseTool
 from langchain_core.utils.function_calling import convert_to_openai_tool
@@ -17,6 +20,29 @@ import dashscope
 from dashscope import Generation
 from ..config.config_manager import token_tracker
 
+# DashScope 文本生成 HTTP 接口路径（相对于 dashscope.base_http_api_url）
+DASHSCOPE_GENERATION_PATH = "/services/aigc/text-generation/generation"
+
+# 每个事件循环共享一个 aiohttp 会话，复用 HTTP 连接
+_aiohttp_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = weakref.WeakKeyDictionary()
+
+
+async def _get_aiohttp_session() -> aiohttp.ClientSession:
+    """获取当前事件循环的共享 aiohttp 会话"""
+    loop = asyncio.get_running_loop()
+    session = _aiohttp_sessions.get(loop)
+    if session is None or session.closed:
+        session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=300))
+        _aiohttp_sessions[loop] = session
+    return session
+
+
+async def close_async_sessions() -> None:
+    """关闭当前事件循环的共享 aiohttp 会话（在事件循环结束前调用）"""
+    session = _aiohttp_sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
+
 
 class ChatDashScope(BaseChatModel):
     """阿里百炼大模型的 LangChain 适配器"""
@@ -88,97 +114,181 @@ class ChatDashScope(BaseChatModel):
         
         return dashscope_messages
     
-    def _generate(
+    def _build_request_params(
         self,
         messages: List[BaseMessage],
         stop: Optional[List[str]] = None,
-        run_manager: Optional[CallbackManagerForLLMRun] = None,
         **kwargs: Any,
-    ) -> ChatResult:
-        """生成聊天回复"""
-        
-        # 转换消息格式
-        dashscope_messages = self._convert_messages_to_dashscope_format(messages)
-        
-        # 准备请求参数
+    ) -> Dict[str, Any]:
+        """构建 DashScope 请求参数"""
         request_params = {
             "model": self.model,
-            "messages": dashscope_messages,
+            "messages": self._convert_messages_to_dashscope_format(messages),
             "result_format": "message",
             "temperature": self.temperature,
             "max_tokens": self.max_tokens,
             "top_p": self.top_p,
         }
-        
+
         # 添加停止词
         if stop:
             request_params["stop"] = stop
-        
+
         # 合并额外参数
         request_params.update(kwargs)
-        
+        return request_params
+
+    @staticmethod
+    def _get_usage_value(usage: Any, key: str) -> int:
+        """兼容 SDK 对象和 HTTP JSON 两种 usage 格式"""
+        if isinstance(usage, dict):
+            return usage.get(key) or 0
+        return getattr(usage, key, None) or 0
+
+    def _track_usage(self, usage: Any, messages: List[BaseMessage], **kwargs: Any) -> None:
+        """提取token使用量并记录到TokenTracker"""
+        if not usage:
+            return
+
+        # 根据API文档，usage可能包含input_tokens和output_tokens
+        input_tokens = self._get_usage_value(usage, "input_tokens")
+        output_tokens = self._get_usage_value(usage, "output_tokens")
+        if not input_tokens and not output_tokens:
+            # 有些情况下可能只有total_tokens
+            total_tokens = self._get_usage_value(usage, "total_tokens")
+            # 简单估算：假设输入占30%，输出占70%
+            input_tokens = int(total_tokens * 0.3)
+            output_tokens = int(total_tokens * 0.7)
+
+        # 隐式上下文缓存命中的输入token（提示前缀相同时由服务端复用）
+        prompt_details = self._get_usage_value(usage, "prompt_tokens_details")
+        cached_input_tokens = self._get_usage_value(prompt_details, "cached_tokens") if prompt_details else 0
+
+        if input_tokens > 0 or output_tokens > 0:
+            try:
+                # 生成会话ID（如果没有提供）
+                session_id = kwargs.get('session_id', f"dashscope_{hash(str(messages))%10000}")
+                analysis_type = kwargs.get('analysis_type', 'stock_analysis')
+
+                # 使用TokenTracker记录使用量
+                token_tracker.track_usage(
+                    provider="dashscope",
+                    model_name=self.model,
+                    input_tokens=input_tokens,
+                    output_tokens=output_tokens,
+                    session_id=session_id,
+                    analysis_type=analysis_type,
+                    cached_input_tokens=cached_input_tokens
+                )
+            except Exception as track_error:
+                # 记录失败不应该影响主要功能
+                print(f"Token tracking failed: {track_error}")
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        """生成聊天回复"""
+        request_params = self._build_request_params(messages, stop, **kwargs)
+
         try:
             # 调用 DashScope API
             response = Generation.call(**request_params)
-            
+
             if response.status_code == 200:
                 # 解析响应
-                output = response.output
-                message_content = output.choices[0].message.content
-                
-                # 提取token使用量信息
-                input_tokens = 0
-                output_tokens = 0
-                
-                # DashScope API响应中包含usage信息
-                if hasattr(response, 'usage') and response.usage:
-                    usage = response.usage
-                    # 根据API文档，usage可能包含input_tokens和output_tokens
-                    if hasattr(usage, 'input_tokens'):
-                        input_tokens = usage.input_tokens
-                    if hasattr(usage, 'output_tokens'):
-                        output_tokens = usage.output_tokens
-                    # 有些情况下可能是total_tokens
-                    elif hasattr(usage, 'total_tokens'):
-                        # 估算输入和输出token（如果没有分别提供）
-                        total_tokens = usage.total_tokens
-                        # 简单估算：假设输入占30%，输出占70%
-                        input_tokens = int(total_tokens * 0.3)
-                        output_tokens = int(total_tokens * 0.7)
-                
+                message_content = response.output.choices[0].message.content
+
                 # 记录token使用量
-                if input_tokens > 0 or output_tokens > 0:
-                    try:
-                        # 生成会话ID（如果没有提供）
-                        session_id = kwargs.get('session_id', f"dashscope_{hash(str(messages))%10000}")
-                        analysis_type = kwargs.get('analysis_type', 'stock_analysis')
-                        
-                        # 使用TokenTracker记录使用量
-                        token_tracker.track_usage(
-                            provider="dashscope",
-                            model_name=self.model,
-                            input_tokens=input_tokens,
-                            output_tokens=output_tokens,
-                            session_id=session_id,
-                            analysis_type=analysis_type
-                        )
-                    except Exception as track_error:
-                        # 记录失败不应该影响主要功能
-                        print(f"Token tracking failed: {track_error}")
-                
-                # 创建 AI 消息
-                ai_message = AIMessage(content=message_content)
-                
+                self._track_usage(getattr(response, 'usage', None), messages, **kwargs)
+
                 # 创建生成结果
-                generation = ChatGeneration(message=ai_message)
-                
+                generation = ChatGeneration(message=AIMessage(content=message_content))
                 return ChatResult(generations=[generation])
             else:
                 raise Exception(f"DashScope API error: {response.code} - {response.message}")
-                
+
         except Exception as e:
             raise Exception(f"Error calling DashScope API: {str(e)}")
-    
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        """流式生成聊天回复，逐段返回新生成的token"""
+        request_params = self._build_request_params(messages, stop, **kwargs)
+        request_params["stream"] = True
+        request_params["incremental_output"] = True
+
+        usage = None
+        try:
+            for response in Generation.call(**request_params):
+                if response.status_code != 200:
+                    raise Exception(f"DashScope API error: {response.code} - {response.message}")
+
+                usage = getattr(response, 'usage', None) or usage
+                text = response.output.choices[0].message.content or ""
+                if not text:
+                    continue
+
+                chunk = ChatGenerationChunk(message=AIMessageChunk(content=text))
+                if run_manager:
+                    run_manager.on_llm_new_token(text, chunk=chunk)
+                yield chunk
+        except Exception as e:
+            raise Exception(f"Error calling DashScope API: {str(e)}")
+
+        # 流式响应的usage是累计值，结束后记录一次
+        self._track_usage(usage, messages, **kwargs)
+
+    def _http_request(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        stream: bool = False,
+        **kwargs: Any,
+    ) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """构建 DashScope HTTP 接口的 (url, headers, payload)"""
+        # session_id / analysis_type 只用于token记录，不发送给API
+        parameters = {
+            key: value
+            for key, value in self._build_request_params(messages, stop, **kwargs).items()
+            if key not in ("model", "messages", "session_id", "analysis_type")
+        }
+        if stream:
+            parameters["incremental_output"] = True
+
+        api_key = self.api_key or os.getenv("DASHSCOPE_API_KEY") or dashscope.api_key
+        if isinstance(api_key, SecretStr):
+            api_key = api_key.get_secret_value()
+
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        }
+        if stream:
+            headers["X-DashScope-SSE"] = "enable"
+            headers["Accept"] = "text/event-stream"
+
+        url = dashscope.base_http_api_url.rstrip("/") + DASHSCOPE_GENERATION_PATH
+        payload = {
+            "model": self.model,
+            "input": {"messages": self._convert_messages_to_dashscope_format(messages)},
+            "parameters": parameters,
+        }
+        return url, headers, payload
+
+    @staticmethod
+    def _raise_for_http_error(status: int, body: Dict[str, Any]) -> None:
+        if status != 200 or body.get("code"):
+            raise Exception(f"DashScope API error: {body.get('code', status)} - {body.get('message', '')}")
+
     async def _agenerate(
         self,
         messages: List[BaseMessage],
@@ -186,9 +296,65 @@ class ChatDashScope(BaseChatModel):
         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
         **kwargs: Any,
     ) -> ChatResult:
-        """异步生成聊天回复"""
-        # 目前使用同步方法，后续可以实现真正的异步
-        return self._generate(messages, stop, run_manager, **kwargs)
+        """异步生成聊天回复，通过复用连接的 HTTP 会话调用，不阻塞事件循环"""
+        url, headers, payload = self._http_request(messages, stop, **kwargs)
+
+        try:
+            session = await _get_aiohttp_session()
+            async with session.post(url, headers=headers, json=payload) as response:
+                body = await response.json(content_type=None)
+                self._raise_for_http_error(response.status, body)
+
+            message_content = body["output"]["choices"][0]["message"]["content"]
+        except Exception as e:
+            raise Exception(f"Error calling DashScope API: {str(e)}")
+
+        # 记录token使用量
+        self._track_usage(body.get("usage"), messages, **kwargs)
+
+        generation = ChatGeneration(message=AIMessage(content=message_content))
+        return ChatResult(generations=[generation])
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        """异步流式生成聊天回复（SSE），逐段返回新生成的token"""
+        url, headers, payload = self._http_request(messages, stop, stream=True, **kwargs)
+
+        usage = None
+        try:
+            session = await _get_aiohttp_session()
+            async with session.post(url, headers=headers, json=payload) as response:
+                if response.status != 200:
+                    body = await response.json(content_type=None)
+                    self._raise_for_http_error(response.status, body)
+
+                async for raw_line in response.content:
+                    line = raw_line.decode("utf-8").strip()
+                    if not line.startswith("data:"):
+                        continue
+
+                    body = json.loads(line[len("data:"):])
+                    self._raise_for_http_error(200, body)
+
+                    usage = body.get("usage") or usage
+                    text = body["output"]["choices"][0]["message"].get("content") or ""
+                    if not text:
+                        continue
+
+                    chunk = ChatGenerationChunk(message=AIMessageChunk(content=text))
+                    if run_manager:
+                        await run_manager.on_llm_new_token(text, chunk=chunk)
+                    yield chunk
+        except Exception as e:
+            raise Exception(f"Error calling DashScope API: {str(e)}")
+
+        # 流式响应的usage是累计值，结束后记录一次
+        self._track_usage(usage, messages, **kwargs)
     
     def bind_tools(
         self,
@@ -216,7 +382,8 @@ class ChatDashScope(BaseChatModel):
                 except Exception:
                     pass
 
-        # 创建新实例，保存工具信息
+        # 创建新实例，保存工具信息（沿用同一个响应缓存）
+        kwargs.setdefault("cache", self.cache)
         new_instance = self.__class__(
             model=self.model,
             api_key=self.api_key,
@@ -236,6 +403,8 @@ class ChatDashScope(BaseChatModel):
             "temperature": self.temperature,
             "max_tokens": self.max_tokens,
             "top_p": self.top_p,
+            # 绑定的工具也是响应缓存键的一部分
+            "tools": getattr(self, "_tools", None),
         }
 
 
@@ -0,0 +1,49 @@
+"""
+LangChain 模型的 token 用量回调
+把 OpenAI / Anthropic / Google 等 LangChain 聊天模型返回的 token 用量
+（包括命中提供商提示缓存的输入 token）记录到 TokenTracker
+"""
+
+from typing import Any
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from ..config.config_manager import token_tracker
+
+
+class TokenUsageCallbackHandler(BaseCallbackHandler):
+    """在每次模型调用结束时把 usage_metadata 记录到 TokenTracker"""
+
+    def __init__(self, provider: str, analysis_type: str = "stock_analysis"):
+        super().__init__()
+        self.provider = provider
+        self.analysis_type = analysis_type
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                usage = getattr(message, "usage_metadata", None)
+                if not usage:
+                    continue
+                metadata = message.response_metadata or {}
+                if metadata.get("llm_cache_hit"):
+                    # 本地响应缓存重放的结果没有产生费用
+                    continue
+
+                # input_tokens 包含缓存命中的部分，cache_read 为命中提示缓存的输入token
+                details = usage.get("input_token_details") or {}
+                try:
+                    token_tracker.track_usage(
+                        provider=self.provider,
+                        model_name=metadata.get("model_name") or metadata.get("model") or "unknown",
+                        input_tokens=usage.get("input_tokens", 0),
+                        output_tokens=usage.get("output_tokens", 0),
+                        session_id=str(kwargs.get("run_id")) if kwargs.get("run_id") else None,
+                        analysis_type=self.analysis_type,
+                        cached_input_tokens=details.get("cache_read", 0) or 0,
+                    )
+                except Exception as track_error:
+                    # 记录失败不应该影响主要功能
+                    print(f"Token tracking failed: {track_error}")